@@ -0,0 +1,540 @@
+#!/usr/bin/env python3
+"""
+MCP Bridge Load Test
+
+Drives the bridge the way clients do and reports latency percentiles,
+throughput and error rates for each scenario and server:
+
+  direct        POST /servers/{id}/tools/{tool} over a plain requests.Session
+  client        MCPBridgeClient.execute_tool() from worker threads
+  async-client  AsyncMCPBridgeClient.execute_tool() on one event loop
+  jobs          /tool/execute, then MCPBridgeClient.wait_for_result()
+  jobs-poll     /tool/execute, then plain POST /results polling
+
+Without --rate every worker sends its next request as soon as the previous one
+returns (closed loop). With --rate requests are started on a fixed schedule and
+latency is measured from the scheduled start, so time spent queueing behind a
+slow bridge is counted instead of hidden.
+
+--start-stack runs the HTTP and SSE stub MCP servers from bench/stub_config.json
+in this process and launches a bridge on the --url port, so the whole run works
+offline. The --stub-* options shape the stubs' latency, payload size, error
+rate and response chunking; the stdio stub receives them through the bridge's
+environment. Results can be saved as baseline JSON files and compared against
+later runs.
+
+Examples:
+  # Offline run against all three stub transports
+  python bench/loadtest.py --start-stack --save
+
+  # 200 req/s for 30 seconds through the async client
+  python bench/loadtest.py --scenario async-client --rate 200 --duration 30
+
+  # Fail (exit code 1) if p95/p99 or throughput regressed by more than 10%
+  python bench/loadtest.py --start-stack --compare bench/baselines/main.json
+
+  # Bridge overhead on top of a 20 ms tool with 64 KB results streamed in 4 KB pieces
+  python bench/loadtest.py --start-stack --stub-latency-ms 20 --stub-payload-bytes 65536 --stub-chunk-bytes 4096
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import platform
+import threading
+import subprocess
+from datetime import datetime, timezone
+from urllib.parse import urlparse
+
+import requests
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_ROOT)
+
+from example_client import MCPBridgeClient, AsyncMCPBridgeClient, JOB_FINISHED_STATUSES  # noqa: E402
+from stub_mcp_server import BEHAVIOR_OPTIONS, StubServer  # noqa: E402
+
+DEFAULT_MCP_BRIDGE_URL = "http://localhost:3000"
+DEFAULT_SERVERS = ("stub-stdio", "stub-http", "stub-sse")
+SCENARIOS = ("direct", "client", "async-client", "jobs", "jobs-poll")
+STUB_CONFIG = os.path.join(BENCH_DIR, "stub_config.json")
+BASELINE_DIR = os.path.join(BENCH_DIR, "baselines")
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(int(round(q * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def summarize(samples, errors, elapsed):
+    """Turn recorded latencies (seconds) and error messages into report numbers"""
+    latencies = sorted(samples)
+    total = len(latencies) + len(errors)
+    error_kinds = {}
+    for message in errors:
+        error_kinds[message] = error_kinds.get(message, 0) + 1
+    return {
+        "requests": total,
+        "errors": len(errors),
+        "error_rate": len(errors) / total if total else 0.0,
+        "throughput_rps": total / elapsed if elapsed > 0 else 0.0,
+        "elapsed_s": elapsed,
+        "mean_ms": sum(latencies) / len(latencies) * 1000 if latencies else None,
+        "p50_ms": _ms(percentile(latencies, 0.50)),
+        "p95_ms": _ms(percentile(latencies, 0.95)),
+        "p99_ms": _ms(percentile(latencies, 0.99)),
+        "max_ms": _ms(latencies[-1] if latencies else None),
+        "top_errors": sorted(error_kinds.items(), key=lambda item: -item[1])[:3]
+    }
+
+
+def _ms(seconds):
+    return seconds * 1000 if seconds is not None else None
+
+
+class Schedule:
+    """Hands out request slots to workers until the run is over.
+
+    The first `warmup` slots are run but not recorded. With a rate, slot i is
+    due at start + i / rate.
+    """
+
+    def __init__(self, requests_total, duration, rate, warmup):
+        self.limit = warmup + requests_total if requests_total else None
+        self.duration = duration
+        self.rate = rate
+        self.warmup = warmup
+        self.index = 0
+        self.lock = threading.Lock()
+        self.start = time.perf_counter()
+        self.measure_start = None
+
+    def next(self):
+        """Return (recorded, due_time) for the next request, or None when the run is over"""
+        with self.lock:
+            now = time.perf_counter()
+            if self.limit is not None and self.index >= self.limit:
+                return None
+            if self.duration and self.measure_start is not None and now - self.measure_start >= self.duration:
+                return None
+            index = self.index
+            self.index += 1
+            recorded = index >= self.warmup
+            if recorded and self.measure_start is None:
+                self.measure_start = now
+            due = self.start + index / self.rate if self.rate else None
+            return recorded, due
+
+
+class Recorder:
+    def __init__(self):
+        self.samples = []
+        self.errors = []
+        self.lock = threading.Lock()
+
+    def record(self, started, error):
+        latency = time.perf_counter() - started
+        with self.lock:
+            if error is None:
+                self.samples.append(latency)
+            else:
+                self.errors.append(error)
+
+
+def _error_message(error):
+    """Group errors by type and HTTP status rather than by their full text"""
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        return f"HTTP {error.response.status_code}"
+    status = getattr(error, "status", None)
+    if isinstance(status, int):
+        return f"HTTP {status}"
+    return type(error).__name__ + (f": {error}" if str(error) and len(str(error)) < 80 else "")
+
+
+def _check_tool_result(body):
+    """Count tool results flagged with isError as failures"""
+    if isinstance(body, dict) and "jsonrpc" in body:
+        # Results from HTTP servers keep their JSON-RPC envelope
+        if body.get("error"):
+            raise RuntimeError("JSON-RPC error")
+        body = body.get("result")
+    if isinstance(body, dict) and body.get("isError"):
+        raise RuntimeError("tool returned isError")
+
+
+# Sync scenarios - each worker thread gets its own session or client
+
+def _direct_call(url, server, tool, arguments, timeout):
+    session = requests.Session()
+
+    def call():
+        response = session.post(f"{url}/servers/{server}/tools/{tool}", json=arguments, timeout=timeout)
+        response.raise_for_status()
+        _check_tool_result(response.json())
+    return call
+
+
+def _client_call(url, server, tool, arguments, timeout):
+    client = MCPBridgeClient(url)
+
+    def call():
+        _check_tool_result(client.execute_tool(server, tool, arguments))
+    return call
+
+
+def _jobs_call(url, server, tool, arguments, timeout):
+    client = MCPBridgeClient(url)
+
+    def call():
+        job = client.submit_job(tool, arguments, server_id=server)
+        result = client.wait_for_result(job["job_id"], job["bearer_token"], timeout=timeout)
+        if result.get("status") != "COMPLETED":
+            raise RuntimeError(f"job {result.get('status')}")
+    return call
+
+
+def _jobs_poll_call(url, server, tool, arguments, timeout, poll_interval=0.05):
+    session = requests.Session()
+
+    def call():
+        payload = dict(arguments, tool_name=tool, server_id=server)
+        response = session.post(f"{url}/tool/execute", json=payload, timeout=timeout)
+        response.raise_for_status()
+        job = response.json()
+        headers = {"Authorization": f"Bearer {job['bearer_token']}"}
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            response = session.post(f"{url}/results/{job['job_id']}", headers=headers, timeout=timeout)
+            body = response.json()
+            status = body.get("status")
+            if status == "COMPLETED":
+                return
+            if status in JOB_FINISHED_STATUSES:
+                raise RuntimeError(f"job {status}")
+            if response.status_code >= 400 and not status:
+                response.raise_for_status()
+            time.sleep(poll_interval)
+        raise TimeoutError("job did not finish")
+    return call
+
+
+SYNC_SCENARIOS = {
+    "direct": _direct_call,
+    "client": _client_call,
+    "jobs": _jobs_call,
+    "jobs-poll": _jobs_poll_call
+}
+
+
+def run_sync(scenario, url, server, tool, arguments, settings):
+    schedule = Schedule(settings.requests, settings.duration, settings.rate, settings.warmup)
+    recorder = Recorder()
+
+    def worker():
+        call = SYNC_SCENARIOS[scenario](url, server, tool, arguments, settings.timeout)
+        while True:
+            slot = schedule.next()
+            if slot is None:
+                return
+            recorded, due = slot
+            if due is not None:
+                time.sleep(max(due - time.perf_counter(), 0))
+            started = due if due is not None else time.perf_counter()
+            error = None
+            try:
+                call()
+            except Exception as e:
+                error = _error_message(e)
+            if recorded:
+                recorder.record(started, error)
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(settings.concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - (schedule.measure_start or schedule.start)
+    return summarize(recorder.samples, recorder.errors, elapsed)
+
+
+async def _run_async(url, server, tool, arguments, settings):
+    schedule = Schedule(settings.requests, settings.duration, settings.rate, settings.warmup)
+    recorder = Recorder()
+
+    async with AsyncMCPBridgeClient(url, max_concurrency=settings.concurrency,
+                                    max_connections=settings.concurrency,
+                                    max_connections_per_host=settings.concurrency,
+                                    timeout=settings.timeout) as client:
+        async def worker():
+            while True:
+                slot = schedule.next()
+                if slot is None:
+                    return
+                recorded, due = slot
+                if due is not None:
+                    await asyncio.sleep(max(due - time.perf_counter(), 0))
+                started = due if due is not None else time.perf_counter()
+                error = None
+                try:
+                    _check_tool_result(await client.execute_tool(server, tool, arguments))
+                except Exception as e:
+                    error = _error_message(e)
+                if recorded:
+                    recorder.record(started, error)
+
+        await asyncio.gather(*(worker() for _ in range(settings.concurrency)))
+    elapsed = time.perf_counter() - (schedule.measure_start or schedule.start)
+    return summarize(recorder.samples, recorder.errors, elapsed)
+
+
+def run_scenario(scenario, url, server, tool, arguments, settings):
+    if scenario == "async-client":
+        return asyncio.run(_run_async(url, server, tool, arguments, settings))
+    return run_sync(scenario, url, server, tool, arguments, settings)
+
+
+# Local stack - stub servers plus a bridge, all torn down afterwards
+
+def _stub_ports():
+    with open(STUB_CONFIG) as f:
+        servers = json.load(f)["mcpServers"]
+    ports = {}
+    for server_id, config in servers.items():
+        if config.get("type") in ("http", "sse"):
+            ports[config["type"]] = urlparse(config["url"]).port
+    return ports
+
+
+def start_stack(url, stub_options, quiet=True):
+    """Start the HTTP and SSE stubs in-process and a bridge configured for them.
+
+    Returns the stub servers and the bridge process for stop_stack().
+    """
+    stubs = [StubServer(transport, port=port, **stub_options).start()
+             for transport, port in _stub_ports().items()]
+    env = dict(os.environ, MCP_CONFIG_PATH=STUB_CONFIG, PORT=str(urlparse(url).port or 80))
+    env.setdefault("LOG_LEVEL", "warn")
+    for name, value in stub_options.items():
+        if value is not None:
+            env[BEHAVIOR_OPTIONS[name][0]] = str(value)  # Inherited by the stdio stub
+    output = subprocess.DEVNULL if quiet else None
+    bridge = subprocess.Popen(["node", "mcp-bridge.js"], cwd=REPO_ROOT, env=env, stdout=output, stderr=output)
+    return stubs, bridge
+
+
+def wait_until_ready(url, servers, timeout=30):
+    """Wait until the bridge reports every server as initialized"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            health = requests.get(f"{url}/health", timeout=2).json()
+            states = {s["id"]: s.get("initialization_state") for s in health.get("servers", [])}
+            if all(states.get(server) == "initialized" for server in servers):
+                return
+        except (requests.RequestException, ValueError):
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Bridge at {url} did not initialize {', '.join(servers)} within {timeout}s")
+
+
+def stop_stack(stack):
+    stubs, bridge = stack
+    bridge.terminate()
+    try:
+        bridge.wait(timeout=5)
+    except subprocess.TimeoutExpired:
+        bridge.kill()
+    for stub in stubs:
+        stub.stop()
+
+
+# Reporting and baselines
+
+def _fmt(value, unit="ms"):
+    if value is None:
+        return "-"
+    return f"{value:.1f}" if unit == "ms" else f"{value:.{unit}f}"
+
+
+def print_results(results):
+    headers = ("scenario/server/tool", "requests", "err%", "req/s", "mean", "p50", "p95", "p99", "max")
+    rows = []
+    for key, r in results.items():
+        rows.append((key, str(r["requests"]), _fmt(r["error_rate"] * 100, 2), _fmt(r["throughput_rps"], 1),
+                     _fmt(r["mean_ms"]), _fmt(r["p50_ms"]), _fmt(r["p95_ms"]), _fmt(r["p99_ms"]), _fmt(r["max_ms"])))
+    widths = [max(len(h), *(len(row[i]) for row in rows)) for i, h in enumerate(headers)]
+    print("  ".join(h.ljust(widths[0]) if i == 0 else h.rjust(widths[i]) for i, h in enumerate(headers)))
+    print("  ".join("-" * w for w in widths))
+    for row in rows:
+        print("  ".join(c.ljust(widths[0]) if i == 0 else c.rjust(widths[i]) for i, c in enumerate(row)))
+    print("(latencies in ms)")
+    for key, r in results.items():
+        for message, count in r["top_errors"]:
+            print(f"  {key}: {count} x {message}")
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def save_baseline(path, url, settings, results):
+    if path is None:
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        path = os.path.join(BASELINE_DIR, f"{stamp}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    baseline = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "git_commit": _git_commit(),
+        "bridge_url": url,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": {
+            "concurrency": settings.concurrency,
+            "rate": settings.rate,
+            "requests": settings.requests,
+            "duration": settings.duration,
+            "warmup": settings.warmup,
+            "tool": settings.tool,
+            "arguments": json.loads(settings.args),
+            "stub": stub_options(settings) if settings.start_stack else None
+        },
+        "results": results
+    }
+    with open(path, "w") as f:
+        json.dump(baseline, f, indent=2)
+    print(f"Saved baseline to {path}")
+
+
+def compare_baseline(path, settings, results, tolerance, min_delta_ms):
+    """Print changes against a saved baseline; returns True if anything regressed"""
+    with open(path) as f:
+        baseline = json.load(f)
+    for name in ("concurrency", "rate", "tool"):
+        if baseline["settings"].get(name) != getattr(settings, name):
+            print(f"Note: baseline was recorded with {name}={baseline['settings'].get(name)!r}")
+
+    regressed = False
+    print(f"\nCompared with {path} ({baseline.get('git_commit') or 'unknown commit'}, {baseline['created_at']}):")
+    for key, current in results.items():
+        before = baseline["results"].get(key)
+        if before is None:
+            print(f"  {key}: not in baseline")
+            continue
+        problems = []
+        for metric in ("p50_ms", "p95_ms", "p99_ms"):
+            old, new = before.get(metric), current.get(metric)
+            if old is None or new is None:
+                continue
+            change = (new - old) / old if old else 0.0
+            if metric != "p50_ms" and change > tolerance and new - old > min_delta_ms:
+                problems.append(f"{metric} {old:.1f} -> {new:.1f} (+{change:.0%})")
+        old_rps, new_rps = before["throughput_rps"], current["throughput_rps"]
+        if old_rps and new_rps < old_rps * (1 - tolerance):
+            problems.append(f"throughput {old_rps:.1f} -> {new_rps:.1f} req/s")
+        if current["error_rate"] > before["error_rate"] + 0.01:
+            problems.append(f"error rate {before['error_rate']:.2%} -> {current['error_rate']:.2%}")
+        if problems:
+            regressed = True
+            print(f"  REGRESSED {key}: " + "; ".join(problems))
+        else:
+            p99_old, p99_new = before.get("p99_ms"), current.get("p99_ms")
+            detail = f"p99 {p99_old:.1f} -> {p99_new:.1f} ms, " if p99_old and p99_new else ""
+            print(f"  ok        {key}: {detail}{new_rps:.1f} req/s")
+    return regressed
+
+
+def stub_options(args):
+    return {name: getattr(args, f"stub_{name}") for name in BEHAVIOR_OPTIONS}
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(
+        description="Load test the MCP Bridge and report latency percentiles, throughput and errors",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__.split("Examples:", 1)[1]
+    )
+    parser.add_argument("--url", default=DEFAULT_MCP_BRIDGE_URL,
+                        help=f"MCP Bridge URL (default: {DEFAULT_MCP_BRIDGE_URL})")
+    parser.add_argument("--scenario", action="append", choices=SCENARIOS,
+                        help="Scenario to run; repeat for several (default: all)")
+    parser.add_argument("--server", action="append",
+                        help=f"Server id to call; repeat for several (default: {', '.join(DEFAULT_SERVERS)})")
+    parser.add_argument("--tool", default="add", help="Tool to call (default: add)")
+    parser.add_argument("--args", default='{"a": 1, "b": 2}', help="Tool arguments as JSON")
+    parser.add_argument("--concurrency", type=int, default=10, help="Concurrent workers (default: 10)")
+    parser.add_argument("--rate", type=float, default=0,
+                        help="Target requests per second across all workers (default: as fast as possible)")
+    parser.add_argument("--requests", type=int, default=500,
+                        help="Recorded requests per scenario and server (default: 500)")
+    parser.add_argument("--duration", type=float, default=0,
+                        help="Run each scenario for this many seconds instead of a request count")
+    parser.add_argument("--warmup", type=int, default=20, help="Unrecorded requests before measuring (default: 20)")
+    parser.add_argument("--timeout", type=float, default=60, help="Per-request timeout in seconds (default: 60)")
+    parser.add_argument("--start-stack", action="store_true",
+                        help="Start the stub MCP servers and a bridge for this run")
+    stub_group = parser.add_argument_group("Stub behaviour", "Used with --start-stack")
+    stub_group.add_argument("--stub-latency-ms", type=float, help="Fixed delay added to every tool call")
+    stub_group.add_argument("--stub-jitter-ms", type=float, help="Random extra delay, uniform between 0 and this")
+    stub_group.add_argument("--stub-payload-bytes", type=int, help="Pad tool results to this many bytes of text")
+    stub_group.add_argument("--stub-error-rate", type=float, help="Fraction of tool calls that fail (0-1)")
+    stub_group.add_argument("--stub-error-mode", choices=("jsonrpc", "tool"), help="How injected failures look")
+    stub_group.add_argument("--stub-chunk-bytes", type=int, help="Write stub responses in pieces of this many bytes")
+    stub_group.add_argument("--stub-chunk-delay-ms", type=float, help="Pause between response pieces")
+    stub_group.add_argument("--stub-seed", type=int, help="Random seed for jitter and injected errors")
+    parser.add_argument("--save", nargs="?", const=None, default=False, metavar="PATH",
+                        help="Save results as a baseline (default path: bench/baselines/<timestamp>.json)")
+    parser.add_argument("--compare", metavar="PATH", help="Compare results with a saved baseline")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="Relative change in p95/p99 or throughput treated as a regression (default: 0.10)")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0,
+                        help="Ignore latency increases smaller than this (default: 1.0)")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+    if args.duration:
+        args.requests = 0
+    return args
+
+
+def main():
+    args = parse_arguments()
+    url = args.url.rstrip("/")
+    scenarios = args.scenario or list(SCENARIOS)
+    servers = args.server or list(DEFAULT_SERVERS)
+    arguments = json.loads(args.args)
+
+    stack = start_stack(url, stub_options(args)) if args.start_stack else None
+    try:
+        wait_until_ready(url, servers)
+        results = {}
+        for scenario in scenarios:
+            for server in servers:
+                key = f"{scenario}/{server}/{args.tool}"
+                print(f"Running {key} ...", file=sys.stderr, flush=True)
+                results[key] = run_scenario(scenario, url, server, args.tool, arguments, args)
+    finally:
+        if stack:
+            stop_stack(stack)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_results(results)
+    if args.save is not False:
+        save_baseline(args.save, url, args, results)
+    if args.compare and compare_baseline(args.compare, args, results, args.tolerance, args.min_delta_ms):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+"""
+Stub MCP Server for Offline Benchmarks
+
+A dependency-free MCP server that answers instantly (or after a requested
+delay), so load tests measure the bridge rather than the network or a real
+tool. It speaks all three transports the bridge supports:
+
+  stdio  newline-delimited JSON-RPC on stdin/stdout
+  http   streamable-HTTP: JSON-RPC POSTed to /mcp, answered as application/json
+  sse    GET /sse announces a /messages endpoint; responses arrive on the stream
+
+Tools:
+  echo     returns its arguments as JSON text
+  add      returns {"result": a + b}
+  sleep    waits `ms` milliseconds, then returns {"slept_ms": ms}
+  spin     keeps the CPU busy for `ms` milliseconds; holds the GIL, so calls
+           to one process run one at a time like a CPU-bound tool would
+  payload  returns `bytes` bytes of text (default: --payload-bytes)
+
+Behaviour knobs apply to every tools/call. Each one can be set with a flag or
+with an environment variable, so a stdio entry in mcp_config.json can set them
+in its "env" block:
+
+  --latency-ms / STUB_LATENCY_MS            fixed delay before answering
+  --jitter-ms / STUB_JITTER_MS              extra uniform random delay, 0..jitter
+  --payload-bytes / STUB_PAYLOAD_BYTES      pad every tool result to this many bytes of text
+  --error-rate / STUB_ERROR_RATE            fraction of calls that fail (0-1)
+  --error-mode / STUB_ERROR_MODE            "jsonrpc" error response or "tool" result with isError
+  --chunk-bytes / STUB_CHUNK_BYTES          write responses in pieces of this many bytes
+  --chunk-delay-ms / STUB_CHUNK_DELAY_MS    pause between pieces
+  --seed / STUB_SEED                        random seed for jitter and errors
+
+Test scripts can run the HTTP and SSE transports in-process:
+
+  with StubServer("sse", latency_ms=5, chunk_bytes=64) as stub:
+      print(stub.url)  # http://127.0.0.1:<free port>/sse
+
+Examples:
+  python bench/stub_mcp_server.py --transport stdio
+  python bench/stub_mcp_server.py --transport http --port 8931 --latency-ms 20 --jitter-ms 10
+  python bench/stub_mcp_server.py --transport sse --port 8932 --error-rate 0.01 --chunk-bytes 256
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+PROTOCOL_VERSION = "2025-03-26"
+
+TOOLS = [
+    {
+        "name": "echo",
+        "description": "Return the arguments unchanged",
+        "inputSchema": {"type": "object", "properties": {}, "additionalProperties": True}
+    },
+    {
+        "name": "add",
+        "description": "Add two numbers",
+        "inputSchema": {
+            "type": "object",
+            "properties": {"a": {"type": "number"}, "b": {"type": "number"}},
+            "required": ["a", "b"]
+        }
+    },
+    {
+        "name": "sleep",
+        "description": "Wait for `ms` milliseconds before answering",
+        "inputSchema": {"type": "object", "properties": {"ms": {"type": "number"}}}
+    },
+    {
+        "name": "spin",
+        "description": "Keep the CPU busy for `ms` milliseconds before answering",
+        "inputSchema": {"type": "object", "properties": {"ms": {"type": "number"}}}
+    },
+    {
+        "name": "payload",
+        "description": "Return `bytes` bytes of text",
+        "inputSchema": {"type": "object", "properties": {"bytes": {"type": "integer"}}}
+    }
+]
+
+# Knob name -> (environment variable, type, default)
+BEHAVIOR_OPTIONS = {
+    "latency_ms": ("STUB_LATENCY_MS", float, 0.0),
+    "jitter_ms": ("STUB_JITTER_MS", float, 0.0),
+    "payload_bytes": ("STUB_PAYLOAD_BYTES", int, 0),
+    "error_rate": ("STUB_ERROR_RATE", float, 0.0),
+    "error_mode": ("STUB_ERROR_MODE", str, "jsonrpc"),
+    "chunk_bytes": ("STUB_CHUNK_BYTES", int, 0),
+    "chunk_delay_ms": ("STUB_CHUNK_DELAY_MS", float, 0.0),
+    "seed": ("STUB_SEED", int, None)
+}
+
+
+_spin_lock = threading.Lock()  # One spin at a time per process, like a single-threaded CPU-bound server
+
+
+def _text_result(value):
+    return {"content": [{"type": "text", "text": json.dumps(value)}]}
+
+
+class StubBehavior:
+    """Answers JSON-RPC messages, adding the configured latency, padding and errors"""
+
+    def __init__(self, **options):
+        for name, (env_name, kind, default) in BEHAVIOR_OPTIONS.items():
+            value = options.pop(name, None)
+            if value is None and os.environ.get(env_name):
+                value = kind(os.environ[env_name])
+            setattr(self, name, default if value is None else value)
+        if options:
+            raise TypeError(f"Unknown stub options: {', '.join(options)}")
+        if self.error_mode not in ("jsonrpc", "tool"):
+            raise ValueError("error_mode must be 'jsonrpc' or 'tool'")
+        self.random = random.Random(self.seed)
+        self.random_lock = threading.Lock()  # Keeps draws reproducible across request threads
+
+    def _draw(self):
+        with self.random_lock:
+            return self.random.random(), self.random.random()
+
+    def call_tool(self, name, arguments):
+        """Run a stub tool and return its MCP result, or raise ValueError for unknown tools"""
+        if name == "echo":
+            result = _text_result(arguments)
+        elif name == "add":
+            result = _text_result({"result": arguments.get("a", 0) + arguments.get("b", 0)})
+        elif name == "sleep":
+            ms = float(arguments.get("ms", 0))
+            time.sleep(ms / 1000)
+            result = _text_result({"slept_ms": ms})
+        elif name == "spin":
+            ms = float(arguments.get("ms", 0))
+            with _spin_lock:
+                deadline = time.perf_counter() + ms / 1000
+                while time.perf_counter() < deadline:
+                    pass
+            result = _text_result({"spun_ms": ms})
+        elif name == "payload":
+            return {"content": [{"type": "text", "text": "x" * int(arguments.get("bytes", self.payload_bytes))}]}
+        else:
+            raise ValueError(f"Unknown tool: {name}")
+        if self.payload_bytes:
+            padding = self.payload_bytes - len(result["content"][0]["text"])
+            if padding > 0:
+                result["content"].append({"type": "text", "text": "x" * padding})
+        return result
+
+    def handle_message(self, message):
+        """Answer one JSON-RPC message. Returns the response, or None for notifications."""
+        if "id" not in message:
+            return None
+        method = message.get("method")
+        params = message.get("params") or {}
+        try:
+            if method == "initialize":
+                result = {
+                    "protocolVersion": params.get("protocolVersion", PROTOCOL_VERSION),
+                    "capabilities": {"tools": {}},
+                    "serverInfo": {"name": "mcp-bridge-stub", "version": "1.0.0"}
+                }
+            elif method == "tools/list":
+                result = {"tools": TOOLS}
+            elif method in ("resources/list", "prompts/list"):
+                result = {method.split("/")[0]: []}
+            elif method == "ping":
+                result = {}
+            elif method == "tools/call":
+                failure, jitter = self._draw()
+                delay_ms = self.latency_ms + jitter * self.jitter_ms
+                if delay_ms > 0:
+                    time.sleep(delay_ms / 1000)
+                if failure < self.error_rate:
+                    if self.error_mode == "jsonrpc":
+                        return {"jsonrpc": "2.0", "id": message["id"],
+                                "error": {"code": -32000, "message": "Injected stub error"}}
+                    result = {"content": [{"type": "text", "text": "Injected stub error"}], "isError": True}
+                else:
+                    result = self.call_tool(params.get("name"), params.get("arguments") or {})
+            else:
+                return {"jsonrpc": "2.0", "id": message["id"],
+                        "error": {"code": -32601, "message": f"Method not found: {method}"}}
+        except ValueError as e:
+            return {"jsonrpc": "2.0", "id": message["id"], "error": {"code": -32602, "message": str(e)}}
+        return {"jsonrpc": "2.0", "id": message["id"], "result": result}
+
+    def chunks(self, data):
+        """Split an encoded response into the pieces written to the transport"""
+        if not self.chunk_bytes or len(data) <= self.chunk_bytes:
+            return [data]
+        return [data[i:i + self.chunk_bytes] for i in range(0, len(data), self.chunk_bytes)]
+
+    def write_chunked(self, write, data):
+        """Write `data` piece by piece, pausing chunk_delay_ms between pieces"""
+        for i, piece in enumerate(self.chunks(data)):
+            if i and self.chunk_delay_ms:
+                time.sleep(self.chunk_delay_ms / 1000)
+            write(piece)
+
+
+def serve_stdio(behavior):
+    """Serve newline-delimited JSON-RPC; requests run concurrently like a real server"""
+    write_lock = threading.Lock()
+    stdout = sys.stdout.buffer
+
+    def write(piece):
+        stdout.write(piece)
+        stdout.flush()
+
+    def respond(message):
+        response = behavior.handle_message(message)
+        if response is not None:
+            with write_lock:
+                behavior.write_chunked(write, (json.dumps(response) + "\n").encode("utf-8"))
+
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        threading.Thread(target=respond, args=(json.loads(line),), daemon=True).start()
+
+
+class SSESession:
+    """One open GET /sse stream; responses for its session id are written here"""
+
+    def __init__(self, wfile, behavior):
+        self.wfile = wfile
+        self.behavior = behavior
+        self.lock = threading.Lock()
+        self.closed = threading.Event()
+
+    def send(self, event, data):
+        self._write(f"event: {event}\ndata: {data}\n\n".encode("utf-8"))
+
+    def ping(self):
+        self._write(b": ping\n\n")
+
+    def _write(self, data):
+        with self.lock:
+            try:
+                self.behavior.write_chunked(self._write_piece, data)
+            except OSError:
+                self.closed.set()
+
+    def _write_piece(self, piece):
+        self.wfile.write(piece)
+        self.wfile.flush()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, like the servers the bridge talks to
+    disable_nagle_algorithm = True  # Headers and body go out as separate writes
+    behavior = None  # Set on the per-server subclass made by StubServer
+    sessions = None  # session id -> SSESession, per server
+
+    def log_message(self, format, *args):
+        pass  # Access logs would dominate the profile
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def _send(self, status, body=b"", content_type="application/json"):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        if len(self.behavior.chunks(body)) > 1:
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            self.behavior.write_chunked(self._write_http_chunk, body)
+            self.wfile.write(b"0\r\n\r\n")
+        else:
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    def _write_http_chunk(self, piece):
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(piece), piece))
+        self.wfile.flush()
+
+    def do_GET(self):
+        if urlparse(self.path).path != "/sse":
+            self._send(404, b'{"error": "not found"}')
+            return
+        session_id = uuid.uuid4().hex
+        session = SSESession(self.wfile, self.behavior)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        self.sessions[session_id] = session
+        session.send("endpoint", f"/messages?sessionId={session_id}")
+        try:
+            # Periodic comment lines notice clients that went away
+            while not session.closed.wait(15):
+                session.ping()
+        finally:
+            self.sessions.pop(session_id, None)
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        try:
+            message = self._read_json()
+        except json.JSONDecodeError:
+            self._send(400, b'{"error": "invalid JSON"}')
+            return
+
+        if url.path == "/messages":
+            session_id = parse_qs(url.query).get("sessionId", [None])[0]
+            session = self.sessions.get(session_id)
+            if session is None:
+                self._send(404, b'{"error": "unknown session"}')
+                return
+            self._send(202, b"Accepted", "text/plain")
+            response = self.behavior.handle_message(message)
+            if response is not None:
+                session.send("message", json.dumps(response))
+            return
+
+        if url.path not in ("/", "/mcp"):
+            self._send(404, b'{"error": "not found"}')
+            return
+        response = self.behavior.handle_message(message)
+        if response is None:
+            self._send(202)
+        else:
+            self._send(200, json.dumps(response).encode("utf-8"))
+
+
+class StubServer:
+    """Run the http or sse transport on a background thread of the current process.
+
+    Port 0 picks a free port; `url` is the address to put in a bridge config.
+    Keyword arguments are the behaviour knobs (latency_ms, error_rate, ...).
+    """
+
+    def __init__(self, transport="http", host="127.0.0.1", port=0, **options):
+        if transport not in ("http", "sse"):
+            raise ValueError("StubServer serves 'http' or 'sse'; stdio stubs run as a subprocess")
+        self.transport = transport
+        self.behavior = StubBehavior(**options)
+        handler = type("BoundStubHandler", (StubHandler,), {"behavior": self.behavior, "sessions": {}})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/{'sse' if self.transport == 'sse' else 'mcp'}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        # Open SSE streams end with their daemon threads; closing the socket stops new requests
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Stub MCP server for offline bridge benchmarks",
+        epilog="Each knob defaults to its STUB_* environment variable; see the module docstring."
+    )
+    parser.add_argument("--transport", choices=("stdio", "http", "sse"), default="stdio",
+                        help="Transport to serve (default: stdio)")
+    parser.add_argument("--host", default="127.0.0.1", help="Bind address for http/sse (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8931, help="Port for http/sse (default: 8931)")
+    parser.add_argument("--latency-ms", type=float, help="Fixed delay added to every tool call")
+    parser.add_argument("--jitter-ms", type=float, help="Random extra delay, uniform between 0 and this")
+    parser.add_argument("--payload-bytes", type=int, help="Pad tool results to this many bytes of text")
+    parser.add_argument("--error-rate", type=float, help="Fraction of tool calls that fail (0-1)")
+    parser.add_argument("--error-mode", choices=("jsonrpc", "tool"),
+                        help="Fail with a JSON-RPC error or with an isError tool result")
+    parser.add_argument("--chunk-bytes", type=int, help="Write responses in pieces of this many bytes")
+    parser.add_argument("--chunk-delay-ms", type=float, help="Pause between response pieces")
+    parser.add_argument("--seed", type=int, help="Random seed for jitter and injected errors")
+    args = parser.parse_args()
+
+    options = {name: getattr(args, name) for name in BEHAVIOR_OPTIONS}
+    if args.transport == "stdio":
+        serve_stdio(StubBehavior(**options))
+        return
+
+    # One HTTP server answers both transports; --transport only picks the advertised URL
+    stub = StubServer(args.transport, args.host, args.port, **options)
+    print(f"Stub MCP server listening on {stub.url}", file=sys.stderr, flush=True)
+    try:
+        stub.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stub.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
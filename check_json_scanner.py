@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+JSONObjectScanner Chunking Check
+
+Feeds LLM-style responses to llm_test.JSONObjectScanner whole and split into
+chunks, and checks that every split finds the same objects at the same offsets.
+Fixed cases cover braces in prose, code fences, escaped quotes and nested
+unclosed braces. Random cases embed generated JSON in prose that has stray
+braces on both sides, and check that the object is still found.
+
+Exits with status 1 on the first mismatch.
+"""
+
+import sys
+import json
+import random
+import argparse
+
+from llm_test import JSONObjectScanner
+
+CASES = [
+    'Sure! {"tool_call": {"server_id": "fs", "tool_name": "read", "parameters": {"path": "a  b.txt"}}, '
+    '"response": "Reading   the {file}"}',
+    'Here:\n```json\n{\n  "tool_call": null,\n  "response": "line1\nline2 with \\"quote\\" and }"\n}\n```\nThanks',
+    'I think {this} is prose. {"tool_call": null, "response": "ok"}',
+    'Unclosed { brace then {"tool_call": null, "response": "found"}',
+    '{"a": 1} then {"tool_call": {"server_id": "s", "tool_name": "t", "parameters": {}}}',
+    'no json at all',
+    '{"tool_call": null, "response": "escaped backslash \\\\"} trailing',
+    'x { a { "b": 1 } more { c {"d": 2} end',
+    '{ { { {"a": 1} { {"b": 2}',
+]
+
+
+def scan(chunks):
+    """Objects found in a sequence of chunks, as (value, start, end)"""
+    scanner = JSONObjectScanner()
+    for chunk in chunks:
+        scanner.feed(chunk)
+    scanner.finish()
+    return scanner.objects
+
+
+def splits(text, rng, random_splits):
+    """Fixed chunk sizes, then splits at random points"""
+    for size in range(1, 8):
+        yield [text[i:i + size] for i in range(0, len(text), size)]
+    for _ in range(random_splits):
+        points = sorted(rng.sample(range(1, len(text)), min(len(text) - 1, rng.randint(1, 10)))) if len(text) > 1 else []
+        bounds = [0] + points + [len(text)]
+        yield [text[a:b] for a, b in zip(bounds, bounds[1:])]
+
+
+def random_value(rng, depth=0):
+    kind = rng.randint(0, 5 if depth < 3 else 3)
+    if kind == 0:
+        return rng.randint(-5, 5)
+    if kind == 1:
+        return "".join(rng.choice('ab{}"\\\n ') for _ in range(rng.randint(0, 6)))
+    if kind == 2:
+        return None
+    if kind == 3:
+        return [random_value(rng, depth + 1) for _ in range(rng.randint(0, 3))]
+    return {f"k{i}": random_value(rng, depth + 1) for i in range(rng.randint(0, 3))}
+
+
+def check(text, rng, random_splits):
+    whole = scan([text])
+    for chunks in splits(text, rng, random_splits):
+        found = scan(chunks)
+        if found != whole:
+            print(f"Mismatch for {text!r}\n  chunks: {chunks!r}\n  whole:   {whole!r}\n  chunked: {found!r}")
+            return None
+    return whole
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check that JSONObjectScanner finds the same objects however its input is split')
+    parser.add_argument('--cases', type=int, default=3000, help='Number of random cases (default: 3000)')
+    parser.add_argument('--splits', type=int, default=20, help='Random splits tried per case (default: 20)')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed (default: 1)')
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    expected = {
+        CASES[7]: [{"b": 1}, {"d": 2}],
+        CASES[8]: [{"a": 1}, {"b": 2}],
+    }
+    for text in CASES:
+        found = check(text, rng, args.splits)
+        if found is None:
+            sys.exit(1)
+        if text in expected and [value for value, _, _ in found] != expected[text]:
+            print(f"Wrong objects for {text!r}: {found!r}")
+            sys.exit(1)
+
+    for _ in range(args.cases):
+        obj = {"x": random_value(rng)}
+        text = "pre } text " + json.dumps(obj, indent=rng.choice([None, 2])) + " post {"
+        found = check(text, rng, args.splits)
+        if found is None:
+            sys.exit(1)
+        if not found or found[-1][0] != obj:
+            print(f"Object not found in {text!r}: {found!r}")
+            sys.exit(1)
+
+    print(f"OK: {len(CASES)} fixed and {args.cases} random cases give the same objects at every split")
+
+
+if __name__ == '__main__':
+    main()
@@ -7,7 +7,78 @@ Demonstrates how to connect to and use the MCP Bridge API from your own platform
 import requests
 import json
 import time
-from typing import Dict, List, Optional
+import asyncio
+import urllib.parse
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple, Union
+
+try:
+    import aiohttp
+except ImportError:  # Only required by AsyncMCPBridgeClient
+    aiohttp = None
+
+# A tool call for execute_many()/execute_batch(): (server_id, tool_name, parameters) or a dict
+# with "server_id", "tool_name" and optional "arguments"/"parameters" keys
+ToolCall = Union[Tuple[str, str, Optional[Dict]], Dict[str, Any]]
+
+
+def _normalize_tool_call(call: ToolCall) -> Dict[str, Any]:
+    """Turn a ToolCall into the {server_id, tool_name, arguments} shape the bridge uses"""
+    if isinstance(call, dict):
+        return {
+            "server_id": call["server_id"],
+            "tool_name": call["tool_name"],
+            "arguments": call.get("arguments", call.get("parameters")) or {}
+        }
+    server_id, tool_name, parameters = call
+    return {"server_id": server_id, "tool_name": tool_name, "arguments": parameters or {}}
+
+
+JOB_FINISHED_STATUSES = ("COMPLETED", "FAILED")
+
+
+def _job_payload(tool_name: str, parameters: Optional[Dict], server_id: Optional[str],
+                 priority: str, callback_url: Optional[str]) -> Dict[str, Any]:
+    """Build a /tool/execute body; tool arguments sit at the top level next to tool_name"""
+    payload = dict(parameters or {})
+    payload["tool_name"] = tool_name
+    payload["job_priority"] = priority
+    if server_id:
+        payload["server_id"] = server_id
+    if callback_url:
+        payload["callback_url"] = callback_url
+    return payload
+
+
+def _parse_sse_data(lines: List[str]) -> Optional[Dict]:
+    """Decode the data: lines of one Server-Sent Event"""
+    data = "\n".join(line[5:].lstrip() for line in lines if line.startswith("data:"))
+    return json.loads(data) if data else None
+
+
+async def _aiter_lines(stream) -> AsyncIterator[bytes]:
+    """Yield the lines of an aiohttp response body without their line endings.
+    
+    Split by hand: aiohttp's own line iterator rejects lines over 512 KB,
+    and a single NDJSON event or SSE data: line can be larger than that.
+    """
+    buffer = b""
+    async for chunk in stream.iter_any():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line.rstrip(b"\r")
+    if buffer:
+        yield buffer.rstrip(b"\r")
+
+
+def merge_stream_content(content: List[Dict], event: Dict) -> None:
+    """Add a streamed content event to `content`, joining the pieces of split text items"""
+    item, index = event["content"], event["index"]
+    if index < len(content):
+        content[index] = dict(content[index], text=content[index]["text"] + item["text"])
+    else:
+        content.append(dict(item))
+
 
 class MCPBridgeClient:
     """Simple client for interacting with the MCP Bridge API"""
@@ -79,6 +150,60 @@ class MCPBridgeClient:
         response.raise_for_status()
         return response.json()
     
+    def execute_batch(self, calls: Iterable[ToolCall], chunk_size: int = 100) -> List[Dict]:
+        """Execute many tool calls through the bridge's batch endpoint.
+        
+        Calls are sent in chunks of at most `chunk_size` (keep it at or below the
+        bridge's BATCH_MAX_CALLS). Returns one entry per call, in input order, each
+        with "success" and either "result" or "error".
+        """
+        items = [_normalize_tool_call(call) for call in calls]
+        results = []
+        for start in range(0, len(items), chunk_size):
+            chunk = items[start:start + chunk_size]
+            response = self.session.post(f"{self.base_url}/tools/batch", json={"calls": chunk})
+            response.raise_for_status()
+            for item in response.json().get("results", []):
+                item["index"] = start + item.get("index", 0)
+                results.append(item)
+        return results
+    
+    def stream_tool(self, server_id: str, tool_name: str, parameters: Dict = None) -> Iterable[Dict]:
+        """Execute a tool and yield its streamed events as they arrive.
+        
+        Events are dicts with a "type" of progress, content, result or error;
+        see AsyncMCPBridgeClient.stream_tool() for the details.
+        """
+        with self.session.post(
+            f"{self.base_url}/servers/{server_id}/tools/{tool_name}",
+            params={"stream": "ndjson"},
+            json=parameters or {},
+            stream=True
+        ) as response:
+            response.raise_for_status()
+            for line in response.iter_lines(decode_unicode=True):
+                if line:
+                    yield json.loads(line)
+    
+    def execute_tool_streaming(self, server_id: str, tool_name: str, parameters: Dict = None,
+                               on_progress=None) -> Dict:
+        """Execute a tool over the streaming endpoint and return the assembled result.
+        
+        on_progress, if given, is called with each progress event.
+        """
+        content: List[Dict] = []
+        result: Dict = {}
+        for event in self.stream_tool(server_id, tool_name, parameters):
+            if event["type"] == "progress" and on_progress:
+                on_progress(event)
+            elif event["type"] == "content":
+                merge_stream_content(content, event)
+            elif event["type"] == "result":
+                result = event["result"]
+            elif event["type"] == "error":
+                raise RuntimeError(event["error"])
+        return {**result, "content": content}
+    
     def get_resources(self, server_id: str) -> List[Dict]:
         """Get all available resources for a specific server"""
         response = self.session.get(f"{self.base_url}/servers/{server_id}/resources")
@@ -88,7 +213,6 @@ class MCPBridgeClient:
     def read_resource(self, server_id: str, resource_uri: str) -> Dict:
         """Read a specific resource"""
         # URL encode the resource URI
-        import urllib.parse
         encoded_uri = urllib.parse.quote(resource_uri, safe='')
         
         response = self.session.get(f"{self.base_url}/servers/{server_id}/resources/{encoded_uri}")
@@ -112,6 +236,268 @@ class MCPBridgeClient:
         )
         response.raise_for_status()
         return response.json()
+    
+    def submit_job(self, tool_name: str, parameters: Dict = None, server_id: str = None,
+                   priority: str = "normal", callback_url: str = None) -> Dict:
+        """Queue a tool call as a background job. The response carries job_id and bearer_token."""
+        response = self.session.post(
+            f"{self.base_url}/tool/execute",
+            json=_job_payload(tool_name, parameters, server_id, priority, callback_url)
+        )
+        response.raise_for_status()
+        return response.json()
+    
+    def wait_for_result(self, job_id: str, bearer_token: str, timeout: float = 600.0,
+                        poll_wait: int = 30) -> Dict:
+        """Block until a job finishes and return its final status body.
+        
+        Follows the job's event stream when the bridge offers one, otherwise
+        long-polls /results with ?wait=. Against older bridges that answer polls
+        straight away it sleeps for the advertised retry_after between polls.
+        Raises TimeoutError if the job is still running after `timeout` seconds.
+        """
+        deadline = time.monotonic() + timeout
+        headers = {"Authorization": f"Bearer {bearer_token}"}
+        
+        try:
+            result = self._follow_job_events(job_id, headers, deadline)
+            if result is not None:
+                return result
+        except requests.RequestException:
+            pass  # Fall back to polling
+        
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"Job {job_id} did not finish within {timeout} seconds")
+            wait = max(1, int(min(poll_wait, remaining)))
+            started = time.monotonic()
+            response = self.session.post(
+                f"{self.base_url}/results/{job_id}",
+                params={"wait": wait},
+                headers=headers,
+                timeout=wait + 30
+            )
+            body = response.json() if response.status_code == 500 else None
+            if not body or "status" not in body:
+                # A FAILED job is reported as a 500 with its status body
+                response.raise_for_status()
+                body = response.json()
+            if body.get("status") in JOB_FINISHED_STATUSES:
+                return body
+            if time.monotonic() - started < wait / 2:
+                # The bridge ignored ?wait=, so poll at the pace it asks for
+                time.sleep(min(max(body.get("retry_after") or 1, 1), max(remaining, 0)))
+    
+    def _follow_job_events(self, job_id: str, headers: Dict, deadline: float) -> Optional[Dict]:
+        """Read /results/{job_id}/events until the job finishes; None if no stream is available"""
+        with self.session.get(f"{self.base_url}/results/{job_id}/events", headers=headers,
+                              stream=True, timeout=(10, 60)) as response:
+            if (response.status_code != 200
+                    or not response.headers.get("Content-Type", "").startswith("text/event-stream")):
+                return None
+            event_lines = []
+            for line in response.iter_lines(decode_unicode=True):
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"Job {job_id} did not finish in time")
+                if line:
+                    event_lines.append(line)
+                    continue
+                event = _parse_sse_data(event_lines)
+                event_lines = []
+                if event and event.get("status") in JOB_FINISHED_STATUSES:
+                    return event
+        return None
+
+
+
+class AsyncMCPBridgeClient:
+    """Asyncio client for the MCP Bridge API, built for high call throughput.
+
+    Requests share one keep-alive connection pool that is bounded both in total
+    and per bridge host, and execute_many() fans tool calls out concurrently.
+    Use it as an async context manager, or call close() when finished.
+    """
+    
+    def __init__(self, base_url: str = "http://localhost:3000",
+                 max_connections: int = 100, max_connections_per_host: int = 100,
+                 max_concurrency: int = 100, keepalive_timeout: float = 30.0,
+                 timeout: float = 6000.0):
+        if aiohttp is None:
+            raise ImportError("AsyncMCPBridgeClient requires aiohttp: pip install aiohttp")
+        self.base_url = base_url.rstrip('/')
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = timeout
+        # Caps the number of requests in flight; anything above it waits here
+        # instead of piling up inside the connection pool
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._session = None
+    
+    async def __aenter__(self):
+        self._get_session()
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+    
+    def _get_session(self):
+        """Create the shared session lazily, inside the running event loop"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                limit_per_host=self.max_connections_per_host,
+                keepalive_timeout=self.keepalive_timeout
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+        return self._session
+    
+    async def close(self):
+        """Close the connection pool"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+    
+    async def _request(self, method: str, path: str, payload: Optional[Dict] = None) -> Any:
+        session = self._get_session()
+        async with self._semaphore:
+            async with session.request(method, f"{self.base_url}{path}", json=payload) as response:
+                response.raise_for_status()
+                return await response.json()
+    
+    async def health_check(self) -> Dict:
+        """Check the health status of the MCP Bridge"""
+        return await self._request("GET", "/health")
+    
+    async def get_servers(self) -> List[Dict]:
+        """Get all connected MCP servers"""
+        data = await self._request("GET", "/servers")
+        return data.get("servers", [])
+    
+    async def get_tools(self, server_id: str) -> List[Dict]:
+        """Get all available tools for a specific server"""
+        data = await self._request("GET", f"/servers/{server_id}/tools")
+        return data.get("tools", [])
+    
+    async def execute_tool(self, server_id: str, tool_name: str, parameters: Dict = None) -> Dict:
+        """Execute a tool on a specific server"""
+        return await self._request(
+            "POST", f"/servers/{server_id}/tools/{tool_name}", parameters or {}
+        )
+    
+    async def read_resource(self, server_id: str, resource_uri: str) -> Dict:
+        """Read a specific resource"""
+        encoded_uri = urllib.parse.quote(resource_uri, safe='')
+        return await self._request("GET", f"/servers/{server_id}/resources/{encoded_uri}")
+    
+    async def execute_prompt(self, server_id: str, prompt_name: str, arguments: Dict = None) -> Dict:
+        """Execute a prompt on a specific server"""
+        return await self._request(
+            "POST", f"/servers/{server_id}/prompts/{prompt_name}", arguments or {}
+        )
+    
+    async def execute_many(self, calls: Iterable[ToolCall],
+                           return_exceptions: bool = True) -> List[Any]:
+        """Execute many tool calls concurrently.
+        
+        Results come back in the same order as `calls`. With return_exceptions
+        (the default) a failed call yields its exception in place of a result
+        instead of cancelling the rest of the batch.
+        """
+        tasks = []
+        for call in calls:
+            call = _normalize_tool_call(call)
+            tasks.append(self.execute_tool(call["server_id"], call["tool_name"], call["arguments"]))
+        return await asyncio.gather(*tasks, return_exceptions=return_exceptions)
+    
+    async def stream_tool(self, server_id: str, tool_name: str,
+                          parameters: Dict = None) -> AsyncIterator[Dict]:
+        """Execute a tool and yield its streamed events as they arrive.
+        
+        Each event is a dict whose "type" is one of:
+          progress - {"progress", "total", "message"} from the server's progress notifications
+          content  - {"index", "content"}: one result content item. Long text items arrive
+                     in several pieces with "partial": True on all but the last
+          result   - {"result"}: the rest of the tool result, e.g. isError
+          error    - {"error"}: the call failed
+        """
+        session = self._get_session()
+        async with self._semaphore:
+            async with session.post(
+                f"{self.base_url}/servers/{server_id}/tools/{tool_name}",
+                params={"stream": "ndjson"},
+                json=parameters or {}
+            ) as response:
+                response.raise_for_status()
+                async for line in _aiter_lines(response.content):
+                    if line.strip():
+                        yield json.loads(line)
+    
+    async def submit_job(self, tool_name: str, parameters: Dict = None, server_id: str = None,
+                         priority: str = "normal", callback_url: str = None) -> Dict:
+        """Queue a tool call as a background job. The response carries job_id and bearer_token."""
+        return await self._request(
+            "POST", "/tool/execute",
+            _job_payload(tool_name, parameters, server_id, priority, callback_url)
+        )
+    
+    async def wait_for_result(self, job_id: str, bearer_token: str, timeout: float = 600.0,
+                              poll_wait: int = 30) -> Dict:
+        """Wait for a job to finish and return its final status body.
+        
+        Same strategy as MCPBridgeClient.wait_for_result(): event stream first,
+        then ?wait= long-polls, then plain polling for older bridges.
+        """
+        return await asyncio.wait_for(
+            self._wait_for_result(job_id, {"Authorization": f"Bearer {bearer_token}"}, poll_wait),
+            timeout
+        )
+    
+    async def _wait_for_result(self, job_id: str, headers: Dict, poll_wait: int) -> Dict:
+        session = self._get_session()
+        try:
+            result = await self._follow_job_events(session, job_id, headers)
+            if result is not None:
+                return result
+        except (aiohttp.ClientError, ValueError):
+            pass  # Stream failed or was cut off mid-event; fall back to polling
+        
+        while True:
+            started = time.monotonic()
+            async with session.post(f"{self.base_url}/results/{job_id}",
+                                    params={"wait": str(poll_wait)}, headers=headers) as response:
+                body = await response.json(content_type=None) if response.status == 500 else None
+                if not body or "status" not in body:
+                    # A FAILED job is reported as a 500 with its status body
+                    response.raise_for_status()
+                    body = await response.json()
+            if body.get("status") in JOB_FINISHED_STATUSES:
+                return body
+            if time.monotonic() - started < poll_wait / 2:
+                # The bridge ignored ?wait=, so poll at the pace it asks for
+                await asyncio.sleep(max(body.get("retry_after") or 1, 1))
+    
+    async def _follow_job_events(self, session, job_id: str, headers: Dict) -> Optional[Dict]:
+        """Read /results/{job_id}/events until the job finishes; None if no stream is available"""
+        async with session.get(f"{self.base_url}/results/{job_id}/events", headers=headers) as response:
+            if response.status != 200 or response.content_type != "text/event-stream":
+                return None
+            event_lines = []
+            async for raw_line in _aiter_lines(response.content):
+                line = raw_line.decode("utf-8")
+                if line:
+                    event_lines.append(line)
+                    continue
+                event = _parse_sse_data(event_lines)
+                event_lines = []
+                if event and event.get("status") in JOB_FINISHED_STATUSES:
+                    return event
+        return None
+
 
 def demonstrate_api():
     """Demonstrate all MCP Bridge API capabilities"""
@@ -15,10 +15,17 @@ This version supports:
 """
 
 import os
+import re
 import json
+import math
+import time
+import queue
+import hashlib
 import requests
+import threading
 import argparse
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 import google.generativeai as genai
 from google.generativeai import GenerativeModel
 from rich.console import Console
@@ -27,10 +34,17 @@ from rich.panel import Panel
 from rich.prompt import Confirm
 from rich.syntax import Syntax
 
+from example_client import merge_stream_content
+
 # Default configuration
 DEFAULT_MCP_BRIDGE_URL = "http://localhost:3000"  # Default URL for MCP Bridge
 GEMINI_API_KEY = os.environ.get("GEMINI_API_KEY")
 GEMINI_MODEL = "gemini-2.5-pro-preview-05-06"  # Use the appropriate model as needed
+CATALOG_SNAPSHOT_PATH = os.path.join(os.path.expanduser("~"), ".cache", "mcp-gemini-agent", "catalogs.json")
+DISCOVERY_TIMEOUT = 3.0  # Seconds to wait for tool catalogs before starting with the ones that arrived
+TOOL_TOKEN_BUDGET = 4000  # Above this many tokens of tool descriptions, send only the relevant ones each turn
+TOOL_TOP_K = 15  # Most tools described per turn when ranking
+AGENT_SERVER_ID = "agent"  # server_id of the agent's own describe_tools call
 
 console = Console()
 
@@ -82,6 +96,18 @@ Examples:
   
   # Adjust JSON width display for better formatting
   python llm_test.py --json-width 120
+  
+  # Show tool progress while long-running tools execute
+  python llm_test.py --stream
+  
+  # Start tool calls while Gemini is still writing its reply
+  python llm_test.py --stream-model
+  
+  # Fetch every tool catalog again instead of revalidating the saved snapshot
+  python llm_test.py --no-catalog-cache
+  
+  # Describe at most 10 relevant tools (and 2000 tokens of them) per message
+  python llm_test.py --top-k 10 --tool-budget 2000
 
 For more information, visit: https://github.com/INQUIRELAB/mcp-bridge-api
 """
@@ -99,6 +125,47 @@ For more information, visit: https://github.com/INQUIRELAB/mcp-bridge-api
         type=int,
         help="Override port in MCP Bridge URL (default: use port from --mcp-url)"
     )
+    connection_group.add_argument(
+        "--stream",
+        action="store_true",
+        help="Stream tool results from the bridge and show progress while tools run"
+    )
+    connection_group.add_argument(
+        "--stream-model",
+        action="store_true",
+        help="Stream Gemini's replies and start each tool call as soon as it has arrived, reporting time to first tool call"
+    )
+    connection_group.add_argument(
+        "--discovery-timeout",
+        type=float,
+        default=DISCOVERY_TIMEOUT,
+        help=f"Seconds to wait for tool catalogs before starting; slower servers are added when they answer (default: {DISCOVERY_TIMEOUT})"
+    )
+    connection_group.add_argument(
+        "--catalog-cache",
+        type=str,
+        default=CATALOG_SNAPSHOT_PATH,
+        help=f"File the tool catalogs are saved to between runs (default: {CATALOG_SNAPSHOT_PATH})"
+    )
+    connection_group.add_argument(
+        "--no-catalog-cache",
+        action="store_true",
+        help="Don't read or write the tool catalog snapshot"
+    )
+    
+    prompt_group = parser.add_argument_group('Prompt Options', 'Configure how tools are described to the LLM')
+    prompt_group.add_argument(
+        "--tool-budget",
+        type=int,
+        default=TOOL_TOKEN_BUDGET,
+        help=f"Describe every tool up front if that fits in this many tokens, else only the relevant ones each turn (default: {TOOL_TOKEN_BUDGET})"
+    )
+    prompt_group.add_argument(
+        "--top-k",
+        type=int,
+        default=TOOL_TOP_K,
+        help=f"Most tools described with each message when ranking (default: {TOOL_TOP_K})"
+    )
     
     display_group = parser.add_argument_group('Display Options', 'Configure how information is displayed')
     display_group.add_argument(
@@ -163,27 +230,155 @@ def get_all_servers(mcp_bridge_url):
         console.print(f"[bold red]Error getting servers:[/bold red] {e}")
         return []
 
-def get_server_tools(server_id, mcp_bridge_url):
-    """Get all tools for a specific server."""
+def get_server_tools(server_id, mcp_bridge_url, etag=None):
+    """Get all tools for a specific server.
+    
+    Returns (tools, etag). When `etag` still matches, the bridge answers
+    304 Not Modified and tools is None; on errors both are None.
+    """
+    headers = {"If-None-Match": etag} if etag else {}
     try:
-        response = requests.get(f"{mcp_bridge_url}/servers/{server_id}/tools", timeout=30)
+        response = requests.get(f"{mcp_bridge_url}/servers/{server_id}/tools", headers=headers, timeout=30)
+        if response.status_code == 304:
+            return None, etag
         response.raise_for_status()
-        return response.json().get("tools", [])
+        return response.json().get("tools", []), response.headers.get("ETag")
     except requests.RequestException as e:
         console.print(f"[bold red]Error getting tools for server {server_id}:[/bold red] {e}")
-        return []
+        return None, None
+
+def catalog_hash(tools):
+    """Hash a tool list, for bridges that don't send an ETag."""
+    return hashlib.sha256(json.dumps(tools, sort_keys=True).encode("utf-8")).hexdigest()
+
+def load_catalog_snapshot(path, mcp_bridge_url):
+    """Read the catalogs a previous run saved for this bridge: {server_id: {etag, hash, tools}}."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f).get(mcp_bridge_url, {})
+    except (OSError, ValueError):
+        return {}
+
+def save_catalog_snapshot(path, mcp_bridge_url, catalogs):
+    """Save this bridge's catalogs, keeping the ones saved for other bridges."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            snapshot = json.load(f)
+    except (OSError, ValueError):
+        snapshot = {}
+    snapshot[mcp_bridge_url] = catalogs
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        console.print(f"[yellow]Could not save tool catalog snapshot to {path}:[/yellow] {e}")
 
-def get_all_tools(mcp_bridge_url):
-    """Get all tools from all servers."""
-    servers = get_all_servers(mcp_bridge_url)
-    all_tools = {}
+class ToolDiscovery:
+    """Fetch every server's tool catalog concurrently.
     
-    for server in servers:
-        server_id = server["id"]
-        tools = get_server_tools(server_id, mcp_bridge_url)
-        all_tools[server_id] = tools
+    Catalogs saved by the previous run are revalidated with their ETag, so
+    only servers whose tools changed are downloaded again. Servers that have
+    not answered by the timeout start from their saved catalog, or are left
+    out, and `updates()` hands over their tools once they arrive.
+    """
     
-    return all_tools
+    def __init__(self, mcp_bridge_url, snapshot_path=CATALOG_SNAPSHOT_PATH):
+        self.mcp_bridge_url = mcp_bridge_url
+        self.snapshot_path = snapshot_path
+        self.snapshot = load_catalog_snapshot(snapshot_path, mcp_bridge_url) if snapshot_path else {}
+        self.server_ids = []
+        self.pending = set()
+        self.catalogs = {}  # server_id -> {etag, hash, tools} fetched or revalidated in this run
+        self.shown = {}  # server_id -> hash of the tools the model was given
+        self.arrived = queue.Queue()
+    
+    def start(self):
+        self.server_ids = [server["id"] for server in get_all_servers(self.mcp_bridge_url)]
+        for server_id in self.server_ids:
+            self.pending.add(server_id)
+            # Daemon threads, so a hung server can't keep the agent from exiting
+            threading.Thread(target=self._fetch, args=(server_id,), daemon=True).start()
+        return self
+    
+    def _fetch(self, server_id):
+        cached = self.snapshot.get(server_id)
+        tools, etag = get_server_tools(server_id, self.mcp_bridge_url, etag=cached and cached.get("etag"))
+        if tools is not None:
+            entry = {"etag": etag, "hash": catalog_hash(tools), "tools": tools}
+        elif etag is not None:
+            entry = cached  # Not modified
+        else:
+            entry = None
+        self.arrived.put((server_id, entry))
+    
+    def _collect(self, timeout):
+        """Take the catalogs that arrive within `timeout` seconds; saves the snapshot if any did."""
+        deadline = time.monotonic() + timeout
+        received = False
+        while self.pending:
+            try:
+                server_id, entry = self.arrived.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                break
+            self.pending.discard(server_id)
+            if entry is not None:
+                self.catalogs[server_id] = entry
+                received = True
+        if received and self.snapshot_path:
+            saved = {server_id: self.catalogs.get(server_id) or self.snapshot.get(server_id)
+                     for server_id in self.server_ids}
+            save_catalog_snapshot(self.snapshot_path, self.mcp_bridge_url,
+                                  {server_id: entry for server_id, entry in saved.items() if entry})
+    
+    def initial_tools(self, timeout=DISCOVERY_TIMEOUT):
+        """Tools by server after waiting at most `timeout` seconds."""
+        self._collect(timeout)
+        all_tools = {}
+        for server_id in self.server_ids:
+            entry = self.catalogs.get(server_id) or self.snapshot.get(server_id)
+            if entry:
+                all_tools[server_id] = entry["tools"]
+                self.shown[server_id] = entry["hash"]
+            elif server_id not in self.pending:
+                all_tools[server_id] = []  # Failed without a saved catalog
+        return all_tools
+    
+    def updates(self):
+        """Catalogs that arrived since the last call and differ from what the model was given."""
+        self._collect(0)
+        changed = {}
+        for server_id, entry in self.catalogs.items():
+            if self.shown.get(server_id) != entry["hash"]:
+                changed[server_id] = entry["tools"]
+                self.shown[server_id] = entry["hash"]
+        return changed
+
+def get_all_tools(mcp_bridge_url, snapshot_path=None, timeout=30):
+    """Get all tools from all servers, fetched concurrently."""
+    return ToolDiscovery(mcp_bridge_url, snapshot_path).start().initial_tools(timeout)
+
+def create_tool_description(tool):
+    """Describe one tool: name, description and parameters."""
+    description = f"### {tool['name']}\n"
+    description += f"Description: {tool.get('description', 'No description')}\n"
+    
+    # Add input schema information if available
+    if "inputSchema" in tool:
+        description += "Parameters:\n"
+        if "properties" in tool["inputSchema"]:
+            for param, details in tool["inputSchema"]["properties"].items():
+                param_type = details.get("type", "any")
+                param_desc = details.get("description", "")
+                description += f"- {param} ({param_type}): {param_desc}\n"
+        
+        # Add required parameters if available
+        if "required" in tool["inputSchema"]:
+            description += f"Required parameters: {', '.join(tool['inputSchema']['required'])}\n"
+    
+    return description + "\n"
 
 def create_tools_description(all_tools):
     """Create a description of all available tools for the system instruction."""
@@ -193,29 +388,123 @@ def create_tools_description(all_tools):
         tools_description += f"## Server: {server_id}\n\n"
         
         for tool in tools:
-            tools_description += f"### {tool['name']}\n"
-            tools_description += f"Description: {tool.get('description', 'No description')}\n"
-            
-            # Add input schema information if available
-            if "inputSchema" in tool:
-                tools_description += "Parameters:\n"
-                if "properties" in tool["inputSchema"]:
-                    for param, details in tool["inputSchema"]["properties"].items():
-                        param_type = details.get("type", "any")
-                        param_desc = details.get("description", "")
-                        tools_description += f"- {param} ({param_type}): {param_desc}\n"
-                
-                # Add required parameters if available
-                if "required" in tool["inputSchema"]:
-                    tools_description += f"Required parameters: {', '.join(tool['inputSchema']['required'])}\n"
-            
-            tools_description += "\n"
+            tools_description += create_tool_description(tool)
     
     return tools_description
 
-def create_system_instruction(all_tools):
-    """Create a system instruction for Gemini that includes all available tools."""
-    tools_description = create_tools_description(all_tools)
+def create_tool_names_list(all_tools):
+    """List tool names by server, one line per server."""
+    return "\n".join(f"- {server_id}: {', '.join(tool['name'] for tool in tools)}"
+                     for server_id, tools in all_tools.items() if tools)
+
+def estimate_tokens(text):
+    """Rough token count: about four characters per token."""
+    return len(text) // 4 + 1
+
+def tokenize(text):
+    """Lowercase words of a text, with camelCase and snake_case names split apart."""
+    return re.findall(r"[a-z0-9]+", re.sub(r"([a-z0-9])([A-Z])", r"\1 \2", text).lower())
+
+class ToolIndex:
+    """BM25 index over tool names, descriptions and parameter docs.
+    
+    Built once per catalog version; `search()` ranks the tools against a
+    message and `find()` looks tools up by name for describe_tools calls.
+    """
+    
+    K1 = 1.5
+    B = 0.75
+    
+    def __init__(self, all_tools):
+        self.tools = []  # (server_id, tool, description)
+        self.postings = {}  # term -> [(tool number, term frequency)]
+        lengths = []
+        for server_id, tools in all_tools.items():
+            for tool in tools:
+                description = create_tool_description(tool)
+                # The name counts twice: it is the best summary of what a tool does
+                terms = tokenize(f"{tool['name']} {tool['name']} {server_id} {description}")
+                counts = {}
+                for term in terms:
+                    counts[term] = counts.get(term, 0) + 1
+                for term, count in counts.items():
+                    self.postings.setdefault(term, []).append((len(self.tools), count))
+                self.tools.append((server_id, tool, description))
+                lengths.append(len(terms))
+        self.lengths = lengths
+        self.average_length = sum(lengths) / len(lengths) if lengths else 0
+        self.idf = {term: math.log(1 + (len(self.tools) - len(docs) + 0.5) / (len(docs) + 0.5))
+                    for term, docs in self.postings.items()}
+    
+    def search(self, text, top_k=TOOL_TOP_K, token_budget=TOOL_TOKEN_BUDGET):
+        """The best matching tools, at most top_k of them and token_budget tokens of descriptions."""
+        scores = {}
+        for term in set(tokenize(text)):
+            for number, count in self.postings.get(term, ()):
+                norm = self.K1 * (1 - self.B + self.B * self.lengths[number] / self.average_length)
+                scores[number] = scores.get(number, 0) + self.idf[term] * count * (self.K1 + 1) / (count + norm)
+        
+        selected, used = [], 0
+        for number in sorted(scores, key=scores.get, reverse=True):
+            server_id, tool, description = self.tools[number]
+            cost = estimate_tokens(description)
+            if used + cost > token_budget:
+                continue
+            selected.append((server_id, tool))
+            used += cost
+            if len(selected) >= top_k:
+                break
+        return selected
+    
+    def find(self, names):
+        """Tools called `name` or `server_id/name`; also returns the names that matched nothing."""
+        found, missing = [], []
+        for name in names:
+            matches = [(server_id, tool) for server_id, tool, _ in self.tools
+                       if name in (tool["name"], f"{server_id}/{tool['name']}")]
+            found.extend(matches)
+            if not matches:
+                missing.append(name)
+        return found, missing
+
+def group_tools(selected):
+    """Turn [(server_id, tool)] back into {server_id: [tools]}."""
+    grouped = {}
+    for server_id, tool in selected:
+        grouped.setdefault(server_id, []).append(tool)
+    return grouped
+
+def describe_requested_tools(tool_index, names, described):
+    """Answer a describe_tools call from the model and remember what it was shown."""
+    found, missing = tool_index.find([str(name) for name in names])
+    described.update(f"{server_id}/{tool['name']}" for server_id, tool in found)
+    feedback = create_tools_description(group_tools(found)) if found else "No matching tools."
+    if missing:
+        feedback += f"\nNo tools are called: {', '.join(missing)}"
+    return feedback
+
+def tools_fit_budget(all_tools, token_budget):
+    """Whether describing every tool up front fits in the token budget."""
+    return estimate_tokens(create_tools_description(all_tools)) <= token_budget
+
+def create_system_instruction(all_tools, ranked=False):
+    """Create a system instruction for Gemini that includes the available tools.
+    
+    With `ranked`, only tool names are listed here; each user message then
+    brings the descriptions of the tools relevant to it.
+    """
+    if ranked:
+        tool_count = sum(len(tools) for tools in all_tools.values())
+        tools_section = f"""There are {tool_count} tools across {len(all_tools)} servers, too many to describe here.
+Each user message starts with the descriptions of the tools most relevant to it.
+Only call tools whose parameters you have seen described. To see other tools, use this tool_call:
+{{"server_id": "{AGENT_SERVER_ID}", "tool_name": "describe_tools", "parameters": {{"names": ["tool_name", "server_id/tool_name"]}}}}
+
+Tool names by server:
+
+{create_tool_names_list(all_tools)}"""
+    else:
+        tools_section = f"Here's information about all the tools you can use:\n\n{create_tools_description(all_tools)}"
     
     system_instruction = f"""
 You are an AI assistant that uses available MCP tools to help users accomplish tasks.
@@ -232,11 +521,16 @@ When responding, you must ALWAYS return answers in the following JSON format:
 If you need to use a tool, fill in the server_id, tool_name, and parameters fields.
 If you don't need to use a tool, set server_id, tool_name, and parameters to null.
 
-Your response field should always contain your message to the user.
+If you need several tools whose calls don't depend on each other's results, set "tool_call"
+to null and list them all in "tool_calls" instead; they run at the same time and their results
+come back together in one message:
+  "tool_calls": [{{"server_id": "...", "tool_name": "...", "parameters": {{}}}}, ...]
+Calls that need an earlier call's result must wait for the next turn.
+Always write "tool_call" and "tool_calls" before "response".
 
-Here's information about all the tools you can use:
+Your response field should always contain your message to the user.
 
-{tools_description}
+{tools_section}
 
 When a user asks for something that requires using these tools:
 1. Figure out which tool is most appropriate
@@ -244,7 +538,7 @@ When a user asks for something that requires using these tools:
 3. Make your response helpful and conversational
 
 When you receive feedback about a tool execution:
-1. If you need to make another tool call based on the previous result, include it in your tool_call
+1. If you need to make more tool calls based on the previous results, include them in tool_call or tool_calls
 2. If no more calls are needed, set server_id, tool_name, and parameters to null
 3. Provide a helpful message about the final result in the response field
 
@@ -262,8 +556,37 @@ If a tool execution returns a result containing "requires_confirmation": true, y
     
     return system_instruction.strip()
 
-def execute_tool(server_id, tool_name, parameters, mcp_bridge_url):
+def execute_tool_streaming(server_id, tool_name, parameters, mcp_bridge_url):
+    """Execute a tool through the bridge's NDJSON stream, printing progress as it arrives."""
+    url = f"{mcp_bridge_url}/servers/{server_id}/tools/{tool_name}"
+    content = []
+    result = {}
+    try:
+        with requests.post(url, params={"stream": "ndjson"}, json=parameters,
+                           stream=True, timeout=6000) as response:
+            response.raise_for_status()
+            for line in response.iter_lines(decode_unicode=True):
+                if not line:
+                    continue
+                event = json.loads(line)
+                if event["type"] == "progress":
+                    total = f"/{event['total']}" if event.get("total") is not None else ""
+                    message = f" {event['message']}" if event.get("message") else ""
+                    console.print(f"[dim]  progress {event.get('progress')}{total}{message}[/dim]")
+                elif event["type"] == "content":
+                    merge_stream_content(content, event)
+                elif event["type"] == "result":
+                    result = event["result"]
+                elif event["type"] == "error":
+                    return None, f"Error: {event['error']}"
+        return {**result, "content": content}, None
+    except requests.RequestException as e:
+        return None, f"Error executing tool: {e}"
+
+def execute_tool(server_id, tool_name, parameters, mcp_bridge_url, stream=False):
     """Execute a tool on an MCP server."""
+    if stream:
+        return execute_tool_streaming(server_id, tool_name, parameters, mcp_bridge_url)
     try:
         url = f"{mcp_bridge_url}/servers/{server_id}/tools/{tool_name}"
         response = requests.post(url, json=parameters, timeout=6000)  # 100 minutes for tool execution
@@ -279,6 +602,150 @@ def execute_tool(server_id, tool_name, parameters, mcp_bridge_url):
                 pass
         return None, error_message
 
+def execute_tools_batch(calls, mcp_bridge_url):
+    """Execute tool calls concurrently through the bridge's /tools/batch endpoint.
+    
+    Returns one (result, error) pair per call, in order, or None when the
+    bridge can't take the batch (no batch endpoint, or too many calls).
+    """
+    body = {"calls": [{"server_id": call["server_id"], "tool_name": call["tool_name"], "arguments": call["parameters"]}
+                      for call in calls]}
+    try:
+        response = requests.post(f"{mcp_bridge_url}/tools/batch", json=body, timeout=6000)
+        if response.status_code in (404, 413):
+            return None
+        response.raise_for_status()
+    except requests.RequestException as e:
+        return [(None, f"Error executing tools: {e}")] * len(calls)
+    outcomes = [(None, "Error: the bridge returned no result for this call")] * len(calls)
+    for item in response.json().get("results", []):
+        if item.get("success"):
+            outcomes[item["index"]] = (item.get("result"), None)
+        else:
+            outcomes[item["index"]] = (None, f"Error: {item.get('error')}")
+    return outcomes
+
+def execute_tools(calls, mcp_bridge_url, stream=False):
+    """Execute independent tool calls concurrently; returns one (result, error) pair per call."""
+    if len(calls) == 1:
+        call = calls[0]
+        return [execute_tool(call["server_id"], call["tool_name"], call["parameters"], mcp_bridge_url, stream=stream)]
+    if not stream:
+        outcomes = execute_tools_batch(calls, mcp_bridge_url)
+        if outcomes is not None:
+            return outcomes
+    # Streamed calls show their own progress, so they get one request each
+    with ThreadPoolExecutor(max_workers=min(len(calls), 8)) as executor:
+        return list(executor.map(
+            lambda call: execute_tool(call["server_id"], call["tool_name"], call["parameters"], mcp_bridge_url, stream=stream),
+            calls))
+
+def report_tool_result(tool_name, result, error, show_json=True, json_width=100):
+    """Display a tool's outcome and return the feedback message for the model."""
+    # Handle errors
+    if error:
+        console.print(f"[bold red]Tool execution failed:[/bold red] {error}")
+        return f"The tool execution failed with error: {error}"
+    
+    console.print(f"[bold green]Tool execution successful[/bold green]")
+    
+    # Format and display the result
+    if isinstance(result, dict):
+        result_str = json.dumps(result, indent=2)
+    else:
+        result_str = str(result)
+    
+    # Display the result based on show_json setting
+    console.print("Result:", style="bold")
+    console.print(format_json_result(result, show_json, json_width))
+    
+    # Check if the operation was rejected by the user
+    if isinstance(result, dict) and result.get("status") == "rejected":
+        return f"The operation was cancelled by the user: {result.get('message', 'No reason provided')}"
+    return f"The tool {tool_name} was executed successfully. Result: {result_str}"
+
+class StreamedTurn:
+    """One streamed model reply. Each tool call is started on the bridge as
+    soon as its JSON object has arrived, while the model is still writing the
+    rest of the reply; describe_tools calls wait for the complete reply.
+    """
+    
+    def __init__(self, executor, mcp_bridge_url, stream_tools=False):
+        self.executor = executor
+        self.mcp_bridge_url = mcp_bridge_url
+        self.stream_tools = stream_tools
+        self.started = []  # (call, future) in the order the calls arrived
+        self.sent_at = None
+        self.first_call_after = None  # Seconds from sending until the first tool call started
+        self.reply_after = None  # Seconds from sending until the whole reply had arrived
+    
+    def send(self, chat, message):
+        """Send `message` and read the reply as it streams; returns its full text."""
+        self.sent_at = time.monotonic()
+        scanner = JSONObjectScanner(on_member=self._on_member)
+        parts = []
+        for chunk in chat.send_message(message, stream=True):
+            try:
+                text = chunk.text
+            except ValueError:
+                continue  # A chunk without text, such as the final safety ratings
+            parts.append(text)
+            scanner.feed(text)
+        self.reply_after = time.monotonic() - self.sent_at
+        return "".join(parts)
+    
+    def _on_member(self, key, value):
+        if key == "tool_call":
+            calls = get_tool_calls({"tool_call": value})
+        elif key == "tool_calls":
+            calls = get_tool_calls({"tool_calls": [value]})
+        else:
+            return
+        for call in calls:
+            if is_describe_tools_call(call):
+                continue
+            if self.first_call_after is None:
+                self.first_call_after = time.monotonic() - self.sent_at
+            self.started.append((call, self._submit(call)))
+    
+    def _submit(self, call):
+        return self.executor.submit(execute_tool, call["server_id"], call["tool_name"], call["parameters"],
+                                    self.mcp_bridge_url, stream=self.stream_tools)
+    
+    def merge_calls(self, calls):
+        """The reply's tool calls, plus any started early that the final parse doesn't contain."""
+        remaining = list(calls)
+        extra = []
+        for call, _ in self.started:
+            if call in remaining:
+                remaining.remove(call)
+            else:
+                extra.append(call)
+        return list(calls) + extra
+    
+    def outcomes(self, calls):
+        """(result, error) for each bridge call; calls that weren't started early start now."""
+        waiting = list(self.started)
+        futures = []
+        for call in calls:
+            entry = next((entry for entry in waiting if entry[0] == call), None)
+            if entry:
+                waiting.remove(entry)
+                futures.append(entry[1])
+            else:
+                futures.append(self._submit(call))
+        return [future.result() for future in futures]
+
+def send_to_model(chat, message, streamed_turn=None):
+    """Send a message to Gemini and process its reply, streaming it when a StreamedTurn is given."""
+    if streamed_turn is None:
+        return process_llm_response(chat.send_message(message).text)
+    processed_response = process_llm_response(streamed_turn.send(chat, message))
+    if streamed_turn.first_call_after is not None:
+        console.print(f"[dim]First tool call started {streamed_turn.first_call_after:.2f}s after sending; "
+                      f"the full reply took {streamed_turn.reply_after:.2f}s[/dim]")
+    return processed_response
+
 def confirm_operation(confirmation_data, mcp_bridge_url):
     """Process a confirmation request for medium/high risk operations."""
     console.print(Panel(
@@ -319,91 +786,148 @@ def confirm_operation(confirmation_data, mcp_bridge_url):
         except requests.RequestException as e:
             return {"status": "rejected", "message": "User rejected the operation"}, None
 
+_JSON_SPECIAL = re.compile(r'[{}"\\]')
+_CODE_FENCE = re.compile(r"```(?:json)?")
+
+class JSONObjectScanner:
+    """Find the top-level JSON objects in text as it arrives, in one pass.
+    
+    Brace depth and string/escape state are tracked, so braces inside string
+    values don't count and each character is looked at once. feed() returns
+    the objects that a chunk completed, as (value, start, end) offsets into
+    the whole text, so a streamed tool call is seen as soon as its closing
+    brace arrives.
+    
+    With `on_member`, objects directly inside a top-level object are reported
+    too, as on_member(key, value), the moment they close: the "tool_call"
+    member, or each object in a "tool_calls" list, before the rest of the
+    response has arrived.
+    """
+    
+    def __init__(self, offset=0, on_member=None):
+        self.offset = offset  # Position of the next chunk in the whole text
+        self.depth = 0
+        self.start = None  # Where the object being read began
+        self.partial = ""  # Text of that object from earlier chunks
+        self.in_string = False
+        self.escaped = False
+        self.objects = []
+        self.on_member = on_member
+        self.key = None  # Last string read at depth 1: the key of the member being read
+        self.key_partial = ""
+        self.member_partial = ""
+    
+    def feed(self, chunk):
+        completed = []
+        segment = 0  # Where the open object starts in this chunk
+        key_from = member_from = 0  # Where the open key string / member object start in this chunk
+        i = 0
+        while i < len(chunk):
+            if self.depth == 0:
+                i = chunk.find("{", i)
+                if i < 0:
+                    break
+                self.depth, self.start, segment = 1, self.offset + i, i
+                self.key = None
+                i += 1
+                continue
+            if self.escaped:
+                self.escaped = False
+                i += 1
+                continue
+            match = _JSON_SPECIAL.search(chunk, i)
+            if not match:
+                break
+            i = match.end()
+            char = match.group()
+            if char == "\\":
+                self.escaped = self.in_string
+            elif char == '"':
+                self.in_string = not self.in_string
+                if self.on_member and self.depth == 1:
+                    if self.in_string:
+                        key_from, self.key_partial = i, ""
+                    else:
+                        self.key = self.key_partial + chunk[key_from:i - 1]
+            elif self.in_string:
+                continue
+            elif char == "{":
+                self.depth += 1
+                if self.on_member and self.depth == 2:
+                    member_from, self.member_partial = i - 1, ""
+            else:
+                self.depth -= 1
+                if self.on_member and self.depth == 1:
+                    try:
+                        member = json.loads(self.member_partial + chunk[member_from:i], strict=False)
+                    except ValueError:
+                        pass
+                    else:
+                        self.on_member(self.key, member)
+                if self.depth == 0:
+                    candidate = self.partial + chunk[segment:i]
+                    self.partial = ""
+                    try:
+                        # strict=False keeps raw newlines inside string values
+                        completed.append((json.loads(candidate, strict=False), self.start, self.offset + i))
+                    except ValueError:
+                        pass  # Braces in prose, not JSON
+        if self.depth:
+            self.partial += chunk[segment:]
+            if self.on_member and self.in_string and self.depth == 1:
+                self.key_partial += chunk[key_from:]
+            if self.on_member and self.depth >= 2:
+                self.member_partial += chunk[member_from:]
+        self.offset += len(chunk)
+        self.objects.extend(completed)
+        return completed
+    
+    def finish(self):
+        """End of text. An object left open was probably a stray brace in prose,
+        so scan again from just after it. Returns the objects found that way."""
+        if not self.depth:
+            return []
+        rest, start = self.partial, self.start
+        self.depth, self.partial, self.in_string, self.escaped = 0, "", False, False
+        rescan = JSONObjectScanner(start + 1)
+        rescan.feed(rest[1:])
+        rescan.finish()  # Adds what it finds to rescan.objects
+        completed = rescan.objects
+        self.objects.extend(completed)
+        return completed
+    
+    def last_object(self):
+        """The last JSON object (dict) found, as (value, start, end), or None."""
+        for found in reversed(self.objects):
+            if isinstance(found[0], dict):
+                return found
+        return None
+
 def process_llm_response(text):
     """Process the LLM response to extract the JSON part."""
-    # Try to find JSON in the response
     try:
-        # Helper function to clean and parse JSON text
-        def clean_and_parse_json(json_text):
-            # Remove any line breaks within the JSON
-            cleaned_text = ' '.join(json_text.split())
-            try:
-                result = json.loads(cleaned_text)
-                console.print("[dim]Successfully parsed JSON[/dim]")
-                return result
-            except json.JSONDecodeError:
-                return None
-
         console.print("[dim]Processing LLM response...[/dim]")
+        scanner = JSONObjectScanner()
+        scanner.feed(text)
+        scanner.finish()
+        found = scanner.last_object()
         
-        # First try to find JSON block at the end of the response
-        parts = text.split("{")
-        if len(parts) > 1:
-            console.print("[dim]Found potential JSON at end of response[/dim]")
-            # Take the last JSON block
-            potential_json = "{" + parts[-1].strip()
-            response_data = clean_and_parse_json(potential_json)
-            if response_data and isinstance(response_data, dict):
-                if "tool_call" not in response_data:
-                    response_data["tool_call"] = None
-                if "response" not in response_data:
-                    # Use the non-JSON part as the response
-                    non_json_text = text[:text.rfind("{")].strip()
-                    response_data["response"] = non_json_text or ""
-                console.print(f"[dim]Found valid tool call: {response_data.get('tool_call')}[/dim]")
-                return response_data
-
-        # If no valid JSON found at the end, look for JSON blocks in markdown code blocks
-        if "```json" in text:
-            parts = text.split("```json")
-            if len(parts) > 1:
-                json_block = parts[1].split("```")[0].strip()
-                response_data = clean_and_parse_json(json_block)
-                if response_data and isinstance(response_data, dict):
-                    if "tool_call" not in response_data:
-                        response_data["tool_call"] = None
-                    if "response" not in response_data:
-                        # Use the non-JSON part as the response
-                        non_json_text = text[:text.find("```json")].strip()
-                        response_data["response"] = non_json_text or ""
-                    return response_data
-
-        # If we still haven't found valid JSON, check for any code blocks
-        if "```" in text:
-            parts = text.split("```")
-            for part in parts:
-                if part.strip():
-                    response_data = clean_and_parse_json(part.strip())
-                    if response_data and isinstance(response_data, dict):
-                        if "tool_call" not in response_data:
-                            response_data["tool_call"] = None
-                        if "response" not in response_data:
-                            # Use the non-JSON part as the response
-                            non_json_text = text[:text.find("```")].strip()
-                            response_data["response"] = non_json_text or ""
-                        return response_data
-
-        # Try to find any JSON-like structure in the text
-        if "{" in text and "}" in text:
-            start = text.find("{")
-            end = text.rfind("}") + 1
-            if start < end:
-                potential_json = text[start:end]
-                response_data = clean_and_parse_json(potential_json)
-                if response_data and isinstance(response_data, dict):
-                    if "tool_call" not in response_data:
-                        response_data["tool_call"] = None
-                    if "response" not in response_data:
-                        # Use the non-JSON part as the response
-                        non_json_text = (text[:start] + text[end:]).strip()
-                        response_data["response"] = non_json_text or ""
-                    return response_data
-
-        # If no JSON found in any format, treat the entire text as the response
-        return {
-            "tool_call": None,
-            "response": text.strip()
-        }
+        # If no JSON found, treat the entire text as the response
+        if found is None:
+            return {
+                "tool_call": None,
+                "response": text.strip()
+            }
+        
+        response_data, start, end = found
+        console.print("[dim]Successfully parsed JSON[/dim]")
+        if "tool_call" not in response_data:
+            response_data["tool_call"] = None
+        if "response" not in response_data:
+            # Use the non-JSON part as the response
+            response_data["response"] = _CODE_FENCE.sub("", text[:start] + text[end:]).strip()
+        console.print(f"[dim]Found valid tool call: {response_data.get('tool_call')}[/dim]")
+        return response_data
 
     except Exception as e:
         console.print(f"[bold red]Error processing LLM response:[/bold red] {e}")
@@ -413,6 +937,18 @@ def process_llm_response(text):
             "response": text.strip() if text else "I couldn't format my response properly. Please try again with a clearer request."
         }
 
+def get_tool_calls(processed_response):
+    """The complete tool calls in a processed response, from "tool_calls" and/or "tool_call"."""
+    calls = processed_response.get("tool_calls")
+    calls = list(calls) if isinstance(calls, list) else []
+    if processed_response.get("tool_call"):
+        calls.insert(0, processed_response["tool_call"])
+    return [call for call in calls
+            if isinstance(call, dict) and all(call.get(k) is not None for k in ["server_id", "tool_name", "parameters"])]
+
+def is_describe_tools_call(call):
+    return call["server_id"] == AGENT_SERVER_ID and call["tool_name"] == "describe_tools"
+
 def main():
     """Main function to run the MCP-Gemini Agent."""
     # Parse command line arguments
@@ -443,19 +979,35 @@ def main():
         console.print(f"[bold red]Error setting up Gemini:[/bold red] {e}")
         return
     
-    # Get all tools from all servers
-    all_tools = get_all_tools(mcp_bridge_url)
+    # Get all tools from all servers; slow servers are added once they answer
+    discovery = ToolDiscovery(mcp_bridge_url, None if args.no_catalog_cache else args.catalog_cache).start()
+    all_tools = discovery.initial_tools(args.discovery_timeout)
     if not all_tools:
         console.print("[bold yellow]Warning:[/bold yellow] No tools found from any server.")
     else:
         console.print(f"[bold green]✓[/bold green] Found tools from {len(all_tools)} servers")
+    if discovery.pending:
+        console.print(f"[yellow]Still waiting for tools from: {', '.join(sorted(discovery.pending))}; "
+                      "they will be added when ready[/yellow]")
+    
+    # Large catalogs are indexed and only the relevant tools are described each turn
+    tool_index = ToolIndex(all_tools)
+    ranked = not tools_fit_budget(all_tools, args.tool_budget)
+    described = set()  # "server_id/tool_name" of tools already described in this chat
+    if ranked:
+        console.print(f"[yellow]Tool descriptions exceed {args.tool_budget} tokens; "
+                      f"describing up to {args.top_k} relevant tools per message[/yellow]")
     
     # Create system instruction with tools information
-    system_instruction = create_system_instruction(all_tools)
+    system_instruction = create_system_instruction(all_tools, ranked)
     
     # Create chat session
     console.print("\n[bold]Starting chat session. Type 'exit' to quit.[/bold]\n")
     
+    # Streamed replies start their tool calls on these threads
+    tool_executor = ThreadPoolExecutor(max_workers=8) if args.stream_model else None
+    first_tool_call_times = []
+    
     # Initialize chat
     chat = model.start_chat(history=[])
     chat.send_message(system_instruction)  # Send system instruction as first message
@@ -467,77 +1019,120 @@ def main():
         if user_input.lower() in ["exit", "quit"]:
             break
         
-        # Send message to Gemini
-        response = chat.send_message(user_input)
+        message = user_input
+        
+        # Tell the model about catalogs that arrived late or changed
+        late_tools = discovery.updates()
+        if late_tools:
+            all_tools.update(late_tools)
+            tool_index = ToolIndex(all_tools)
+            console.print(f"[bold green]✓[/bold green] Tools updated for: {', '.join(late_tools)}")
+            if ranked:
+                described -= {key for key in described if key.split("/", 1)[0] in late_tools}
+                message = ("The available tools have changed. Tool names for these servers are now:\n"
+                           f"{create_tool_names_list(late_tools)}\n\n{message}")
+            else:
+                message = ("The available tools have changed. These servers' tools replace what you were told before:\n\n"
+                           f"{create_tools_description(late_tools)}\n{message}")
+        
+        # Describe the relevant tools the model hasn't seen yet
+        if ranked:
+            relevant = tool_index.search(user_input, args.top_k, args.tool_budget)
+            new_tools = [(server_id, tool) for server_id, tool in relevant
+                         if f"{server_id}/{tool['name']}" not in described]
+            if new_tools:
+                described.update(f"{server_id}/{tool['name']}" for server_id, tool in new_tools)
+                message = f"Tools relevant to this message:\n\n{create_tools_description(group_tools(new_tools))}\n{message}"
         
-        # Process the response
-        processed_response = process_llm_response(response.text)
+        # Send message to Gemini and process the response
+        turn = StreamedTurn(tool_executor, mcp_bridge_url, args.stream) if args.stream_model else None
+        processed_response = send_to_model(chat, message, turn)
         
         # Display the text response part
         console.print("\nAI:", style="bold")
         console.print(Markdown(processed_response["response"]))
         
         # Extract tool call information
-        tool_call = processed_response.get("tool_call") or {}
+        tool_calls = get_tool_calls(processed_response)
+        if turn:
+            tool_calls = turn.merge_calls(tool_calls)
+            if turn.first_call_after is not None:
+                first_tool_call_times.append(turn.first_call_after)
         
-        # Continue as long as there's a tool call to make
-        while tool_call and all(tool_call.get(k) is not None for k in ["server_id", "tool_name", "parameters"]):
-            server_id = tool_call.get("server_id")
-            tool_name = tool_call.get("tool_name")
-            parameters = tool_call.get("parameters")
-            
-            # Show the tool call parameters
-            if show_json:
-                console.print(f"\n[bold yellow]Executing tool:[/bold yellow] {server_id}/{tool_name}")
-                console.print("Parameters:", style="bold")
-                console.print(format_json_result(parameters, show_json=True, max_width=json_width))
+        # Continue as long as there are tool calls to make
+        while tool_calls:
+            # Show the tool calls; the bridge calls among them run concurrently
+            bridge_calls = []
+            for call in tool_calls:
+                if is_describe_tools_call(call):
+                    continue
+                bridge_calls.append(call)
+                if show_json:
+                    console.print(f"\n[bold yellow]Executing tool:[/bold yellow] {call['server_id']}/{call['tool_name']}")
+                    console.print("Parameters:", style="bold")
+                    console.print(format_json_result(call["parameters"], show_json=True, max_width=json_width))
+                else:
+                    console.print(f"\n[bold yellow]Executing tool:[/bold yellow] {call['server_id']}/{call['tool_name']} (parameters hidden)")
+            if not bridge_calls:
+                outcomes = iter([])
+            elif turn:
+                outcomes = iter(turn.outcomes(bridge_calls))  # Most of them started while the model was writing
             else:
-                console.print(f"\n[bold yellow]Executing tool:[/bold yellow] {server_id}/{tool_name} (parameters hidden)")
-            
-            # Execute the tool
-            result, error = execute_tool(server_id, tool_name, parameters, mcp_bridge_url)
+                outcomes = iter(execute_tools(bridge_calls, mcp_bridge_url, stream=args.stream))
             
-            # Check if the operation requires confirmation
-            if error is None and isinstance(result, dict) and result.get("requires_confirmation") is True:
-                console.print("[bold yellow]Operation requires security confirmation[/bold yellow]")
-                # Handle the confirmation
-                result, error = confirm_operation(result, mcp_bridge_url)
-            
-            # Handle errors
-            if error:
-                console.print(f"[bold red]Tool execution failed:[/bold red] {error}")
-                tool_feedback = f"The tool execution failed with error: {error}"
-            else:
-                console.print(f"[bold green]Tool execution successful[/bold green]")
+            feedback = []
+            for call in tool_calls:
+                # Requests for more tool descriptions are answered by the agent itself
+                if is_describe_tools_call(call):
+                    parameters = call["parameters"]
+                    names = (parameters.get("names") or []) if isinstance(parameters, dict) else []
+                    names = [names] if isinstance(names, str) else names
+                    console.print(f"\n[bold yellow]Describing tools:[/bold yellow] {', '.join(map(str, names))}")
+                    feedback.append(describe_requested_tools(tool_index, names, described))
+                    continue
                 
-                # Format and display the result
-                if isinstance(result, dict):
-                    result_str = json.dumps(result, indent=2)
-                else:
-                    result_str = str(result)
+                result, error = next(outcomes)
                 
-                # Display the result based on show_json setting
-                console.print("Result:", style="bold")
-                console.print(format_json_result(result, show_json, json_width))
+                # Check if the operation requires confirmation; calls are confirmed one at a time
+                if error is None and isinstance(result, dict) and result.get("requires_confirmation") is True:
+                    console.print(f"[bold yellow]{call['server_id']}/{call['tool_name']} requires security confirmation[/bold yellow]")
+                    # Handle the confirmation
+                    result, error = confirm_operation(result, mcp_bridge_url)
                 
-                # Check if the operation was rejected by the user
-                if isinstance(result, dict) and result.get("status") == "rejected":
-                    tool_feedback = f"The operation was cancelled by the user: {result.get('message', 'No reason provided')}"
-                else:
-                    tool_feedback = f"The tool {tool_name} was executed successfully. Result: {result_str}"
+                feedback.append(report_tool_result(call["tool_name"], result, error, show_json, json_width))
+            
+            # All results go back in one message
+            if len(feedback) == 1:
+                tool_feedback = feedback[0]
+            else:
+                tool_feedback = f"Results of the {len(feedback)} tool calls, in the order you made them:\n\n" + "\n\n".join(
+                    f"{i}. {call['server_id']}/{call['tool_name']}: {text}"
+                    for i, (call, text) in enumerate(zip(tool_calls, feedback), 1))
             
             # Send feedback to Gemini
-            response = chat.send_message(tool_feedback)
-            processed_response = process_llm_response(response.text)
+            turn = StreamedTurn(tool_executor, mcp_bridge_url, args.stream) if args.stream_model else None
+            processed_response = send_to_model(chat, tool_feedback, turn)
             
             # Display the feedback response
             console.print("\nAI:", style="bold")
             console.print(Markdown(processed_response["response"]))
             
-            # Get the next tool call if any
-            tool_call = processed_response.get("tool_call") or {}
+            # Get the next tool calls if any
+            tool_calls = get_tool_calls(processed_response)
+            if turn:
+                tool_calls = turn.merge_calls(tool_calls)
+                if turn.first_call_after is not None:
+                    first_tool_call_times.append(turn.first_call_after)
         
         console.print("\n" + "-" * 50 + "\n")
+    
+    if first_tool_call_times:
+        ordered = sorted(first_tool_call_times)
+        console.print(f"Time to first tool call over {len(ordered)} replies: "
+                      f"mean {sum(ordered) / len(ordered):.2f}s, median {ordered[len(ordered) // 2]:.2f}s, "
+                      f"max {ordered[-1]:.2f}s")
+    if tool_executor:
+        tool_executor.shutdown()
 
 if __name__ == "__main__":
     main()
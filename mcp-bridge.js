@@ -18,6 +18,14 @@ const { v4: uuidv4 } = require('uuid');
 const axios = require('axios');
 const http = require('http');
 const https = require('https');
+const net = require('net');
+const dns = require('dns');
+const crypto = require('crypto');
+const util = require('util');
+const zlib = require('zlib');
+const os = require('os');
+const cluster = require('cluster');
+const { EventEmitter } = require('events');
 
 // Configure axios with better connection management
 const httpAgent = new http.Agent({
@@ -58,7 +66,261 @@ const RISK_LEVEL_DESCRIPTION = {
   [RISK_LEVEL.HIGH]: "High risk - Docker execution required"
 };
 
-console.log('Starting MCP Bridge...');
+// Logging - level-gated and structured.
+//   LOG_LEVEL:       trace | debug | info (default) | warn | error | silent
+//   LOG_FORMAT:      text (default) or json, one object per line
+//   LOG_SAMPLE_RATE: fraction of debug/trace lines to keep (default 1)
+// Fields may be passed as a function so payloads are only built when the level
+// is enabled. Lines are buffered and written once per event-loop turn.
+const LOG_LEVELS = { trace: 10, debug: 20, info: 30, warn: 40, error: 50, silent: Infinity };
+const LOG_LEVEL = Object.prototype.hasOwnProperty.call(LOG_LEVELS, process.env.LOG_LEVEL) ? process.env.LOG_LEVEL : 'info';
+const LOG_FORMAT = process.env.LOG_FORMAT === 'json' ? 'json' : 'text';
+const LOG_SAMPLE_RATE = process.env.LOG_SAMPLE_RATE !== undefined ? parseFloat(process.env.LOG_SAMPLE_RATE) : 1;
+const LOG_BUFFER_MAX_LINES = 10000; // Lines held per stream before new ones are dropped
+
+class Logger {
+  constructor(level = LOG_LEVEL, format = LOG_FORMAT, sampleRate = LOG_SAMPLE_RATE) {
+    this.threshold = LOG_LEVELS[level];
+    this.format = format;
+    this.sampleRate = sampleRate;
+    this.stdout = [];
+    this.stderr = [];
+    this.dropped = 0;
+    this.flushScheduled = false;
+  }
+
+  enabled(level) {
+    return LOG_LEVELS[level] >= this.threshold;
+  }
+
+  trace(message, fields) { this._log('trace', message, fields); }
+  debug(message, fields) { this._log('debug', message, fields); }
+  info(message, fields) { this._log('info', message, fields); }
+  warn(message, fields) { this._log('warn', message, fields); }
+  error(message, fields) { this._log('error', message, fields); }
+
+  _log(level, message, fields) {
+    if (LOG_LEVELS[level] < this.threshold) return;
+    if (LOG_LEVELS[level] < LOG_LEVELS.info && this.sampleRate < 1 && Math.random() >= this.sampleRate) return;
+
+    if (typeof fields === 'function') fields = fields();
+    if (fields instanceof Error) fields = { error: fields.message };
+
+    const queue = LOG_LEVELS[level] >= LOG_LEVELS.warn ? this.stderr : this.stdout;
+    if (queue.length >= LOG_BUFFER_MAX_LINES) {
+      this.dropped++;
+      return;
+    }
+    queue.push(this.format === 'json'
+      ? this._formatJson(level, message, fields)
+      : this._formatText(level, message, fields));
+
+    if (!this.flushScheduled) {
+      this.flushScheduled = true;
+      setImmediate(() => this.flush());
+    }
+  }
+
+  _formatText(level, message, fields) {
+    let line = `${new Date().toISOString()} ${level.toUpperCase()} ${message}`;
+    if (fields !== undefined) {
+      line += ' ' + (typeof fields === 'string' ? fields : util.inspect(fields, { depth: 4, breakLength: Infinity }));
+    }
+    return line + '\n';
+  }
+
+  _formatJson(level, message, fields) {
+    const entry = { time: new Date().toISOString(), level, msg: message };
+    if (fields && typeof fields === 'object' && !Array.isArray(fields)) Object.assign(entry, fields);
+    else if (fields !== undefined) entry.data = fields;
+    try {
+      return JSON.stringify(entry) + '\n';
+    } catch (error) {
+      return JSON.stringify({ time: entry.time, level, msg: message, data: util.inspect(fields, { depth: 2 }) }) + '\n';
+    }
+  }
+
+  _takeDropped() {
+    if (this.dropped === 0) return '';
+    const note = this._formatText('warn', `[LOG] Dropped ${this.dropped} log lines, output could not keep up`);
+    this.dropped = 0;
+    return note;
+  }
+
+  flush() {
+    this.flushScheduled = false;
+    const dropped = this._takeDropped();
+    if (this.stdout.length) process.stdout.write(this.stdout.join(''));
+    if (this.stderr.length || dropped) process.stderr.write(dropped + this.stderr.join(''));
+    this.stdout = [];
+    this.stderr = [];
+  }
+
+  // Write whatever is buffered before the process exits
+  flushSync() {
+    const dropped = this._takeDropped();
+    try {
+      if (this.stdout.length) fs.writeSync(1, this.stdout.join(''));
+      if (this.stderr.length || dropped) fs.writeSync(2, dropped + this.stderr.join(''));
+    } catch (error) {
+      // Nothing left to report to
+    }
+    this.stdout = [];
+    this.stderr = [];
+  }
+}
+
+const log = new Logger();
+process.on('exit', () => log.flushSync());
+
+// Metrics - Prometheus text exposition served at GET /metrics. Labels are
+// passed as arrays in labelNames order, so recording a sample is a Map lookup
+// and a few additions.
+const LATENCY_BUCKETS = [0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300];
+
+function escapeLabelValue(value) {
+  return String(value).replace(/\\/g, '\\\\').replace(/"/g, '\\"').replace(/\n/g, '\\n');
+}
+
+function formatLabels(names, values, extra = '') {
+  const pairs = names.map((name, i) => `${name}="${escapeLabelValue(values[i])}"`);
+  if (extra) pairs.push(extra);
+  return pairs.length ? `{${pairs.join(',')}}` : '';
+}
+
+class Counter {
+  constructor(name, help, labelNames = []) {
+    this.name = name;
+    this.help = help;
+    this.labelNames = labelNames;
+    this.series = new Map(); // joined label values -> { labels, value }
+  }
+
+  inc(labels = [], amount = 1) {
+    const key = labels.join('\u0001');
+    const series = this.series.get(key);
+    if (series) series.value += amount;
+    else this.series.set(key, { labels, value: amount });
+  }
+
+  render(lines) {
+    lines.push(`# HELP ${this.name} ${this.help}`, `# TYPE ${this.name} counter`);
+    for (const { labels, value } of this.series.values()) {
+      lines.push(`${this.name}${formatLabels(this.labelNames, labels)} ${value}`);
+    }
+  }
+}
+
+class Histogram {
+  constructor(name, help, labelNames = [], buckets = LATENCY_BUCKETS) {
+    this.name = name;
+    this.help = help;
+    this.labelNames = labelNames;
+    this.buckets = buckets;
+    this.series = new Map(); // joined label values -> { labels, counts, sum, count }
+  }
+
+  observe(labels, seconds) {
+    const key = labels.join('\u0001');
+    let series = this.series.get(key);
+    if (!series) {
+      series = { labels, counts: new Array(this.buckets.length).fill(0), sum: 0, count: 0 };
+      this.series.set(key, series);
+    }
+    let i = 0;
+    while (i < this.buckets.length && seconds > this.buckets[i]) i++;
+    if (i < this.buckets.length) series.counts[i]++; // Counts are cumulated when rendered
+    series.sum += seconds;
+    series.count++;
+  }
+
+  // Time a promise-returning call
+  async time(labels, fn) {
+    const start = process.hrtime.bigint();
+    try {
+      return await fn();
+    } finally {
+      this.observe(labels, secondsSince(start));
+    }
+  }
+
+  render(lines) {
+    lines.push(`# HELP ${this.name} ${this.help}`, `# TYPE ${this.name} histogram`);
+    for (const { labels, counts, sum, count } of this.series.values()) {
+      let cumulative = 0;
+      this.buckets.forEach((bound, i) => {
+        cumulative += counts[i];
+        lines.push(`${this.name}_bucket${formatLabels(this.labelNames, labels, `le="${bound}"`)} ${cumulative}`);
+      });
+      lines.push(`${this.name}_bucket${formatLabels(this.labelNames, labels, 'le="+Inf"')} ${count}`);
+      lines.push(`${this.name}_sum${formatLabels(this.labelNames, labels)} ${sum}`);
+      lines.push(`${this.name}_count${formatLabels(this.labelNames, labels)} ${count}`);
+    }
+  }
+}
+
+// Values read at scrape time; collect() returns [[labelValues, value], ...]
+class Collector {
+  constructor(name, help, labelNames, collect, type = 'gauge') {
+    this.name = name;
+    this.help = help;
+    this.labelNames = labelNames;
+    this.collect = collect;
+    this.type = type;
+  }
+
+  render(lines) {
+    lines.push(`# HELP ${this.name} ${this.help}`, `# TYPE ${this.name} ${this.type}`);
+    for (const [labels, value] of this.collect()) {
+      lines.push(`${this.name}${formatLabels(this.labelNames, labels)} ${value}`);
+    }
+  }
+}
+
+function secondsSince(start) {
+  return Number(process.hrtime.bigint() - start) / 1e9;
+}
+
+const metrics = {
+  httpRequests: new Counter('mcp_bridge_http_requests_total',
+    'REST API requests by route and status', ['method', 'route', 'server', 'tool', 'status']),
+  httpDuration: new Histogram('mcp_bridge_http_request_duration_seconds',
+    'REST API request latency', ['method', 'route', 'server', 'tool']),
+  upstreamRequests: new Counter('mcp_bridge_upstream_requests_total',
+    'JSON-RPC requests sent to MCP servers', ['server', 'method', 'tool', 'outcome']),
+  upstreamDuration: new Histogram('mcp_bridge_upstream_response_seconds',
+    'Time from sending a JSON-RPC request to an MCP server until its response', ['server', 'method', 'tool']),
+  upstreamConnect: new Histogram('mcp_bridge_upstream_connect_seconds',
+    'Time to open a transport to an MCP server (SSE stream, stdio process spawn)', ['server', 'transport']),
+  upstreamHandshake: new Histogram('mcp_bridge_upstream_handshake_seconds',
+    'Time for the MCP initialize handshake', ['server', 'transport']),
+  jobWait: new Histogram('mcp_bridge_job_wait_seconds',
+    'Time jobs spent queued before starting', ['priority']),
+  jobDuration: new Histogram('mcp_bridge_job_duration_seconds',
+    'Time jobs spent running', ['status']),
+  catalogRequests: new Counter('mcp_bridge_catalog_cache_requests_total',
+    'Catalog lookups by whether they were served from cache', ['kind', 'result']),
+  serverRestarts: new Counter('mcp_bridge_server_restarts_total',
+    'MCP servers started again after a previous start', ['server']),
+  sseReconnects: new Counter('mcp_bridge_sse_reconnects_total',
+    'SSE sessions reopened after their stream dropped', ['server']),
+  serverExits: new Counter('mcp_bridge_server_process_exits_total',
+    'stdio MCP server processes that exited', ['server'])
+};
+const startedServerIds = new Set(); // Servers started at least once, to count restarts
+const TEMP_SERVER_PREFIX = 'temp-'; // Throwaway servers started by /generate-postman
+
+// Label for a server id that stays bounded: every temporary server shares "temporary"
+function serverLabel(serverId) {
+  return serverId.startsWith(TEMP_SERVER_PREFIX) ? 'temporary' : serverId;
+}
+
+// Label for a tool name that stays bounded: unknown names collapse to "other"
+function toolLabel(toolName) {
+  return toolName && toolIndex.has(toolName) ? toolName : (toolName ? 'other' : '');
+}
+
+log.info('Starting MCP Bridge...');
 
 // Create Express application
 const app = express();
@@ -68,15 +330,88 @@ const PORT = process.env.PORT || 3000;
 app.use(compression()); // Enable gzip compression for large responses
 app.use(cors());
 app.use(express.json({ limit: '10mb' })); // Increase JSON limit for large collections
-app.use(morgan('dev'));
+app.use(morgan(LOG_FORMAT === 'json' ? 'tiny' : 'dev', {
+  skip: () => !log.enabled('info'),
+  stream: { write: (line) => log.info(line.trimEnd()) } // Access log goes through the buffered logger
+}));
+app.use((req, res, next) => {
+  const start = process.hrtime.bigint();
+  res.on('finish', () => {
+    const route = req.route ? `${req.baseUrl || ''}${req.route.path}` : 'unmatched';
+    const serverId = req.params && req.params.serverId;
+    const server = serverId && serverProcesses.has(serverId) ? serverLabel(serverId) : '';
+    const tool = req.params && req.params.toolName ? toolLabel(req.params.toolName) : '';
+    metrics.httpDuration.observe([req.method, route, server, tool], secondsSince(start));
+    metrics.httpRequests.inc([req.method, route, server, tool, res.statusCode]);
+  });
+  next();
+});
+
+log.info('Middleware configured');
+
+// Cluster mode - CLUSTER_WORKERS=N (or "auto" for one per CPU core) runs N
+// bridge workers behind one port. The primary process only supervises: it
+// forks the workers, keeps the authoritative copy of the shared state and
+// relays every change, so each worker holds a full replica and reads stay
+// local. Shared: jobs, catalogs, and servers added or removed through the API.
+const CLUSTER_WORKERS = process.env.CLUSTER_WORKERS === 'auto'
+  ? os.cpus().length
+  : parseInt(process.env.CLUSTER_WORKERS, 10) || 1;
+const isClusterPrimary = require.main === module && cluster.isPrimary && CLUSTER_WORKERS > 1;
+const isClusterWorker = cluster.isWorker && process.env.BRIDGE_CLUSTER_WORKER === '1';
+const clusterChannels = new Map(); // channel -> { apply(message), snapshot() }
 
-console.log('Middleware configured');
+// Mirror a local change to the other workers through the primary
+function clusterPublish(channel, message) {
+  if (isClusterWorker) process.send({ ...message, bridge: channel });
+}
+
+// Ask the primary something; resolves with its answer, or null after 5 s
+const clusterReplies = new Map(); // request id -> resolve
+let clusterRequestId = 0;
+
+function clusterRequest(message) {
+  return new Promise((resolve) => {
+    const request_id = ++clusterRequestId;
+    const timer = setTimeout(() => {
+      clusterReplies.delete(request_id);
+      resolve(null);
+    }, 5000);
+    clusterReplies.set(request_id, (value) => {
+      clearTimeout(timer);
+      resolve(value);
+    });
+    process.send({ ...message, request_id });
+  });
+}
 
 // Server state
 const serverProcesses = new Map(); // Map of server IDs to processes
 const pendingConfirmations = new Map(); // Map of request IDs to pending confirmations
 const serverInitializationState = new Map(); // Track initialization state of servers
 
+// Server lifecycle
+//   SERVER_STARTUP: eager starts every configured server at boot, lazy on first use
+//   (per server: "startup": "eager" | "lazy")
+//   SERVER_WARM_POOL: initialized spare processes kept per stdio server ("warmPool": N)
+//   SERVER_AUTO_RESTART: restart stdio servers whose process exits ("autoRestart": false to opt out)
+const SERVER_STARTUP = process.env.SERVER_STARTUP || 'eager';
+const SERVER_WARM_POOL = parseInt(process.env.SERVER_WARM_POOL, 10) || 0;
+const SERVER_AUTO_RESTART = process.env.SERVER_AUTO_RESTART !== 'false';
+const SERVER_INIT_TIMEOUT_MS = parseInt(process.env.SERVER_INIT_TIMEOUT_MS, 10) || 30000;
+const SERVER_RESTART_BASE_DELAY_MS = parseInt(process.env.SERVER_RESTART_BASE_DELAY_MS, 10) || 500;
+const SERVER_RESTART_MAX_DELAY_MS = parseInt(process.env.SERVER_RESTART_MAX_DELAY_MS, 10) || 30000;
+const SERVER_RESTART_RESET_MS = parseInt(process.env.SERVER_RESTART_RESET_MS, 10) || 60000; // Uptime that clears the backoff
+const lazyServers = new Map(); // serverId -> config of lazy servers that have not started yet
+const lazyStarts = new Map(); // serverId -> promise of a lazy start in progress
+
+// Replicas - "replicas": N processes for a stdio server, "urls": [...] for HTTP/SSE
+//   REPLICA_HEALTH_INTERVAL_MS: how often each replica of a replicated server is pinged
+//   REPLICA_MAX_FAILURES: consecutive failures that take a replica out of rotation
+const REPLICA_HEALTH_INTERVAL_MS = parseInt(process.env.REPLICA_HEALTH_INTERVAL_MS, 10) || 10000;
+const REPLICA_HEALTH_TIMEOUT_MS = parseInt(process.env.REPLICA_HEALTH_TIMEOUT_MS, 10) || 5000;
+const REPLICA_MAX_FAILURES = parseInt(process.env.REPLICA_MAX_FAILURES, 10) || 3;
+
 // Persistent config helpers
 const configPath = process.env.MCP_CONFIG_PATH || path.join(process.cwd(), 'mcp_config.json');
 function readFullConfig() {
@@ -87,7 +422,7 @@ function readFullConfig() {
     }
     return { mcpServers: {} };
   } catch (e) {
-    console.error('Error reading mcp_config.json:', e);
+    log.error('Error reading mcp_config.json', e);
     throw new Error('Failed to read config file');
   }
 }
@@ -96,7 +431,7 @@ function writeFullConfig(configObj) {
     const json = JSON.stringify(configObj, null, 2);
     fs.writeFileSync(configPath, json, 'utf8');
   } catch (e) {
-    console.error('Error writing mcp_config.json:', e);
+    log.error('Error writing mcp_config.json', e);
     throw new Error('Failed to write config file');
   }
 }
@@ -108,7 +443,7 @@ function substituteEnvVars(text) {
   return text.replace(/\$\{([^}]+)\}/g, (match, envVar) => {
     const value = process.env[envVar];
     if (value === undefined) {
-      console.warn(`Warning: Environment variable ${envVar} is not set, keeping placeholder`);
+      log.warn(`Warning: Environment variable ${envVar} is not set, keeping placeholder`);
       return match;
     }
     return value;
@@ -133,12 +468,12 @@ function substituteEnvVarsInConfig(obj) {
 
 // Helper function to load server configuration from file or environment
 function loadServerConfig() {
-  console.log('Loading server configuration...');
+  log.info('Loading server configuration...');
   let config = {};
   
   // Try to load from config file
   const configPath = process.env.MCP_CONFIG_PATH || path.join(process.cwd(), 'mcp_config.json');
-  console.log(`Checking for config file at: ${configPath}`);
+  log.info(`Checking for config file at: ${configPath}`);
   
   try {
     if (fs.existsSync(configPath)) {
@@ -149,25 +484,25 @@ function loadServerConfig() {
       parsedConfig = substituteEnvVarsInConfig(parsedConfig);
       
       config = parsedConfig.mcpServers || {};
-      console.log(`Loaded configuration from ${configPath}:`, Object.keys(config));
+      log.info(`Loaded configuration from ${configPath}`, { servers: Object.keys(config) });
       
       // For backward compatibility, validate risk levels if present
       for (const [serverId, serverConfig] of Object.entries(config)) {
         if (serverConfig.riskLevel !== undefined) {
           if (![RISK_LEVEL.LOW, RISK_LEVEL.MEDIUM, RISK_LEVEL.HIGH].includes(serverConfig.riskLevel)) {
-            console.warn(`Warning: Invalid risk level ${serverConfig.riskLevel} for server ${serverId}, ignoring risk level`);
+            log.warn(`Warning: Invalid risk level ${serverConfig.riskLevel} for server ${serverId}, ignoring risk level`);
             delete serverConfig.riskLevel;
           } else if (serverConfig.riskLevel === RISK_LEVEL.HIGH && (!serverConfig.docker || !serverConfig.docker.image)) {
-            console.warn(`Warning: Server ${serverId} has HIGH risk level but no docker configuration, downgrading to MEDIUM risk level`);
+            log.warn(`Warning: Server ${serverId} has HIGH risk level but no docker configuration, downgrading to MEDIUM risk level`);
             serverConfig.riskLevel = RISK_LEVEL.MEDIUM;
           }
         }
       }
     } else {
-      console.log(`No configuration file found at ${configPath}, using defaults or environment variables`);
+      log.info(`No configuration file found at ${configPath}, using defaults or environment variables`);
     }
   } catch (error) {
-    console.error(`Error loading configuration file: ${error.message}`);
+    log.error(`Error loading configuration file: ${error.message}`);
   }
   
   // Allow environment variables to override config
@@ -191,7 +526,7 @@ function loadServerConfig() {
         try {
           config[serverName].env = JSON.parse(process.env[envKey]);
         } catch (error) {
-          console.error(`Error parsing environment variables for ${serverName}: ${error.message}`);
+          log.error(`Error parsing environment variables for ${serverName}: ${error.message}`);
         }
       }
       
@@ -210,34 +545,35 @@ function loadServerConfig() {
                 try {
                   config[serverName].docker = JSON.parse(process.env[dockerConfigKey]);
                 } catch (error) {
-                  console.error(`Error parsing docker configuration for ${serverName}: ${error.message}`);
-                  console.warn(`Server ${serverName} has HIGH risk level but invalid docker configuration, downgrading to MEDIUM risk level`);
+                  log.error(`Error parsing docker configuration for ${serverName}: ${error.message}`);
+                  log.warn(`Server ${serverName} has HIGH risk level but invalid docker configuration, downgrading to MEDIUM risk level`);
                   config[serverName].riskLevel = RISK_LEVEL.MEDIUM;
                 }
               } else {
-                console.warn(`Server ${serverName} has HIGH risk level but no docker configuration, downgrading to MEDIUM risk level`);
+                log.warn(`Server ${serverName} has HIGH risk level but no docker configuration, downgrading to MEDIUM risk level`);
                 config[serverName].riskLevel = RISK_LEVEL.MEDIUM;
               }
             }
           } else {
-            console.warn(`Invalid risk level ${riskLevel} for server ${serverName}, ignoring risk level`);
+            log.warn(`Invalid risk level ${riskLevel} for server ${serverName}, ignoring risk level`);
           }
         } catch (error) {
-          console.error(`Error parsing risk level for ${serverName}: ${error.message}`);
+          log.error(`Error parsing risk level for ${serverName}: ${error.message}`);
         }
       }
       
-      console.log(`Added server from environment: ${serverName}`);
+      log.info(`Added server from environment: ${serverName}`);
     }
   });
   
-  console.log(`Loaded ${Object.keys(config).length} server configurations`);
+  log.info(`Loaded ${Object.keys(config).length} server configurations`);
   return config;
 }
 
 // Start an HTTP-based MCP server
 async function startHTTPServer(serverId, config) {
-  console.log(`Starting HTTP MCP server: ${serverId} at ${config.url}`);
+  const urls = serverUrls(config);
+  log.info(`Starting HTTP MCP server: ${serverId} at ${urls.join(', ')}`);
   
   const riskLevel = config.riskLevel || 1; // Default to low risk for HTTP servers
   
@@ -249,7 +585,9 @@ async function startHTTPServer(serverId, config) {
         pid: 'http-' + Date.now(), // Fake PID for HTTP connections
         config,
         type: 'http',
-        url: config.url,
+        url: urls[0],
+        replicas: urls.map((url, index) => newReplica(index, { url })),
+        nextReplica: 0,
         
         // Method to send requests to HTTP server
         sendRequest: async (method, params = {}) => {
@@ -262,17 +600,17 @@ async function startHTTPServer(serverId, config) {
           };
           
           try {
-            console.log(`Sending HTTP request to ${serverId}: ${method}`, params);
-            const response = await axios.post(config.url, request, {
+            log.debug(`Sending HTTP request to ${serverId}: ${method}`, () => ({ params }));
+            const response = await withReplica(serverId, httpServer, (replica) => axios.post(replica.url, request, {
               headers: {
                 'Content-Type': 'application/json'
               },
               timeout: 0 // No timeout for background job processing
-            });
+            }));
             
             return response.data;
           } catch (error) {
-            console.error(`Error sending request to HTTP server ${serverId}:`, error.message);
+            log.error(`Error sending request to HTTP server ${serverId}`, { error: error.message });
             throw error;
           }
         }
@@ -282,8 +620,8 @@ async function startHTTPServer(serverId, config) {
       serverProcesses.set(serverId, httpServer);
       serverInitializationState.set(serverId, 'starting');
       
-      // Test the connection by sending an initialize request
-      setTimeout(async () => {
+      // Test the connection by sending an initialize request to every URL right away
+      (async () => {
         try {
           const initRequest = {
             jsonrpc: "2.0",
@@ -304,28 +642,38 @@ async function startHTTPServer(serverId, config) {
             }
           };
           
-          const response = await axios.post(config.url, initRequest, {
-            headers: {
-              'Content-Type': 'application/json'
-            },
-            timeout: 30000 // Keep timeout for initialization
-          });
+          const results = await Promise.allSettled(httpServer.replicas.map(async (replica) => {
+            const response = await metrics.upstreamHandshake.time([serverLabel(serverId), 'http'], () => axios.post(replica.url, initRequest, {
+              headers: {
+                'Content-Type': 'application/json'
+              },
+              timeout: SERVER_INIT_TIMEOUT_MS
+            }));
+            if (!response.data || !(response.data.result || response.data.id)) {
+              throw new Error('Invalid initialization response');
+            }
+          }));
           
-          if (response.data && (response.data.result || response.data.id)) {
-            console.log(`HTTP server ${serverId} initialized successfully`);
-            serverInitializationState.set(serverId, 'initialized');
-            resolve(httpServer);
-          } else {
-            throw new Error('Invalid initialization response');
+          // URLs that did not answer stay out of rotation until a health check passes
+          results.forEach((result, index) => {
+            if (result.status === 'fulfilled' || urls.length === 1) return;
+            log.warn(`HTTP server ${serverId} replica ${urls[index]} did not initialize: ${result.reason.message}`);
+            httpServer.replicas[index].healthy = false;
+          });
+          if (!results.some(result => result.status === 'fulfilled')) {
+            throw results[0].reason;
           }
+          log.info(`HTTP server ${serverId} initialized successfully`);
+          serverInitializationState.set(serverId, 'initialized');
+          resolve(httpServer);
         } catch (error) {
-          console.error(`Failed to initialize HTTP server ${serverId}:`, error.message);
+          log.error(`Failed to initialize HTTP server ${serverId}`, { error: error.message });
           reject(error);
         }
-      }, 500); // Quick test for HTTP servers
+      })();
       
     } catch (error) {
-      console.error(`Error starting HTTP server ${serverId}:`, error);
+      log.error(`Error starting HTTP server ${serverId}`, error);
       reject(error);
     }
   });
@@ -333,52 +681,237 @@ async function startHTTPServer(serverId, config) {
 
 // Initialize and connect to MCP servers
 async function initServers() {
-  console.log('Initializing MCP servers...');
+  log.info('Initializing MCP servers...');
   const serverConfig = loadServerConfig();
   
-  console.log('Server configurations found:');
-  console.log(JSON.stringify(serverConfig, null, 2));
+  log.debug('Server configurations found', () => ({ servers: serverConfig }));
   
-  // Start each configured server
-  for (const [serverId, config] of Object.entries(serverConfig)) {
+  // Start the configured servers in parallel; lazy ones wait for their first request
+  await Promise.all(Object.entries(serverConfig).map(async ([serverId, config]) => {
+    if ((config.startup || SERVER_STARTUP) === 'lazy') {
+      lazyServers.set(serverId, config);
+      log.info(`Server ${serverId} will start on first use`);
+      return;
+    }
     try {
-      console.log(`Starting server: ${serverId}`);
+      log.info(`Starting server: ${serverId}`);
       await startServer(serverId, config);
-      console.log(`Server ${serverId} initialized successfully`);
+      if (serverInitializationState.get(serverId) === 'initialized') {
+        log.info(`Server ${serverId} initialized successfully`);
+      }
     } catch (error) {
-      console.error(`Failed to initialize server ${serverId}: ${error.message}`);
+      log.error(`Failed to initialize server ${serverId}: ${error.message}`);
     }
-  }
+  }));
   
-  console.log('All servers initialized');
+  log.info('All servers initialized');
+}
+
+// Start a lazily configured server if it is not running yet. Concurrent
+// callers share one start; a failed start is retried by the next caller.
+async function ensureServerStarted(serverId) {
+  if (lazyStarts.has(serverId)) return lazyStarts.get(serverId);
+  if (serverProcesses.has(serverId) || !lazyServers.has(serverId)) return;
+  
+  log.info(`Starting lazy server ${serverId} on first use`);
+  const start = startServer(serverId, lazyServers.get(serverId))
+    .then(() => {
+      lazyServers.delete(serverId);
+    }, (error) => {
+      serverProcesses.delete(serverId);
+      serverInitializationState.delete(serverId);
+      throw error;
+    })
+    .finally(() => lazyStarts.delete(serverId));
+  lazyStarts.set(serverId, start);
+  return start;
+}
+
+// Multiplexes JSON-RPC traffic for one stdio server process. A single
+// line-buffered reader parses each stdout line once and routes responses to
+// the caller waiting on that id; everything else is logged or handed to
+// onNotification.
+class StdioDispatcher {
+  constructor(serverId, serverProcess, options = {}) {
+    this.serverId = serverId;
+    this.process = serverProcess;
+    this.onNotification = options.onNotification || null;
+    this.pending = new Map(); // JSON-RPC id -> { resolve, reject, timer, cleanup }
+    this.buffer = '';
+    this.closed = false;
+
+    serverProcess.stdout.setEncoding('utf8'); // Keeps multi-byte characters intact across chunks
+    serverProcess.stdout.on('data', (chunk) => this._onData(chunk));
+  }
+
+  get inFlight() {
+    return this.pending.size;
+  }
+
+  _onData(chunk) {
+    this.buffer += chunk;
+    let idx;
+    while ((idx = this.buffer.indexOf('\n')) >= 0) {
+      const line = this.buffer.slice(0, idx).trim();
+      this.buffer = this.buffer.slice(idx + 1);
+      if (line) this._handleLine(line);
+    }
+  }
+
+  _handleLine(line) {
+    let message;
+    try {
+      message = JSON.parse(line);
+    } catch (parseError) {
+      log.info(`[${this.serverId}] STDOUT: ${line}`);
+      return;
+    }
+    const messages = Array.isArray(message) ? message : [message];
+    for (const m of messages) {
+      if (m.method !== undefined && m.id !== undefined) {
+        this._answerServerRequest(m);
+      } else if (m.id !== undefined && this.pending.has(m.id)) {
+        const entry = this.pending.get(m.id);
+        this._settle(m.id);
+        entry.resolve(m);
+      } else if (m.method && this.onNotification) {
+        this.onNotification(m);
+      } else {
+        log.info(`[${this.serverId}] STDOUT: ${line}`);
+      }
+    }
+  }
+
+  // Requests initiated by the server; the bridge only supports ping
+  _answerServerRequest(message) {
+    const response = message.method === 'ping'
+      ? { jsonrpc: "2.0", id: message.id, result: {} }
+      : { jsonrpc: "2.0", id: message.id, error: { code: -32601, message: `Method not supported by bridge: ${message.method}` } };
+    this.write(response).catch(() => {});
+  }
+
+  _settle(id) {
+    const entry = this.pending.get(id);
+    if (!entry) return;
+    this.pending.delete(id);
+    clearTimeout(entry.timer);
+    if (entry.cleanup) entry.cleanup();
+  }
+
+  // Write failures are flagged notSent: the server never saw the message
+  write(message) {
+    return new Promise((resolve, reject) => {
+      if (this.closed) {
+        return reject(Object.assign(new Error(`Server ${this.serverId} is not running`), { notSent: true }));
+      }
+      this.process.stdin.write(JSON.stringify(message) + '\n', (error) => {
+        if (error) reject(Object.assign(new Error(`Failed to send request to ${this.serverId}: ${error.message}`), { notSent: true }));
+        else resolve();
+      });
+    });
+  }
+
+  // Send a request and resolve with the raw JSON-RPC response. Optional
+  // timeoutMs and AbortSignal cancel the request and notify the server.
+  request(message, { timeoutMs = 0, signal = null } = {}) {
+    return new Promise((resolve, reject) => {
+      const id = message.id;
+      const cancel = (reason) => {
+        if (!this.pending.has(id)) return;
+        this._settle(id);
+        this.write({ jsonrpc: "2.0", method: "notifications/cancelled", params: { requestId: id, reason } }).catch(() => {});
+        reject(new Error(`Request ${message.method} to ${this.serverId} ${reason}`));
+      };
+
+      if (signal && signal.aborted) {
+        return reject(new Error(`Request ${message.method} to ${this.serverId} was cancelled`));
+      }
+
+      const entry = { resolve, reject, timer: null, cleanup: null };
+      this.pending.set(id, entry);
+      if (timeoutMs) {
+        entry.timer = setTimeout(() => cancel(`timed out after ${timeoutMs}ms`), timeoutMs);
+      }
+      if (signal) {
+        const onAbort = () => cancel('was cancelled');
+        signal.addEventListener('abort', onAbort, { once: true });
+        entry.cleanup = () => signal.removeEventListener('abort', onAbort);
+      }
+
+      this.write(message).catch((error) => {
+        if (!this.pending.has(id)) return;
+        this._settle(id);
+        reject(error);
+      });
+    });
+  }
+
+  // Fail everything still waiting, e.g. when the process exits
+  close(error) {
+    this.closed = true;
+    for (const [id, entry] of this.pending) {
+      this._settle(id);
+      entry.reject(error);
+    }
+  }
 }
 
 // Start a specific MCP server
 async function startServer(serverId, config) {
+  if (startedServerIds.has(serverId)) metrics.serverRestarts.inc([serverLabel(serverId)]);
+  if (!serverId.startsWith(TEMP_SERVER_PREFIX)) startedServerIds.add(serverId);
   if (config.type === 'http') {
     return startHTTPServer(serverId, config);
   }
   if (config.type === 'sse') {
-    // No persistent connection or initialization. Just register the server.
+    // Long-lived session pool per URL, shared by every request to this server
+    const urls = serverUrls(config);
     const sseServer = {
       riskLevel: config.riskLevel || 1,
       pid: 'sse-' + Date.now(),
       config,
       type: 'sse',
-      url: config.url
+      url: urls[0],
+      replicas: urls.map((url, index) => newReplica(index, {
+        url,
+        sessionPool: getSSESessionPool(url, null, {
+          size: config.sessionPoolSize,
+          keepAlive: true,
+          label: serverId,
+          onNotification: (message) => handleServerNotification(serverId, message)
+        })
+      })),
+      nextReplica: 0,
+      
+      // Method to send requests to SSE server
+      sendRequest: async (method, params = {}) => {
+        return withReplica(serverId, sseServer, (replica) => replica.sessionPool.request({
+          jsonrpc: "2.0",
+          id: uuidv4(),
+          method: method,
+          params: params
+        }));
+      }
     };
     serverProcesses.set(serverId, sseServer);
     serverInitializationState.set(serverId, 'initialized');
+    
+    // Warm up the first session in the background; requests reconnect on demand
+    sseServer.replicas.forEach((replica) => {
+      replica.sessionPool.acquire().catch((error) => {
+        log.warn(`[SSE] Could not open initial session for ${serverId} at ${replica.url}: ${error.message}`);
+      });
+    });
     return Promise.resolve(sseServer);
   }
   
-  console.log(`Starting MCP server process: ${serverId} with command: ${config.command} ${config.args.join(' ')}`);
+  log.info(`Starting MCP server process: ${serverId} with command: ${config.command} ${config.args.join(' ')}`);
   
   // Set default risk level to undefined for backward compatibility
   const riskLevel = config.riskLevel;
   
   if (riskLevel !== undefined) {
-    console.log(`Server ${serverId} has risk level: ${riskLevel} (${RISK_LEVEL_DESCRIPTION[riskLevel]})`);
+    log.info(`Server ${serverId} has risk level: ${riskLevel} (${RISK_LEVEL_DESCRIPTION[riskLevel]})`);
     
     // For high risk level, verify docker is configured
     if (riskLevel === RISK_LEVEL.HIGH) {
@@ -386,308 +919,1433 @@ async function startServer(serverId, config) {
         throw new Error(`Server ${serverId} has HIGH risk level but no docker configuration`);
       }
       
-      console.log(`Server ${serverId} will be started in docker container`);
+      log.info(`Server ${serverId} will be started in docker container`);
     }
   } else {
-    console.log(`Server ${serverId} has no risk level specified - using standard execution`);
+    log.info(`Server ${serverId} has no risk level specified - using standard execution`);
   }
   
-  return new Promise((resolve, reject) => {
-    try {
-      // Get the npm path
-      let commandPath = config.command;
-      
-      // If high risk, use docker
-      if (riskLevel !== undefined && riskLevel === RISK_LEVEL.HIGH) {
-        commandPath = 'docker';
-        const dockerArgs = ['run', '--rm'];
-        
-        // Add any environment variables
-        if (config.env && typeof config.env === 'object') {
-          Object.entries(config.env).forEach(([key, value]) => {
-            dockerArgs.push('-e', `${key}=${value}`);
-          });
-        }
-        
-        // Add volume mounts if specified
-        if (config.docker.volumes && Array.isArray(config.docker.volumes)) {
-          config.docker.volumes.forEach(volume => {
-            dockerArgs.push('-v', volume);
-          });
-        }
-        
-        // Add network configuration if specified
-        if (config.docker.network) {
-          dockerArgs.push('--network', config.docker.network);
-        }
-        
-        // Add the image and command
-        dockerArgs.push(config.docker.image);
-        
-        // If original command was a specific executable, use it as the command in the container
-        if (config.command !== 'npm' && config.command !== 'npx') {
-          dockerArgs.push(config.command);
-        }
-        
-        // Add the original args
-        dockerArgs.push(...config.args);
-        
-        // Update args to use docker
-        config = {
-          ...config,
-          originalCommand: config.command,
-          command: commandPath,
-          args: dockerArgs,
-          riskLevel // Keep the risk level
-        };
-        
-        console.log(`Transformed command for docker: ${commandPath} ${dockerArgs.join(' ')}`);
-      }
-      // If the command is npx or npm, try to find their full paths
-      else if (config.command === 'npx' || config.command === 'npm') {
-        // On Windows, try to use the npm executable from standard locations
-        if (process.platform === 'win32') {
-          const possiblePaths = [
-            // Global npm installation
-            path.join(process.env.APPDATA || '', 'npm', `${config.command}.cmd`),
-            // Node installation directory
-            path.join(process.env.ProgramFiles || '', 'nodejs', `${config.command}.cmd`),
-            // Common Node installation location
-            path.join('C:\\Program Files\\nodejs', `${config.command}.cmd`),
-          ];
-          
-          for (const possiblePath of possiblePaths) {
-            if (fs.existsSync(possiblePath)) {
-              console.log(`Found ${config.command} at ${possiblePath}`);
-              commandPath = possiblePath;
-              break;
-            }
-          }
-        } else {
-          // On Unix-like systems, try using which to find the command
-          try {
-            const { execSync } = require('child_process');
-            const whichOutput = execSync(`which ${config.command}`).toString().trim();
-            if (whichOutput) {
-              console.log(`Found ${config.command} at ${whichOutput}`);
-              commandPath = whichOutput;
-            }
-          } catch (error) {
-            console.error(`Error finding full path for ${config.command}:`, error.message);
-          }
-        }
+  // Requests and restarts share one server entry; each replica holds one
+  // process and its dispatcher, which change when the process is replaced
+  const serverInfo = {
+    type: 'stdio',
+    riskLevel,
+    config,
+    command: null,
+    replicas: Array.from({ length: replicaCount(config) }, (_, index) => newReplica(index, {
+      state: 'starting',
+      process: null,
+      dispatcher: null,
+      pid: null,
+      ready: null, // Settles when a starting or restarting replica can take requests
+      restartAttempts: 0,
+      startedAt: Date.now()
+    })),
+    nextReplica: 0,
+    stopping: false,
+    get pid() {
+      const replica = this.replicas.find(r => r.pid);
+      return replica ? replica.pid : null;
+    }
+  };
+  serverProcesses.set(serverId, serverInfo);
+  serverInitializationState.set(serverId, 'starting');
+  
+  try {
+    serverInfo.command = resolveStdioCommand(serverId, config);
+    const replicas = serverInfo.replicas.slice();
+    const results = await Promise.allSettled(replicas.map(async (replica) => {
+      replica.ready = takeStdioProcess(serverId, serverInfo.command);
+      const child = await replica.ready;
+      if (serverInfo.stopping) {
+        child.process.kill();
+        throw new Error(`Server ${serverId} was shut down while starting`);
       }
-      
-      console.log(`Using command path: ${commandPath}`);
-      
-      // Special handling for Windows command prompt executables (.cmd files)
-      const isWindowsCmd = process.platform === 'win32' && commandPath.endsWith('.cmd');
-      const actualCommand = isWindowsCmd ? 'cmd' : commandPath;
-      const actualArgs = isWindowsCmd ? ['/c', commandPath, ...config.args] : config.args;
-      
-      console.log(`Spawning process with command: ${actualCommand} and args:`, actualArgs);
-      
-      // Combine environment variables
-      const envVars = { ...process.env };
-      
-      // Add custom environment variables if provided
-      if (config.env && typeof config.env === 'object') {
-        console.log(`Adding environment variables for ${serverId}:`, config.env);
-        Object.assign(envVars, config.env);
+      attachStdioProcess(serverId, serverInfo, replica, child);
+    }));
+    const started = results.some(result => result.status === 'fulfilled');
+    if (!started && (serverInfo.stopping || !autoRestartEnabled(config))) {
+      throw results[0].reason;
+    }
+    
+    // Replicas that failed are retried like crashed ones, even when none came
+    // up; requests wait for the first one to restart
+    results.forEach((result, index) => {
+      if (result.status === 'fulfilled') return;
+      const replica = replicas[index];
+      log.warn(`[${replicaLabel(serverId, serverInfo, replica)}] Replica failed to start: ${result.reason.message}`);
+      if (autoRestartEnabled(config)) {
+        scheduleRestart(serverId, serverInfo, replica);
       } else {
-        console.log(`No custom environment variables for ${serverId}`);
+        serverInfo.replicas.splice(serverInfo.replicas.indexOf(replica), 1);
       }
-      
-      // Spawn the server process with shell option for better compatibility
-      const serverProcess = spawn(actualCommand, actualArgs, {
-        env: envVars,
-        stdio: 'pipe',
-        shell: !isWindowsCmd // Use shell only if not handling Windows .cmd specially
-      });
-      
-      console.log(`Server process spawned for ${serverId}, PID: ${serverProcess.pid}`);
-      
-      // Initialize the server state as 'starting'
-      serverInitializationState.set(serverId, 'starting');
-      
-      // Store the server process with its risk level
-      serverProcesses.set(serverId, {
-        process: serverProcess,
-        riskLevel,
-        pid: serverProcess.pid,
-        config
-      });
-      
-      // Set up initialization handler
-      let initializationTimeout;
-      const initializationHandler = (data) => {
-        try {
-          const responseText = data.toString();
-          const lines = responseText.split('\n').filter(line => line.trim());
-          
-          for (const line of lines) {
-            try {
-              const response = JSON.parse(line);
-              
-              // Check if this is the initialize response
-              if (response.id === 1 && response.result && response.result.protocolVersion) {
-                console.log(`Server ${serverId} initialization completed successfully`);
-                
-                // Mark server as initialized
-                serverInitializationState.set(serverId, 'initialized');
-                
-                // Remove the initialization handler
-                serverProcess.stdout.removeListener('data', initializationHandler);
-                
-                // Clear the timeout
-                if (initializationTimeout) {
-                  clearTimeout(initializationTimeout);
-                }
-                
-                // Send initialized notification to complete the handshake
-                const initializedNotification = {
-                  jsonrpc: "2.0",
-                  method: "notifications/initialized"
-                };
-                
-                serverProcess.stdin.write(JSON.stringify(initializedNotification) + '\n');
-                console.log(`Sent initialized notification to ${serverId}`);
-                
-                // Add regular stdout handler for future messages
-                serverProcess.stdout.on('data', regularStdoutHandler);
-                
-                // Resolve the promise to indicate the server is ready
-                resolve(serverProcess);
-                return;
-              }
-            } catch (parseError) {
-              // Ignore JSON parsing errors during initialization
-              continue;
-            }
-          }
-        } catch (error) {
-          console.error(`Error processing initialization response from ${serverId}:`, error);
-        }
-      };
-      
-      // Set up regular stdout handler for non-initialization messages
-      const regularStdoutHandler = (data) => {
-        console.log(`[${serverId}] STDOUT: ${data.toString().trim()}`);
-      };
-      
-      // Set up stderr handler
-      serverProcess.stderr.on('data', (data) => {
-        console.log(`[${serverId}] STDERR: ${data.toString().trim()}`);
-      });
-      
-      serverProcess.on('error', (error) => {
-        console.error(`[${serverId}] Process error: ${error.message}`);
-        serverInitializationState.set(serverId, 'error');
-        reject(error);
-      });
-      
-      serverProcess.on('close', (code) => {
-        console.log(`[${serverId}] Process exited with code ${code}`);
-        serverProcesses.delete(serverId);
-        serverInitializationState.delete(serverId);
-      });
-      
-      // Add initialization handler first
-      serverProcess.stdout.on('data', initializationHandler);
-      
-      // Set initialization timeout
-      initializationTimeout = setTimeout(() => {
-        console.error(`Server ${serverId} initialization timed out`);
-        serverInitializationState.set(serverId, 'timeout');
-        serverProcess.stdout.removeListener('data', initializationHandler);
-        reject(new Error(`Server ${serverId} initialization timed out`));
-              }, 30000); // 30 second timeout for initialization
-      
-      // Wait a moment for the process to start, then send initialize request
-      setTimeout(() => {
-        const initializeRequest = {
-          jsonrpc: "2.0",
-          id: 1,
-          method: "initialize",
-          params: {
-            protocolVersion: "2025-03-26",
-            clientInfo: {
-              name: "mcp-bridge",
-              version: "1.0.0"
-            },
-            capabilities: {
-              // Add capabilities as needed
-            }
-          }
-        };
-        
-        serverProcess.stdin.write(JSON.stringify(initializeRequest) + '\n');
-        console.log(`Sent initialize request to ${serverId}`);
-      }, 1000);
-      
-    } catch (error) {
-      console.error(`Error starting server ${serverId}:`, error);
-      serverInitializationState.set(serverId, 'error');
-      reject(error);
+    });
+    if (!started) {
+      log.warn(`Server ${serverId} failed to start, retrying in the background`);
+      return serverInfo;
     }
-  });
-}
-
-// Shutdown an MCP server
-async function shutdownServer(serverId) {
-  console.log(`Shutting down server: ${serverId}`);
-  const serverInfo = serverProcesses.get(serverId);
-  if (serverInfo) {
-    if (serverInfo.type === 'http') {
-      console.log(`Disconnecting HTTP server ${serverId}`);
-      // HTTP servers don't need special cleanup
-    } else if (serverInfo.type === 'sse') {
-      // No persistent SSE connection to close
-      // No heartbeat interval to clear
-    } else {
-      try {
-        console.log(`Killing process for ${serverId}`);
-        serverInfo.process.kill();
-      } catch (error) {
-        console.error(`Error killing process for ${serverId}: ${error.message}`);
-      }
+    log.info(`Server ${serverId} initialization completed successfully`);
+    fillWarmPool(serverId, serverInfo);
+    return serverInfo;
+  } catch (error) {
+    log.error(`Server ${serverId} initialization failed: ${error.message}`);
+    if (serverInitializationState.get(serverId) === 'starting') {
+      serverInitializationState.set(serverId, /timed out/.test(error.message) ? 'timeout' : 'error');
     }
-    serverProcesses.delete(serverId);
+    throw error;
   }
-  serverInitializationState.delete(serverId);
-  console.log(`Server ${serverId} shutdown complete`);
 }
 
-// MCP request handler
-async function sendMCPRequest(serverId, method, params = {}, confirmationId = null) {
-  const serverInfo = serverProcesses.get(serverId);
-  if (!serverInfo) {
-    throw new Error(`Server '${serverId}' not found or not connected`);
+// Work out the executable, arguments and environment for a stdio server.
+// Restarts and warm spares reuse the result.
+function resolveStdioCommand(serverId, config) {
+  const riskLevel = config.riskLevel;
+  
+  // Get the npm path
+  let commandPath = config.command;
+  
+  // If high risk, use docker
+  if (riskLevel !== undefined && riskLevel === RISK_LEVEL.HIGH) {
+    commandPath = 'docker';
+    const dockerArgs = ['run', '--rm'];
+    
+    // Add any environment variables
+    if (config.env && typeof config.env === 'object') {
+      Object.entries(config.env).forEach(([key, value]) => {
+        dockerArgs.push('-e', `${key}=${value}`);
+      });
+    }
+    
+    // Add volume mounts if specified
+    if (config.docker.volumes && Array.isArray(config.docker.volumes)) {
+      config.docker.volumes.forEach(volume => {
+        dockerArgs.push('-v', volume);
+      });
+    }
+    
+    // Add network configuration if specified
+    if (config.docker.network) {
+      dockerArgs.push('--network', config.docker.network);
+    }
+    
+    // Add the image and command
+    dockerArgs.push(config.docker.image);
+    
+    // If original command was a specific executable, use it as the command in the container
+    if (config.command !== 'npm' && config.command !== 'npx') {
+      dockerArgs.push(config.command);
+    }
+    
+    // Add the original args
+    dockerArgs.push(...config.args);
+    
+    // Update args to use docker
+    config = {
+      ...config,
+      originalCommand: config.command,
+      command: commandPath,
+      args: dockerArgs,
+      riskLevel // Keep the risk level
+    };
+    
+    log.info(`Transformed command for docker: ${commandPath} ${dockerArgs.join(' ')}`);
+  }
+  // If the command is npx or npm, try to find their full paths
+  else if (config.command === 'npx' || config.command === 'npm') {
+    // On Windows, try to use the npm executable from standard locations
+    if (process.platform === 'win32') {
+      const possiblePaths = [
+        // Global npm installation
+        path.join(process.env.APPDATA || '', 'npm', `${config.command}.cmd`),
+        // Node installation directory
+        path.join(process.env.ProgramFiles || '', 'nodejs', `${config.command}.cmd`),
+        // Common Node installation location
+        path.join('C:\\Program Files\\nodejs', `${config.command}.cmd`),
+      ];
+      
+      for (const possiblePath of possiblePaths) {
+        if (fs.existsSync(possiblePath)) {
+          log.info(`Found ${config.command} at ${possiblePath}`);
+          commandPath = possiblePath;
+          break;
+        }
+      }
+    } else {
+      // On Unix-like systems, try using which to find the command
+      try {
+        const { execSync } = require('child_process');
+        const whichOutput = execSync(`which ${config.command}`).toString().trim();
+        if (whichOutput) {
+          log.info(`Found ${config.command} at ${whichOutput}`);
+          commandPath = whichOutput;
+        }
+      } catch (error) {
+        log.error(`Error finding full path for ${config.command}`, { error: error.message });
+      }
+    }
+  }
+  
+  log.info(`Using command path: ${commandPath}`);
+  
+  // Special handling for Windows command prompt executables (.cmd files)
+  const isWindowsCmd = process.platform === 'win32' && commandPath.endsWith('.cmd');
+  const actualCommand = isWindowsCmd ? 'cmd' : commandPath;
+  const actualArgs = isWindowsCmd ? ['/c', commandPath, ...config.args] : config.args;
+  
+  log.info(`Spawning process with command: ${actualCommand}`, { args: actualArgs });
+  
+  // Combine environment variables
+  const envVars = { ...process.env };
+  
+  // Add custom environment variables if provided
+  if (config.env && typeof config.env === 'object') {
+    log.info(`Adding environment variables for ${serverId}`, { keys: Object.keys(config.env) });
+    Object.assign(envVars, config.env);
+  } else {
+    log.info(`No custom environment variables for ${serverId}`);
+  }
+  
+  return { command: actualCommand, args: actualArgs, env: envVars, shell: !isWindowsCmd };
+}
+
+// Spawn a stdio server process and complete the MCP handshake. The initialize
+// request goes out as soon as the process has spawned; its stdin buffers it
+// until the server starts reading. Resolves with { process, dispatcher, startedAt }.
+function spawnStdioProcess(serverId, command) {
+  return new Promise((resolve, reject) => {
+    const spawnStart = process.hrtime.bigint();
+    // Use a shell only if not handling Windows .cmd specially
+    const serverProcess = spawn(command.command, command.args, {
+      env: command.env,
+      stdio: 'pipe',
+      shell: command.shell
+    });
+    
+    // One dispatcher owns stdout and routes every response by JSON-RPC id
+    const dispatcher = new StdioDispatcher(serverId, serverProcess, {
+      onNotification: (message) => handleServerNotification(serverId, message)
+    });
+    
+    serverProcess.stderr.on('data', (data) => {
+      log.info(`[${serverId}] STDERR: ${data.toString().trim()}`);
+    });
+    
+    serverProcess.on('error', (error) => {
+      log.error(`[${serverId}] Process error: ${error.message}`);
+      dispatcher.close(error);
+      reject(error);
+    });
+    
+    serverProcess.once('close', (code) => {
+      dispatcher.close(new Error(`Server ${serverId} exited with code ${code}`));
+    });
+    
+    serverProcess.once('spawn', async () => {
+      metrics.upstreamConnect.observe([serverLabel(serverId), 'stdio'], secondsSince(spawnStart));
+      log.info(`Server process spawned for ${serverId}, PID: ${serverProcess.pid}`);
+      const initializeRequest = {
+        jsonrpc: "2.0",
+        id: 1,
+        method: "initialize",
+        params: {
+          protocolVersion: "2025-03-26",
+          clientInfo: {
+            name: "mcp-bridge",
+            version: "1.0.0"
+          },
+          capabilities: {
+            // Add capabilities as needed
+          }
+        }
+      };
+      
+      try {
+        log.info(`Sending initialize request to ${serverId}`);
+        const response = await metrics.upstreamHandshake.time([serverLabel(serverId), 'stdio'],
+          () => dispatcher.request(initializeRequest, { timeoutMs: SERVER_INIT_TIMEOUT_MS }));
+        if (!response.result || !response.result.protocolVersion) {
+          throw new Error(response.error ? response.error.message : 'Invalid initialization response');
+        }
+        
+        // Send initialized notification to complete the handshake
+        await dispatcher.write({
+          jsonrpc: "2.0",
+          method: "notifications/initialized"
+        });
+        log.info(`Sent initialized notification to ${serverId}`);
+        resolve({ process: serverProcess, dispatcher, startedAt: Date.now() });
+      } catch (error) {
+        serverProcess.kill();
+        reject(error);
+      }
+    });
+  });
+}
+
+// Make a spawned process the one that serves requests for a replica
+function attachStdioProcess(serverId, serverInfo, replica, child) {
+  replica.process = child.process;
+  replica.dispatcher = child.dispatcher;
+  replica.pid = child.process.pid;
+  replica.startedAt = child.startedAt;
+  replica.state = 'initialized';
+  replica.healthy = true;
+  replica.failures = 0;
+  serverInitializationState.set(serverId, 'initialized');
+  
+  child.process.once('close', (code) => {
+    if (replica.process !== child.process) return;
+    log.info(`[${replicaLabel(serverId, serverInfo, replica)}] Process exited with code ${code}`);
+    metrics.serverExits.inc([serverLabel(serverId)]);
+    if (serverInfo.stopping || serverProcesses.get(serverId) !== serverInfo) return;
+    if (!autoRestartEnabled(serverInfo.config)) {
+      serverInfo.replicas.splice(serverInfo.replicas.indexOf(replica), 1);
+      if (!serverInfo.replicas.length) {
+        serverProcesses.delete(serverId);
+        serverInitializationState.delete(serverId);
+      }
+      return;
+    }
+    scheduleRestart(serverId, serverInfo, replica);
+  });
+}
+
+function autoRestartEnabled(config) {
+  return config.autoRestart !== undefined ? config.autoRestart !== false : SERVER_AUTO_RESTART;
+}
+
+// Bring a crashed server back. The first crash after a stable run restarts at
+// once; crashes in quick succession back off exponentially.
+function scheduleRestart(serverId, serverInfo, replica) {
+  const label = replicaLabel(serverId, serverInfo, replica);
+  if (Date.now() - replica.startedAt >= SERVER_RESTART_RESET_MS) {
+    replica.restartAttempts = 0;
+  }
+  const delay = replica.restartAttempts === 0 ? 0 :
+    Math.min(SERVER_RESTART_BASE_DELAY_MS * 2 ** (replica.restartAttempts - 1), SERVER_RESTART_MAX_DELAY_MS);
+  replica.restartAttempts++;
+  replica.state = 'restarting';
+  // The server only counts as restarting once no replica can serve it
+  if (!serverInfo.replicas.some(r => r.state === 'initialized')) {
+    serverInitializationState.set(serverId, 'restarting');
+  }
+  log.warn(`[${label}] Restarting in ${delay} ms (attempt ${replica.restartAttempts})`);
+  
+  replica.ready = new Promise(resolve => setTimeout(resolve, delay).unref())
+    .then(() => {
+      if (serverInfo.stopping) throw new Error(`Server ${serverId} was shut down`);
+      return takeStdioProcess(serverId, serverInfo.command);
+    })
+    .then((child) => {
+      if (serverInfo.stopping) {
+        child.process.kill();
+        throw new Error(`Server ${serverId} was shut down`);
+      }
+      attachStdioProcess(serverId, serverInfo, replica, child);
+      metrics.serverRestarts.inc([serverLabel(serverId)]);
+      log.info(`[${label}] Restarted, PID: ${child.process.pid}`);
+      fillWarmPool(serverId, serverInfo);
+    }, (error) => {
+      if (serverInfo.stopping) throw error;
+      log.error(`[${label}] Restart failed: ${error.message}`);
+      replica.startedAt = Date.now(); // A failed start does not count as a stable run
+      scheduleRestart(serverId, serverInfo, replica);
+      return replica.ready;
+    });
+  replica.ready.catch(() => {}); // Waiters handle failures themselves
+}
+
+// Warm pools - initialized spare processes per stdio server, promoted when the
+// active process exits so a crash costs no spawn or handshake time
+const warmPools = new Map(); // serverId -> { spares: [{ process, dispatcher, startedAt }], filling }
+
+function warmPoolSize(config) {
+  return config.warmPool !== undefined ? (parseInt(config.warmPool, 10) || 0) : SERVER_WARM_POOL;
+}
+
+function fillWarmPool(serverId, serverInfo) {
+  const size = warmPoolSize(serverInfo.config);
+  if (size <= 0) return;
+  let pool = warmPools.get(serverId);
+  if (!pool) {
+    pool = { spares: [], filling: 0 };
+    warmPools.set(serverId, pool);
+  }
+  while (pool.spares.length + pool.filling < size) {
+    pool.filling++;
+    spawnStdioProcess(serverId, serverInfo.command).then((child) => {
+      pool.filling--;
+      if (serverInfo.stopping || warmPools.get(serverId) !== pool) {
+        child.process.kill();
+        return;
+      }
+      pool.spares.push(child);
+      child.process.once('close', () => {
+        const index = pool.spares.indexOf(child);
+        if (index !== -1) pool.spares.splice(index, 1);
+      });
+    }, (error) => {
+      pool.filling--;
+      log.warn(`[${serverId}] Could not start warm spare: ${error.message}`);
+    });
+  }
+}
+
+// Use a warm spare when one is ready, otherwise spawn a new process
+function takeStdioProcess(serverId, command) {
+  const pool = warmPools.get(serverId);
+  const spare = pool && pool.spares.shift();
+  if (spare) {
+    log.info(`[${serverId}] Promoting warm spare, PID: ${spare.process.pid}`);
+    return Promise.resolve(spare);
+  }
+  return spawnStdioProcess(serverId, command);
+}
+
+function stopWarmPool(serverId) {
+  const pool = warmPools.get(serverId);
+  if (!pool) return;
+  warmPools.delete(serverId);
+  pool.spares.forEach(child => child.process.kill());
+}
+
+// Replicas - every running server has one or more: stdio processes, or the
+// URLs of an HTTP/SSE server. Calls go to the healthy replica with the fewest
+// requests outstanding. A replica that fails REPLICA_MAX_FAILURES times in a
+// row leaves the rotation until a health check passes; a stdio process is
+// also replaced.
+function replicaCount(config) {
+  return Math.max(1, parseInt(config.replicas, 10) || 1);
+}
+
+function serverUrls(config) {
+  return Array.isArray(config.urls) && config.urls.length ? config.urls : [config.url];
+}
+
+function newReplica(index, fields = {}) {
+  return { index, state: 'initialized', healthy: true, failures: 0, inFlight: 0, ...fields };
+}
+
+// Log prefix: the server id, plus the replica index when there are several
+function replicaLabel(serverId, serverInfo, replica) {
+  return serverInfo.replicas.length > 1 || replica.index > 0 ? `${serverId}#${replica.index}` : serverId;
+}
+
+// Least outstanding requests among ready, healthy replicas; ties go round
+// robin. When every ready replica is unhealthy one of them is used anyway.
+function pickReplica(serverInfo, exclude = null) {
+  const ready = serverInfo.replicas.filter(r => r.state === 'initialized' && r !== exclude);
+  const healthy = ready.filter(r => r.healthy);
+  const candidates = healthy.length ? healthy : ready;
+  if (!candidates.length) return null;
+  const offset = serverInfo.nextReplica++ % candidates.length;
+  let best = null;
+  for (let i = 0; i < candidates.length; i++) {
+    const replica = candidates[(offset + i) % candidates.length];
+    if (!best || replica.inFlight < best.inFlight) best = replica;
+  }
+  return best;
+}
+
+// Cancellations and HTTP 4xx answers say nothing about a replica's health
+function isReplicaFailure(error) {
+  if (error.response) return error.response.status >= 500;
+  return !axios.isCancel(error) && !/was cancelled/.test(error.message);
+}
+
+// The request never left the bridge, so another replica can safely take it
+function requestNotSent(error) {
+  return Boolean(error.notSent) || (!error.response && error.code === 'ECONNREFUSED');
+}
+
+function recordReplicaFailure(serverId, serverInfo, replica, error) {
+  replica.failures++;
+  if (serverInfo.replicas.length < 2 || !replica.healthy || replica.failures < REPLICA_MAX_FAILURES) return;
+  replica.healthy = false;
+  log.warn(`[${replicaLabel(serverId, serverInfo, replica)}] Out of rotation after ${replica.failures} failures: ${error.message}`);
+  if (serverInfo.type === 'stdio' && replica.process && autoRestartEnabled(serverInfo.config)) {
+    replica.process.kill();
+  }
+}
+
+// Run send(replica) on the replica pickReplica chooses, keeping its
+// outstanding count and failure streak up to date. A request that could not
+// be sent is tried once more on another replica.
+async function withReplica(serverId, serverInfo, send, exclude = null) {
+  const replica = pickReplica(serverInfo, exclude);
+  if (!replica) throw new Error(`Server ${serverId} has no replica ready`);
+  replica.inFlight++;
+  try {
+    const result = await send(replica);
+    replica.failures = 0;
+    return result;
+  } catch (error) {
+    if (isReplicaFailure(error)) recordReplicaFailure(serverId, serverInfo, replica, error);
+    if (exclude || !requestNotSent(error) || !pickReplica(serverInfo, replica)) throw error;
+  } finally {
+    replica.inFlight--;
+  }
+  return withReplica(serverId, serverInfo, send, replica);
+}
+
+// Ping one replica. Any JSON-RPC answer, even an error, shows it is alive.
+async function checkReplicaHealth(serverId, serverInfo, replica) {
+  const request = { jsonrpc: "2.0", id: uuidv4(), method: 'ping', params: {} };
+  try {
+    if (serverInfo.type === 'stdio') {
+      await replica.dispatcher.request(request, { timeoutMs: REPLICA_HEALTH_TIMEOUT_MS });
+    } else if (serverInfo.type === 'sse') {
+      await replica.sessionPool.request(request, REPLICA_HEALTH_TIMEOUT_MS);
+    } else {
+      await axios.post(replica.url, request, {
+        headers: { 'Content-Type': 'application/json' },
+        timeout: REPLICA_HEALTH_TIMEOUT_MS
+      });
+    }
+  } catch (error) {
+    if (isReplicaFailure(error)) {
+      recordReplicaFailure(serverId, serverInfo, replica, error);
+      return;
+    }
+  }
+  replica.failures = 0;
+  if (!replica.healthy) {
+    replica.healthy = true;
+    log.info(`[${replicaLabel(serverId, serverInfo, replica)}] Health check passed, back in rotation`);
+  }
+}
+
+// Only replicated servers are checked; a lone replica has nowhere to shift load
+setInterval(() => {
+  for (const [serverId, serverInfo] of serverProcesses) {
+    if (serverInfo.replicas.length < 2) continue;
+    serverInfo.replicas
+      .filter(replica => replica.state === 'initialized')
+      .forEach(replica => checkReplicaHealth(serverId, serverInfo, replica));
+  }
+}, REPLICA_HEALTH_INTERVAL_MS).unref();
+
+// Shutdown an MCP server
+async function shutdownServer(serverId) {
+  log.info(`Shutting down server: ${serverId}`);
+  const serverInfo = serverProcesses.get(serverId);
+  lazyServers.delete(serverId);
+  stopWarmPool(serverId);
+  if (serverInfo) {
+    serverInfo.stopping = true; // Keeps the exit from triggering a restart
+    if (serverInfo.type === 'http') {
+      log.info(`Disconnecting HTTP server ${serverId}`);
+      // HTTP servers don't need special cleanup
+    } else if (serverInfo.type === 'sse') {
+      log.info(`Closing SSE sessions for ${serverId}`);
+      serverInfo.replicas.forEach(replica => closeSSESessionPool(replica.url, null));
+    } else {
+      try {
+        log.info(`Killing process for ${serverId}`);
+        serverInfo.replicas.forEach(replica => replica.process && replica.process.kill());
+      } catch (error) {
+        log.error(`Error killing process for ${serverId}: ${error.message}`);
+      }
+    }
+    serverProcesses.delete(serverId);
+  }
+  serverInitializationState.delete(serverId);
+  invalidateCatalog(serverId);
+  resultCache.deleteServer(serverId);
+  removeFromToolIndex(serverId);
+  log.info(`Server ${serverId} shutdown complete`);
+}
+
+// MCP request handler
+async function sendMCPRequest(serverId, method, params = {}, confirmationId = null) {
+  const serverInfo = serverProcesses.get(serverId);
+  if (!serverInfo) {
+    throw new Error(`Server '${serverId}' not found or not connected`);
+  }
+  if (serverInfo.type === 'http') {
+    // HTTP server: use HTTP request
+    return await sendShared(serverId, method, params, () => withReplica(serverId, serverInfo,
+      (replica) => sendHttpMCPRequest(replica.url, null, {
+        jsonrpc: '2.0',
+        id: confirmationId || uuidv4(),
+        method,
+        params
+      }, method, params)));
+  } else if (serverInfo.type === 'sse') {
+    // SSE server: use the server's pooled sessions
+    const response = await sendShared(serverId, method, params, () => serverInfo.sendRequest(method, params));
+    if (response.error) {
+      throw new Error(response.error.message || 'Unknown error from SSE server');
+    }
+    return response.result || response;
+  } else if (serverInfo.type === 'stdio') {
+    // stdio server: multiplexed over the process pipes
+    const response = await sendShared(serverId, method, params,
+      () => sendStdioMCPRequest(serverId, serverInfo, method, params));
+    if (response.error) {
+      throw new Error(response.error.message || 'Unknown error');
+    }
+    return response.result;
+  } else {
+    throw new Error(`Unknown server type for '${serverId}'`);
+  }
+}
+
+// Catalog cache - tools, resources and prompts per server
+const CATALOG_KINDS = ['tools', 'resources', 'prompts'];
+const CATALOG_TTL_MS = process.env.CATALOG_TTL_MS !== undefined
+  ? parseInt(process.env.CATALOG_TTL_MS, 10)
+  : 5 * 60 * 1000; // 0 disables caching
+const catalogCache = new Map(); // `${serverId}:${kind}` -> { data, body, etag, expiresAt } or { promise }
+
+function catalogTtlFor(serverId) {
+  const serverInfo = serverProcesses.get(serverId);
+  const ttl = serverInfo && serverInfo.config ? serverInfo.config.catalogTtlMs : undefined;
+  return ttl !== undefined ? ttl : CATALOG_TTL_MS;
+}
+
+// Ask the server for a fresh catalog and normalize the JSON-RPC envelope away
+async function fetchCatalog(serverId, kind) {
+  let result = await sendMCPRequest(serverId, `${kind}/list`);
+  if (result && result.jsonrpc === '2.0') {
+    if (result.error) {
+      throw new Error(result.error.message || `Failed to list ${kind}`);
+    }
+    result = result.result;
+  }
+  if (result && typeof result === 'string' && result.startsWith('data: ')) {
+    const parsed = JSON.parse(result.replace(/^data:\s*/, '').trim());
+    result = parsed.result || parsed;
+  }
+  return result || { [kind]: [] };
+}
+
+// Return the cached catalog entry, fetching it when missing, stale or forced.
+// Concurrent misses share a single upstream request.
+async function getCatalog(serverId, kind, { refresh = false } = {}) {
+  const key = `${serverId}:${kind}`;
+  const cached = catalogCache.get(key);
+  if (cached) {
+    if (cached.promise) return cached.promise;
+    if (!refresh && cached.expiresAt > Date.now()) {
+      metrics.catalogRequests.inc([kind, 'hit']);
+      return cached;
+    }
+  }
+  metrics.catalogRequests.inc([kind, 'miss']);
+  
+  const promise = fetchCatalog(serverId, kind).then((data) => {
+    const body = JSON.stringify(data);
+    const entry = {
+      data,
+      body,
+      etag: `"${crypto.createHash('sha1').update(body).digest('base64url')}"`,
+      expiresAt: Date.now() + catalogTtlFor(serverId)
+    };
+    // Only store if nothing invalidated the entry while we were fetching
+    if (catalogCache.get(key) && catalogCache.get(key).promise === promise) {
+      catalogCache.set(key, entry);
+      if (kind === 'tools' && serverProcesses.has(serverId)) updateToolIndex(serverId, data.tools);
+      if (entry.expiresAt > Date.now()) {
+        clusterPublish('catalog', { op: 'set', key, entry: { body, etag: entry.etag, expiresAt: entry.expiresAt } });
+      }
+    }
+    return entry;
+  }, (error) => {
+    if (catalogCache.get(key) && catalogCache.get(key).promise === promise) {
+      catalogCache.delete(key);
+    }
+    throw error;
+  });
+  catalogCache.set(key, { promise });
+  return promise;
+}
+
+function invalidateCatalog(serverId, kinds = CATALOG_KINDS) {
+  for (const kind of kinds) {
+    catalogCache.delete(`${serverId}:${kind}`);
+  }
+}
+
+// Catalogs fetched by one cluster worker are served by the others until they
+// expire. Invalidations stay local: every worker hears list_changed from its
+// own server connection.
+function storeSharedCatalog(key, { body, etag, expiresAt }) {
+  if (expiresAt <= Date.now()) return;
+  const data = JSON.parse(body);
+  catalogCache.set(key, { data, body, etag, expiresAt });
+  const separator = key.lastIndexOf(':');
+  const serverId = key.slice(0, separator);
+  if (key.slice(separator + 1) === 'tools' && serverProcesses.has(serverId)) updateToolIndex(serverId, data.tools);
+}
+
+clusterChannels.set('catalog', {
+  apply: (message) => {
+    if (message.op === 'set') storeSharedCatalog(message.key, message.entry);
+    else if (message.op === 'snapshot') message.entries.forEach(([key, entry]) => storeSharedCatalog(key, entry));
+  },
+  snapshot: () => Array.from(catalogCache)
+    .filter(([, entry]) => !entry.promise && entry.expiresAt > Date.now())
+    .map(([key, { body, etag, expiresAt }]) => [key, { body, etag, expiresAt }])
+});
+
+// Progress listeners for streamed tool calls, keyed by MCP progressToken
+const progressListeners = new Map();
+
+// Handle notifications pushed by an MCP server
+function handleServerNotification(serverId, message) {
+  if (message.method === 'notifications/progress') {
+    const listener = message.params && progressListeners.get(message.params.progressToken);
+    if (listener) listener(message.params);
+    return;
+  }
+  const match = /^notifications\/(tools|resources|prompts)\/list_changed$/.exec(message.method);
+  if (match) {
+    const kind = match[1];
+    log.info(`[CATALOG] ${serverId} reported ${kind} changed, refreshing`);
+    invalidateCatalog(serverId, [kind]);
+    getCatalog(serverId, kind).catch((error) => {
+      log.warn(`[CATALOG] Refresh of ${kind} for ${serverId} failed: ${error.message}`);
+    });
+    return;
+  }
+  log.debug(`[${serverId}] Notification: ${message.method}`);
+}
+
+// Send a cached catalog with an ETag, answering 304 when the client is current
+async function sendCatalog(req, res, serverId, kind) {
+  const refresh = req.query.refresh === 'true' || req.query.refresh === '1';
+  const entry = await getCatalog(serverId, kind, { refresh });
+  res.set('ETag', entry.etag);
+  res.set('Cache-Control', 'no-cache'); // Clients revalidate with If-None-Match
+  if (req.fresh) {
+    return res.status(304).end();
+  }
+  res.type('application/json').send(entry.body);
+}
+
+// Result cache for deterministic tools. Servers opt in through mcp_config.json
+// with "resultCache": true (every tool) or a list of tool names, plus an
+// optional "resultCacheTtlMs". Entries are raw JSON-RPC responses keyed by
+// server, tool and canonicalized arguments.
+const RESULT_CACHE_TTL_MS = parseInt(process.env.RESULT_CACHE_TTL_MS, 10) || 5 * 60 * 1000;
+const RESULT_CACHE_MAX_ENTRIES = parseInt(process.env.RESULT_CACHE_MAX_ENTRIES, 10) || 10000;
+const RESULT_CACHE_MAX_BYTES = parseInt(process.env.RESULT_CACHE_MAX_BYTES, 10) || 64 * 1024 * 1024;
+
+// LRU with per-entry TTL and caps on entry count and total size. A Map keeps
+// insertion order, so re-inserting on every hit puts the oldest entry first.
+class ResultCache {
+  constructor(maxEntries = RESULT_CACHE_MAX_ENTRIES, maxBytes = RESULT_CACHE_MAX_BYTES) {
+    this.maxEntries = maxEntries;
+    this.maxBytes = maxBytes;
+    this.entries = new Map(); // key -> { value, size, expiresAt }
+    this.bytes = 0;
+    this.stats = { hits: 0, misses: 0, evictions: 0, expired: 0 };
+  }
+
+  get(key) {
+    const entry = this.entries.get(key);
+    if (!entry) {
+      this.stats.misses++;
+      return undefined;
+    }
+    if (entry.expiresAt <= Date.now()) {
+      this._remove(key, entry);
+      this.stats.expired++;
+      this.stats.misses++;
+      return undefined;
+    }
+    this.entries.delete(key);
+    this.entries.set(key, entry);
+    this.stats.hits++;
+    return entry.value;
+  }
+
+  set(key, value, ttlMs) {
+    const size = Buffer.byteLength(JSON.stringify(value));
+    if (size > this.maxBytes) return; // Would evict everything else
+    const existing = this.entries.get(key);
+    if (existing) this._remove(key, existing);
+    this.entries.set(key, { value, size, expiresAt: Date.now() + ttlMs });
+    this.bytes += size;
+    for (const [oldestKey, oldest] of this.entries) {
+      if (this.entries.size <= this.maxEntries && this.bytes <= this.maxBytes) break;
+      this._remove(oldestKey, oldest);
+      this.stats.evictions++;
+    }
+  }
+
+  _remove(key, entry) {
+    this.entries.delete(key);
+    this.bytes -= entry.size;
+  }
+
+  // Drop every entry for a server, e.g. when it is stopped or replaced
+  deleteServer(serverId) {
+    const prefix = `${serverId}\0`;
+    for (const [key, entry] of this.entries) {
+      if (key.startsWith(prefix)) this._remove(key, entry);
+    }
+  }
+
+  metrics() {
+    const lookups = this.stats.hits + this.stats.misses;
+    return {
+      entries: this.entries.size,
+      bytes: this.bytes,
+      max_entries: this.maxEntries,
+      max_bytes: this.maxBytes,
+      hits: this.stats.hits,
+      misses: this.stats.misses,
+      hit_ratio: lookups ? this.stats.hits / lookups : 0,
+      evictions: this.stats.evictions,
+      expired: this.stats.expired
+    };
+  }
+}
+
+const resultCache = new ResultCache();
+
+// JSON with object keys sorted, so argument order doesn't change the cache key
+function canonicalJson(value) {
+  if (Array.isArray(value)) {
+    return `[${value.map(canonicalJson).join(',')}]`;
+  }
+  if (value && typeof value === 'object') {
+    return `{${Object.keys(value).sort()
+      .filter(key => value[key] !== undefined)
+      .map(key => `${JSON.stringify(key)}:${canonicalJson(value[key])}`)
+      .join(',')}}`;
+  }
+  return JSON.stringify(value === undefined ? null : value);
+}
+
+function isCacheableTool(serverId, toolName) {
+  const serverInfo = serverProcesses.get(serverId);
+  const setting = serverInfo && serverInfo.config ? serverInfo.config.resultCache : undefined;
+  return setting === true || (Array.isArray(setting) && setting.includes(toolName));
+}
+
+// Run a tools/call through the result cache when the tool opted in. `send`
+// performs the upstream request and resolves with the raw JSON-RPC response;
+// only successful results are stored.
+async function cachedToolCall(serverId, method, params, send) {
+  if (method !== 'tools/call' || !params || !isCacheableTool(serverId, params.name)) {
+    return send();
+  }
+  const key = `${serverId}\0${params.name}\0${crypto.createHash('sha1').update(canonicalJson(params.arguments || {})).digest('base64url')}`;
+  const cached = resultCache.get(key);
+  if (cached !== undefined) return cached;
+
+  const serverInfo = serverProcesses.get(serverId);
+  const response = await send();
+  const failed = !response || typeof response !== 'object' || response.error ||
+    (response.result && response.result.isError);
+  // Shutting a server down clears its cache entries; a call that finishes
+  // after that must not store a result for the removed (or replaced) server
+  const current = serverProcesses.get(serverId) === serverInfo;
+  // Callers that shared a coalesced request all get here; store it once
+  if (!failed && current && !resultCache.entries.has(key)) {
+    const ttl = serverInfo.config.resultCacheTtlMs;
+    resultCache.set(key, response, ttl !== undefined ? ttl : RESULT_CACHE_TTL_MS);
+  }
+  return response;
+}
+
+// Single-flight coalescing - identical concurrent requests to a server share
+// one upstream call. Only read-only methods in COALESCE_METHODS are merged;
+// tools/call is merged only for tools a server lists in "coalesceTools"
+// (true for all) or has opted into the result cache, since other tools may
+// have side effects.
+const COALESCE_METHODS = (process.env.COALESCE_METHODS ||
+  'tools/list,resources/list,resources/templates/list,resources/read,prompts/list,prompts/get')
+  .split(',').map(method => method.trim()).filter(Boolean);
+const inFlightRequests = new Map(); // `${serverId}\0${method}\0${params}` -> promise
+const coalesceStats = { upstream: 0, merged: 0 };
+
+function isCoalescable(serverId, method, params) {
+  if (method !== 'tools/call') {
+    return COALESCE_METHODS.includes(method);
+  }
+  if (!params || !params.name) return false;
+  const serverInfo = serverProcesses.get(serverId);
+  const setting = serverInfo && serverInfo.config ? serverInfo.config.coalesceTools : undefined;
+  return setting === true || (Array.isArray(setting) && setting.includes(params.name)) ||
+    isCacheableTool(serverId, params.name);
+}
+
+function singleFlight(serverId, method, params, send) {
+  if (!isCoalescable(serverId, method, params)) {
+    return send();
+  }
+  const key = `${serverId}\0${method}\0${canonicalJson(params || {})}`;
+  const existing = inFlightRequests.get(key);
+  if (existing) {
+    coalesceStats.merged++;
+    return existing;
+  }
+  const promise = Promise.resolve()
+    .then(send)
+    .finally(() => inFlightRequests.delete(key));
+  inFlightRequests.set(key, promise);
+  coalesceStats.upstream++;
+  return promise;
+}
+
+// Send a request through the result cache and single-flight coalescing.
+// `send` performs the upstream request and resolves with the raw JSON-RPC response.
+function sendShared(serverId, method, params, send) {
+  return cachedToolCall(serverId, method, params,
+    () => singleFlight(serverId, method, params, () => timeUpstream(serverId, method, params, send)));
+}
+
+// Record upstream response time and outcome. A JSON-RPC error response counts as "error",
+// a transport failure or timeout as "failed".
+async function timeUpstream(serverId, method, params, send) {
+  const tool = method === 'tools/call' && params ? toolLabel(params.name) : '';
+  const start = process.hrtime.bigint();
+  let outcome = 'failed';
+  try {
+    const response = await send();
+    outcome = response && response.error ? 'error' : 'ok';
+    return response;
+  } finally {
+    const server = serverLabel(serverId);
+    metrics.upstreamDuration.observe([server, method, tool], secondsSince(start));
+    metrics.upstreamRequests.inc([server, method, tool, outcome]);
+  }
+}
+
+// Tool index - tool name -> ids of the servers that provide it
+const toolIndex = new Map(); // toolName -> Set of serverIds
+const toolIndexByServer = new Map(); // serverId -> Set of toolNames
+
+function updateToolIndex(serverId, tools) {
+  removeFromToolIndex(serverId);
+  const names = new Set((tools || []).map(t => t.name).filter(Boolean));
+  for (const name of names) {
+    if (!toolIndex.has(name)) toolIndex.set(name, new Set());
+    toolIndex.get(name).add(serverId);
+  }
+  toolIndexByServer.set(serverId, names);
+}
+
+function removeFromToolIndex(serverId) {
+  const names = toolIndexByServer.get(serverId);
+  if (!names) return;
+  for (const name of names) {
+    const servers = toolIndex.get(name);
+    if (!servers) continue;
+    servers.delete(serverId);
+    if (servers.size === 0) toolIndex.delete(name);
+  }
+  toolIndexByServer.delete(serverId);
+}
+
+// Requests currently outstanding against a server
+function serverLoad(serverInfo) {
+  const inFlight = serverInfo.replicas.reduce((total, replica) => total + replica.inFlight, 0);
+  const ready = serverInfo.replicas.filter(replica => replica.state === 'initialized').length;
+  return inFlight / Math.max(ready, 1); // Per replica, so replicated servers take a fair share
+}
+
+// Pick the server for a tool from the index. When several servers provide it,
+// the highest config "priority" wins, then the server with the fewest
+// requests in flight.
+function resolveToolServer(toolName) {
+  const candidates = toolIndex.get(toolName);
+  if (!candidates) return null;
+  let best = null;
+  for (const serverId of candidates) {
+    const serverInfo = serverProcesses.get(serverId);
+    if (!serverInfo || serverInitializationState.get(serverId) !== 'initialized') continue;
+    const candidate = {
+      serverId,
+      priority: (serverInfo.config && serverInfo.config.priority) || 0,
+      load: serverLoad(serverInfo)
+    };
+    if (!best || candidate.priority > best.priority ||
+        (candidate.priority === best.priority && candidate.load < best.load)) {
+      best = candidate;
+    }
+  }
+  return best ? best.serverId : null;
+}
+
+// Resolve a tool to a server, indexing any servers whose tools are not known yet
+async function findServerForTool(toolName) {
+  const serverId = resolveToolServer(toolName);
+  if (serverId) return serverId;
+  if (lazyServers.size > 0) {
+    // The tool may live on a server that has not started yet
+    await Promise.allSettled(Array.from(lazyServers.keys(), ensureServerStarted));
+  }
+  const unindexed = Array.from(serverProcesses.keys()).filter(id => !toolIndexByServer.has(id));
+  if (unindexed.length === 0) return null;
+  await Promise.allSettled(unindexed.map(id => getCatalog(id, 'tools')));
+  return resolveToolServer(toolName);
+}
+
+// Fetch tool catalogs so the index is populated before the first job arrives
+async function buildToolIndex(serverIds = Array.from(serverProcesses.keys())) {
+  await Promise.allSettled(serverIds.map(serverId =>
+    getCatalog(serverId, 'tools').then((entry) => {
+      // Cached entries, e.g. shared by another cluster worker, still need indexing
+      if (serverProcesses.has(serverId)) updateToolIndex(serverId, entry.data.tools);
+    }, (error) => {
+      log.warn(`[TOOL-INDEX] Could not index tools for ${serverId}: ${error.message}`);
+    })
+  ));
+  log.info(`[TOOL-INDEX] Indexed ${toolIndex.size} tools across ${toolIndexByServer.size} servers`);
+}
+
+// Job Queue System for Async Operations
+log.info('Setting up job queue system');
+
+// Job storage - pluggable backend selected with JOB_STORE
+//   memory: in-process only, lost on restart (default)
+//   file:   append-only JSON-lines log at JOB_STORE_PATH, replayed on startup
+const JOB_STORE = process.env.JOB_STORE || 'memory';
+const JOB_STORE_PATH = process.env.JOB_STORE_PATH || path.join(process.cwd(), 'data', 'jobs.log');
+
+// Map-compatible job store with secondary indexes on status and expires_at
+class MemoryJobStore {
+  constructor() {
+    this.byId = new Map();
+    this.statusOf = new Map(); // job id -> status the job is indexed under
+    this.byStatus = new Map(); // status -> Set of job ids
+    this.expiryOf = new Map(); // job id -> expiresAt the job is indexed under
+    // [{ expiresAt, job_id }] sorted by expiresAt. Entries of deleted jobs, or
+    // jobs whose expires_at changed, stay behind and are skipped when they come up.
+    this.expiryIndex = [];
   }
-  if (serverInfo.type === 'http') {
-    // HTTP server: use HTTP request
-    return await sendHttpMCPRequest(serverInfo.config.url, null, {
-      jsonrpc: '2.0',
-      id: confirmationId || uuidv4(),
-      method,
-      params
-    }, method, params);
-  } else if (serverInfo.type === 'sse') {
-    // SSE server: open a new connection for this request only
-    return await sendDynamicMCPRequest(serverInfo.config.url, null, method, params);
-  } else {
-    throw new Error(`Unknown server type for '${serverId}'`);
+
+  get size() {
+    return this.byId.size;
+  }
+
+  has(job_id) {
+    return this.byId.has(job_id);
+  }
+
+  get(job_id) {
+    return this.byId.get(job_id);
+  }
+
+  set(job_id, job) {
+    this._index(job_id, job);
+    return this;
+  }
+
+  delete(job_id) {
+    return this._unindex(job_id);
+  }
+
+  keys() {
+    return this.byId.keys();
+  }
+
+  values() {
+    return this.byId.values();
+  }
+
+  entries() {
+    return this.byId.entries();
+  }
+
+  [Symbol.iterator]() {
+    return this.byId.entries();
+  }
+
+  // Apply a change published by a cluster worker, or a snapshot of jobs
+  apply(message) {
+    if (message.op === 'set') this.set(message.job.job_id, message.job);
+    else if (message.op === 'delete') this.delete(message.job_id);
+    else if (message.op === 'snapshot') message.entries.forEach(job => this.set(job.job_id, job));
+  }
+
+  // Jobs currently in the given status
+  withStatus(status) {
+    const ids = this.byStatus.get(status) || new Set();
+    return Array.from(ids, id => this.byId.get(id));
+  }
+
+  // Range delete over the expiry index; returns the number of jobs removed
+  deleteExpired(now = Date.now()) {
+    const expired = this._takeExpired(now);
+    expired.forEach(job_id => this._unindex(job_id));
+    return expired.length;
+  }
+
+  // Remove the expiry entries before `now`; returns the ids of the jobs they still belong to
+  _takeExpired(now) {
+    let end = 0;
+    while (end < this.expiryIndex.length && this.expiryIndex[end].expiresAt < now) end++;
+    return this.expiryIndex.splice(0, end)
+      .filter(({ expiresAt, job_id }) => this.expiryOf.get(job_id) === expiresAt)
+      .map(({ job_id }) => job_id);
+  }
+
+  // Updates, including replayed records and cluster relays that arrive as new
+  // objects, only touch the expiry index when expires_at changed
+  _index(job_id, job) {
+    if (this.byId.has(job_id)) this._removeFromStatus(job_id, this.statusOf.get(job_id));
+
+    this.byId.set(job_id, job);
+    this.statusOf.set(job_id, job.status);
+    if (!this.byStatus.has(job.status)) this.byStatus.set(job.status, new Set());
+    this.byStatus.get(job.status).add(job_id);
+
+    const expiresAt = new Date(job.expires_at).getTime();
+    if (this.expiryOf.get(job_id) !== expiresAt) {
+      this.expiryOf.set(job_id, expiresAt);
+      // Jobs share one TTL, so new entries almost always belong at the end
+      let i = this.expiryIndex.length;
+      while (i > 0 && this.expiryIndex[i - 1].expiresAt > expiresAt) i--;
+      this.expiryIndex.splice(i, 0, { expiresAt, job_id });
+    }
+  }
+
+  _removeFromStatus(job_id, status) {
+    const ids = this.byStatus.get(status);
+    if (!ids) return;
+    ids.delete(job_id);
+    if (ids.size === 0) this.byStatus.delete(status);
+  }
+
+  _unindex(job_id) {
+    const job = this.byId.get(job_id);
+    if (!job) return false;
+    this.byId.delete(job_id);
+    this._removeFromStatus(job_id, this.statusOf.get(job_id));
+    this.statusOf.delete(job_id);
+    this.expiryOf.delete(job_id); // Its expiry entry is skipped from now on
+    return true;
   }
 }
 
-// Job Queue System for Async Operations
-console.log('Setting up job queue system');
+// Durable job store: every change is appended to a JSON-lines log, which is
+// replayed on startup and compacted once it is mostly superseded records.
+// Appends are synchronous so a crashed process loses nothing it acknowledged.
+// The log is readable by its owner only and holds no secrets: bearer tokens
+// are kept as hashes and dynamic servers' auth tokens stay in memory.
+class FileJobStore extends MemoryJobStore {
+  constructor(filePath) {
+    super();
+    this.filePath = filePath;
+    this.logRecords = 0;
+    fs.mkdirSync(path.dirname(filePath), { recursive: true });
+    this._replay();
+    this.fd = fs.openSync(filePath, 'a', 0o600);
+    fs.chmodSync(filePath, 0o600); // Logs written before this was enforced
+  }
 
-// Job storage - In-memory Map (can be upgraded to Redis later)
-const jobs = new Map();
+  // The job as written to the log
+  static record(job) {
+    const { bearer_token, dynamic_auth_token, ...stored } = job;
+    if (dynamic_auth_token) stored.dynamic_auth_required = true;
+    return stored;
+  }
 
-// Crypto for secure token generation
-const crypto = require('crypto');
+  _replay() {
+    if (!fs.existsSync(this.filePath)) return;
+    const lines = fs.readFileSync(this.filePath, 'utf8').split('\n');
+    for (const line of lines) {
+      if (!line.trim()) continue;
+      try {
+        const record = JSON.parse(line);
+        if (record.op === 'set' && record.job.bearer_token && !record.job.bearer_token_hash) {
+          // Logs from before tokens were hashed; compaction rewrites them without the token
+          record.job.bearer_token_hash = hashBearerToken(record.job.bearer_token);
+        }
+        if (record.op === 'set') super.set(record.job.job_id, record.job);
+        else if (record.op === 'delete') super.delete(record.job_id);
+        this.logRecords++;
+      } catch (error) {
+        // A torn final line from a crash mid-write; everything before it is intact
+        log.warn(`[JOB-STORE] Skipping unreadable record in ${this.filePath}: ${error.message}`);
+      }
+    }
+    log.info(`[JOB-STORE] Recovered ${this.size} jobs from ${this.filePath}`);
+  }
+
+  _append(record) {
+    fs.writeSync(this.fd, JSON.stringify(record) + '\n');
+    this.logRecords++;
+    if (this.logRecords > 1000 && this.logRecords > this.size * 4) {
+      this.compact();
+    }
+  }
+
+  set(job_id, job) {
+    super.set(job_id, job);
+    this._append({ op: 'set', job: FileJobStore.record(job) });
+    return this;
+  }
+
+  delete(job_id) {
+    const removed = super.delete(job_id);
+    if (removed) this._append({ op: 'delete', job_id });
+    return removed;
+  }
+
+  deleteExpired(now = Date.now()) {
+    const expired = this._takeExpired(now);
+    expired.forEach(job_id => this.delete(job_id));
+    return expired.length;
+  }
+
+  // Rewrite the log with one record per live job
+  compact() {
+    const tmpPath = `${this.filePath}.tmp`;
+    fs.rmSync(tmpPath, { force: true }); // A leftover file would keep its old permissions
+    const lines = Array.from(this.byId.values(), job => JSON.stringify({ op: 'set', job: FileJobStore.record(job) }) + '\n');
+    fs.writeFileSync(tmpPath, lines.join(''), { encoding: 'utf8', mode: 0o600 });
+    fs.closeSync(this.fd);
+    fs.renameSync(tmpPath, this.filePath);
+    this.fd = fs.openSync(this.filePath, 'a');
+    this.logRecords = lines.length;
+  }
+}
+
+// Job store of a cluster worker: a full replica of the primary's store that
+// publishes its own changes. Persistence (JOB_STORE=file) is left to the primary.
+class ClusterJobStore extends MemoryJobStore {
+  constructor() {
+    super();
+    this.applying = false;
+  }
+
+  set(job_id, job) {
+    super.set(job_id, job);
+    if (!this.applying) clusterPublish('jobs', { op: 'set', job });
+    return this;
+  }
+
+  delete(job_id) {
+    const removed = super.delete(job_id);
+    if (removed && !this.applying) clusterPublish('jobs', { op: 'delete', job_id });
+    return removed;
+  }
+
+  apply(message) {
+    this.applying = true;
+    try {
+      super.apply(message);
+    } finally {
+      this.applying = false;
+    }
+  }
+}
+
+function createJobStore() {
+  if (isClusterWorker) {
+    return new ClusterJobStore();
+  }
+  if (JOB_STORE === 'file') {
+    log.info(`Using file job store at ${JOB_STORE_PATH}`);
+    return new FileJobStore(JOB_STORE_PATH);
+  }
+  if (JOB_STORE !== 'memory') {
+    log.warn(`Unknown JOB_STORE '${JOB_STORE}', using in-memory job store`);
+  }
+  return new MemoryJobStore();
+}
+
+const jobs = createJobStore();
+
+// A job created on another worker a moment ago may not have been relayed
+// here yet; the primary sees every change first
+async function fetchClusterJob(job_id) {
+  if (!isClusterWorker) return null;
+  const job = await clusterRequest({ bridge: 'lookup', job_id });
+  if (job && !jobs.has(job_id)) jobs.apply({ op: 'set', job });
+  return jobs.get(job_id) || null;
+}
+
+// Job changes from other workers also wake the clients waiting on them here
+clusterChannels.set('jobs', {
+  apply: (message) => {
+    jobs.apply(message);
+    if (message.op === 'set') jobEvents.emit(message.job.job_id, message.job);
+  },
+  snapshot: () => Array.from(jobs.values())
+});
+
+// Finished job results are stored once, as the serialized JSON of the clean
+// result, so a poll splices the stored bytes into its response instead of
+// parsing and re-serializing the tool output every time. Results of at least
+// JOB_RESULT_COMPRESS_BYTES are gzipped. Once the results held in memory pass
+// JOB_RESULT_MEMORY_BYTES the oldest ones move to disk. With JOB_STORE=file
+// every result is also written next to the job log, so it survives restarts.
+const JOB_RESULT_MEMORY_BYTES = parseInt(process.env.JOB_RESULT_MEMORY_BYTES, 10) || 256 * 1024 * 1024;
+const JOB_RESULT_COMPRESS_BYTES = process.env.JOB_RESULT_COMPRESS_BYTES !== undefined
+  ? parseInt(process.env.JOB_RESULT_COMPRESS_BYTES, 10)
+  : 64 * 1024; // 0 disables compression
+const gzipAsync = util.promisify(zlib.gzip);
+const gunzipAsync = util.promisify(zlib.gunzip);
+
+class JobResultStore {
+  constructor({ memoryBytes, compressBytes, dir = null }) {
+    this.memoryBytes = memoryBytes;
+    this.compressBytes = compressBytes;
+    this.dir = dir; // Durable copy of every result; without it files are only written on overflow
+    this.spillDir = null;
+    this.entries = new Map(); // job id -> { encoding, size, data, file }, oldest first
+    this.memoryUsed = 0;
+    this.applying = false;
+    if (dir) this._load();
+  }
+
+  has(job_id) {
+    return this.entries.has(job_id);
+  }
+
+  // Serialize a clean result, gzipped when that is worth it
+  async encode(value) {
+    const json = Buffer.from(JSON.stringify(value === undefined ? null : value));
+    if (this.compressBytes > 0 && json.length >= this.compressBytes) {
+      const compressed = await gzipAsync(json);
+      if (compressed.length < json.length) return { encoding: 'gzip', data: compressed };
+    }
+    return { encoding: 'identity', data: json };
+  }
+
+  set(job_id, { encoding, data }) {
+    this._remove(job_id);
+    const entry = { encoding, size: data.length, data, file: null };
+    if (this.dir) {
+      entry.file = path.join(this.dir, `${job_id}.json${encoding === 'gzip' ? '.gz' : ''}`);
+      fs.writeFileSync(entry.file, data);
+    }
+    this.entries.set(job_id, entry);
+    this.memoryUsed += entry.size;
+    if (!this.applying) clusterPublish('results', { op: 'set', job_id, encoding, data });
+    this._trim();
+  }
+
+  delete(job_id) {
+    const removed = this._remove(job_id);
+    if (removed && !this.applying) clusterPublish('results', { op: 'delete', job_id });
+    return removed;
+  }
+
+  // The stored JSON bytes of a result, or null if it is gone
+  async read(job_id) {
+    const entry = this.entries.get(job_id);
+    if (!entry) return null;
+    let data = entry.data;
+    if (!data) {
+      try {
+        data = await fs.promises.readFile(entry.file);
+      } catch (error) {
+        log.warn(`[JOB-RESULTS] Could not read ${entry.file}: ${error.message}`);
+        return null;
+      }
+    }
+    return entry.encoding === 'gzip' ? gunzipAsync(data) : data;
+  }
+
+  // Drop results whose job no longer exists; local only, every process sweeps its own
+  retain(isLive) {
+    let removed = 0;
+    for (const job_id of Array.from(this.entries.keys())) {
+      if (!isLive(job_id) && this._remove(job_id)) removed++;
+    }
+    return removed;
+  }
+
+  // Apply a change from another cluster worker, or the primary's snapshot
+  apply(message) {
+    this.applying = true;
+    try {
+      if (message.op === 'set') this.set(message.job_id, message);
+      else if (message.op === 'delete') this.delete(message.job_id);
+      else if (message.op === 'snapshot') message.entries.forEach(([job_id, stored]) => this.set(job_id, stored));
+    } finally {
+      this.applying = false;
+    }
+  }
+
+  snapshot() {
+    const entries = [];
+    for (const [job_id, entry] of this.entries) {
+      try {
+        entries.push([job_id, { encoding: entry.encoding, data: entry.data || fs.readFileSync(entry.file) }]);
+      } catch (error) {
+        log.warn(`[JOB-RESULTS] Could not read ${entry.file}: ${error.message}`);
+      }
+    }
+    return entries;
+  }
+
+  stats() {
+    let onDisk = 0;
+    for (const entry of this.entries.values()) if (!entry.data) onDisk++;
+    return {
+      stored: this.entries.size,
+      in_memory: this.entries.size - onDisk,
+      on_disk: onDisk,
+      memory_bytes: this.memoryUsed,
+      memory_budget_bytes: this.memoryBytes
+    };
+  }
+
+  // Move the oldest results out of memory until the budget is met
+  _trim() {
+    for (const [job_id, entry] of this.entries) {
+      if (this.memoryUsed <= this.memoryBytes) break;
+      if (!entry.data) continue;
+      if (!entry.file) {
+        entry.file = path.join(this._spillDir(), `${job_id}.json${entry.encoding === 'gzip' ? '.gz' : ''}`);
+        fs.writeFileSync(entry.file, entry.data);
+      }
+      entry.data = null;
+      this.memoryUsed -= entry.size;
+    }
+  }
+
+  _spillDir() {
+    if (!this.spillDir) {
+      const dir = fs.mkdtempSync(path.join(os.tmpdir(), 'mcp-bridge-results-'));
+      process.on('exit', () => fs.rmSync(dir, { recursive: true, force: true }));
+      this.spillDir = dir;
+    }
+    return this.spillDir;
+  }
+
+  _remove(job_id) {
+    const entry = this.entries.get(job_id);
+    if (!entry) return false;
+    this.entries.delete(job_id);
+    if (entry.data) this.memoryUsed -= entry.size;
+    if (entry.file) fs.rm(entry.file, { force: true }, () => {});
+    return true;
+  }
+
+  // Index the result files written before a restart; they are read on demand
+  _load() {
+    fs.mkdirSync(this.dir, { recursive: true });
+    for (const name of fs.readdirSync(this.dir)) {
+      const match = /^(.+)\.json(\.gz)?$/.exec(name);
+      if (!match) continue;
+      const file = path.join(this.dir, name);
+      this.entries.set(match[1], { encoding: match[2] ? 'gzip' : 'identity', size: fs.statSync(file).size, data: null, file });
+    }
+    if (this.entries.size > 0) log.info(`[JOB-RESULTS] Found ${this.entries.size} stored results in ${this.dir}`);
+  }
+}
+
+const jobResults = new JobResultStore({
+  memoryBytes: JOB_RESULT_MEMORY_BYTES,
+  compressBytes: JOB_RESULT_COMPRESS_BYTES,
+  dir: JOB_STORE === 'file' && !isClusterWorker ? path.join(path.dirname(JOB_STORE_PATH), 'results') : null
+});
+
+clusterChannels.set('results', {
+  apply: (message) => jobResults.apply(message),
+  snapshot: () => jobResults.snapshot()
+});
 
 // Generate 15-digit alphanumeric job ID
 function generateJobId() {
@@ -704,6 +2362,11 @@ function generateBearerToken() {
   return 'tok_' + crypto.randomBytes(32).toString('hex');
 }
 
+// Jobs are checked against a hash of their token, which is all the job log keeps
+function hashBearerToken(token) {
+  return crypto.createHash('sha256').update(token).digest('hex');
+}
+
 // Enhanced sendMCPRequest for background jobs (no timeout)
 // Send request to dynamic MCP server (no pre-configuration needed)
 async function sendDynamicMCPRequest(serverUrl, authToken, method, params = {}) {
@@ -714,8 +2377,8 @@ async function sendDynamicMCPRequest(serverUrl, authToken, method, params = {})
     method: method,
     params: params
   };
-  console.log(`[DYNAMIC] Attempting to connect to: ${serverUrl}`);
-  console.log(`[MCP-FIX] Using correct MCP format - method: ${method}, params:`, params);
+  log.debug(`[DYNAMIC] Attempting to connect to: ${serverUrl}`);
+  log.debug(`[MCP-FIX] Using correct MCP format - method: ${method}`, () => ({ params }));
   
   // For SSE servers, always use the config URL (with /sse) for the initial GET
   return await sendSSEMCPRequest(serverUrl, authToken, request, method, params);
@@ -723,258 +2386,545 @@ async function sendDynamicMCPRequest(serverUrl, authToken, method, params = {})
 
 // HTTP MCP Request (existing working logic)
 async function sendHttpMCPRequest(serverUrl, authToken, request, method, params) {
-  console.log(`[HTTP-DEBUG] Attempting HTTP request to ${serverUrl}`);
-  console.log(`[HTTP-DEBUG] Request payload:`, JSON.stringify(request, null, 2));
+  log.debug(`[HTTP-DEBUG] Attempting HTTP request to ${serverUrl}`);
+  log.trace(`[HTTP-DEBUG] Request payload`, () => ({ request }));
   try {
     const headers = { 'Content-Type': 'application/json' };
     if (authToken) headers.Authorization = `Bearer ${authToken}`;
     const response = await axios.post(serverUrl, request, { headers });
-    console.log(`[HTTP-DEBUG] HTTP Response status: ${response.status}`);
-    console.log(`[HTTP-DEBUG] HTTP Response data:`, JSON.stringify(response.data, null, 2));
+    log.debug(`[HTTP-DEBUG] HTTP Response status: ${response.status}`);
+    log.trace(`[HTTP-DEBUG] HTTP Response data`, () => ({ data: response.data }));
     return response.data;
   } catch (error) {
     if (error.response) {
-      console.log(`[HTTP-DEBUG] HTTP error status: ${error.response.status}`);
-      console.log(`[HTTP-DEBUG] HTTP error data:`, JSON.stringify(error.response.data, null, 2));
+      log.debug(`[HTTP-DEBUG] HTTP error status: ${error.response.status}`);
+      log.debug(`[HTTP-DEBUG] HTTP error data`, () => ({ data: error.response.data }));
     }
     throw error;
   }
 }
 
-// SSE MCP Request (proper streaming approach)
-async function sendSSEMCPRequest(serverUrl, authToken, request, method, params) {
-  console.log(`[SSE] (Cloudflare MCP) Connecting to ${serverUrl}`);
-
-  const headers = {
-    Accept: 'text/event-stream',
-    'Cache-Control': 'no-cache',
-    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/125.0.0.0 Safari/537.36'
-  };
+// Streamable-HTTP request that reads the response as it arrives. When the
+// server answers with an event stream, notifications sent ahead of the result
+// (e.g. progress) are handed to onNotification straight away.
+async function streamHttpMCPRequest(serverUrl, authToken, request, onNotification, signal) {
+  const headers = { 'Content-Type': 'application/json', Accept: 'application/json, text/event-stream' };
   if (authToken) headers.Authorization = `Bearer ${authToken}`;
-  console.log('[SSE-DEBUG] Request headers:', headers);
+  const response = await axios.post(serverUrl, request, { headers, responseType: 'stream', timeout: 0, signal });
+  const stream = response.data;
+  const isEventStream = String(response.headers['content-type'] || '').includes('text/event-stream');
+  stream.setEncoding('utf8');
 
   return new Promise((resolve, reject) => {
-    const axiosSource = axios.CancelToken.source();
-    let sessionEndpoint = null;
-    let jsonResponse = null;
     let buffer = '';
-    let sseResponse = null;
-    let sessionTimeout = null;
-    let responseTimeout = null;
-    let requestPosted = false;
-    let dataChunkCount = 0;
-    
-    // 1. Open GET SSE connection to /sse (never strip /sse)
-    axios
-      .get(serverUrl, {
-        headers,
-        responseType: 'stream',
-        timeout: 0,
-        cancelToken: axiosSource.token,
-        maxRedirects: 5,
-        validateStatus: (status) => status < 500,
-        httpAgent: httpAgent,
-        httpsAgent: httpsAgent
+    let dataLines = [];
+    let settled = false;
+    const finish = (error, message) => {
+      if (settled) return;
+      settled = true;
+      if (error) reject(error);
+      else resolve(message);
+    };
+    const handleMessage = (message) => {
+      if (message.id === request.id) {
+        finish(null, message);
+        stream.destroy(); // Nothing else to read for this request
+      } else if (message.method) {
+        onNotification(message);
+      }
+    };
+    const flushEvent = () => {
+      if (dataLines.length === 0) return;
+      const data = dataLines.join('\n');
+      dataLines = [];
+      try {
+        [].concat(JSON.parse(data)).forEach(handleMessage);
+      } catch (parseError) {
+        log.info(`[HTTP] Ignoring unparseable event from ${serverUrl}: ${parseError.message}`);
+      }
+    };
+
+    stream.on('data', (chunk) => {
+      buffer += chunk;
+      if (!isEventStream) return; // Plain JSON is parsed once complete
+      let idx;
+      while ((idx = buffer.indexOf('\n')) >= 0) {
+        const line = buffer.slice(0, idx).replace(/\r$/, '');
+        buffer = buffer.slice(idx + 1);
+        if (line === '') flushEvent();
+        else if (line.startsWith('data:')) dataLines.push(line.slice(5).replace(/^ /, ''));
+      }
+    });
+    stream.on('end', () => {
+      if (isEventStream) {
+        flushEvent();
+        return finish(new Error(`Stream from ${serverUrl} ended before the response arrived`));
+      }
+      try {
+        [].concat(JSON.parse(buffer)).forEach(handleMessage);
+      } catch (parseError) {
+        return finish(new Error(`Invalid JSON response from ${serverUrl}: ${parseError.message}`));
+      }
+      finish(new Error(`No response for request ${request.id} from ${serverUrl}`));
+    });
+    stream.on('error', (error) => finish(error));
+  });
+}
+
+// SSE session pool configuration
+const SSE_POOL_SIZE = parseInt(process.env.SSE_POOL_SIZE, 10) || 4; // Max sessions per SSE server
+const SSE_CONNECT_TIMEOUT_MS = parseInt(process.env.SSE_CONNECT_TIMEOUT_MS, 10) || 30000;
+const SSE_RESPONSE_TIMEOUT_MS = parseInt(process.env.SSE_RESPONSE_TIMEOUT_MS, 10) || 30000;
+const SSE_IDLE_TIMEOUT_MS = parseInt(process.env.SSE_IDLE_TIMEOUT_MS, 10) || 5 * 60 * 1000; // Dynamic pools only
+const SSE_RECONNECT_MAX_DELAY_MS = 30000;
+
+const SSE_REQUEST_HEADERS = {
+  Accept: 'text/event-stream',
+  'Cache-Control': 'no-cache',
+  'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/125.0.0.0 Safari/537.36'
+};
+
+// Extract a JSON-RPC message that a server returned directly in the POST response
+function parseDirectSSEResponse(data, requestId) {
+  let parsed = data;
+  if (typeof data === 'string' && data.startsWith('data: ')) {
+    try {
+      parsed = JSON.parse(data.substring(6).trim()); // Remove "data: " prefix
+    } catch (parseErr) {
+      log.info(`[SSE] Failed to parse SSE-formatted response: ${parseErr.message}`);
+      return null;
+    }
+  }
+  return parsed && typeof parsed === 'object' && parsed.id === requestId ? parsed : null;
+}
+
+// One long-lived MCP session over a single SSE stream. JSON-RPC requests are
+// POSTed to the session endpoint and responses arriving on the stream are
+// matched back to their callers by id, so many requests can share the session.
+class SSESession {
+  constructor(serverUrl, authToken, options = {}) {
+    this.serverUrl = serverUrl;
+    this.authToken = authToken;
+    this.keepAlive = options.keepAlive || false; // Reconnect automatically when the stream drops
+    this.onNotification = options.onNotification || null;
+    this.label = options.label || 'dynamic'; // Server id for metrics
+    this.state = 'idle'; // idle | connecting | ready | closed
+    this.postUrl = null;
+    this.postHeaders = null;
+    this.pending = new Map(); // JSON-RPC id -> { resolve, reject, timer }
+    this.abortController = null;
+    this.connectPromise = null;
+    this.reconnectTimer = null;
+    this.reconnectAttempts = 0;
+    this.reconnects = 0;
+    this.generation = 0; // Ignores events from streams that were already replaced
+    this.closed = false;
+  }
+
+  get inFlight() {
+    return this.pending.size;
+  }
+
+  connect() {
+    if (this.state === 'ready') return Promise.resolve(this);
+    if (this.connectPromise) return this.connectPromise;
+
+    clearTimeout(this.reconnectTimer);
+    this.reconnectTimer = null;
+    this.closed = false;
+    this.state = 'connecting';
+    const labels = [serverLabel(this.label), 'sse'];
+    this.connectPromise = metrics.upstreamConnect.time(labels, () => this._open())
+      .then(() => metrics.upstreamHandshake.time(labels, () => this._initialize()))
+      .then(() => {
+        this.state = 'ready';
+        this.reconnectAttempts = 0;
+        log.info(`[SSE] Session ready for ${this.serverUrl}`);
+        return this;
       })
-      .then((_sseResponse) => {
-        sseResponse = _sseResponse;
-        console.log('[SSE-DEBUG] Response status:', sseResponse.status);
-        console.log('[SSE-DEBUG] Response headers:', sseResponse.headers);
-        
-        // Check for session ID in headers (Cloudflare MCP pattern)
-        const sessionId = sseResponse.headers['mcp-session-id'];
-        if (sessionId) {
-          console.log('[SSE-DEBUG] Found session ID in headers:', sessionId);
-          
-          // Post back to the same /sse endpoint with session ID in header
-          const reqHeaders = { 
-            'Content-Type': 'application/json',
-            'MCP-Session-Id': sessionId
-          };
-          if (authToken) reqHeaders.Authorization = `Bearer ${authToken}`;
-          
-          console.log(`[SSE] Posting request to ${serverUrl} with session ID ${sessionId} [${request.id}]`);
-          
-          clearTimeout(sessionTimeout);
-          
-          axios
-            .post(serverUrl, request, {
-              headers: reqHeaders,
-              timeout: 30000
-            })
-            .then((postResponse) => {
-              console.log(`[SSE] POST successful to ${serverUrl}, status: ${postResponse.status}`);
-              console.log(`[SSE] POST response data:`, JSON.stringify(postResponse.data, null, 2));
-              
-              // Check if the response is directly in the POST response
-              if (postResponse.data && postResponse.data.id === request.id) {
-                console.log(`[SSE] Response received directly in POST response for request ${request.id}`);
-                jsonResponse = postResponse.data;
-                clearTimeout(responseTimeout);
-                if (sseResponse && sseResponse.data) sseResponse.data.destroy();
-                resolve(postResponse.data);
-                return;
-              }
-              
-              // Check if the response is in SSE format in the POST response
-              if (postResponse.data && typeof postResponse.data === 'string' && postResponse.data.startsWith('data: ')) {
-                try {
-                  const jsonStr = postResponse.data.substring(6).trim(); // Remove "data: " prefix
-                  const parsedResponse = JSON.parse(jsonStr);
-                  if (parsedResponse.id === request.id) {
-                    console.log(`[SSE] Response received in SSE format in POST response for request ${request.id}`);
-                    jsonResponse = parsedResponse;
-                    clearTimeout(responseTimeout);
-                    if (sseResponse && sseResponse.data) sseResponse.data.destroy();
-                    resolve(parsedResponse);
-                    return;
-                  }
-                } catch (parseErr) {
-                  console.log(`[SSE] Failed to parse SSE-formatted response: ${parseErr.message}`);
-                }
-              }
-              
-              // For tool execution, the response might come via SSE stream instead of POST response
-              console.log(`[SSE] POST successful, waiting for response via SSE stream for request ${request.id}`);
-              requestPosted = true;
-              // 4. Wait for the response via SSE
-              responseTimeout = setTimeout(() => {
-                if (!jsonResponse) {
-                  if (sseResponse && sseResponse.data) sseResponse.data.destroy();
-                  reject(new Error('No JSON response received from SSE server'));
-                }
-              }, 30000); // 30s to get response
-            })
-            .catch((postErr) => {
-              console.log(`[SSE] POST failed to ${serverUrl}: ${postErr.response?.status} - ${postErr.message}`);
-              if (sseResponse && sseResponse.data) sseResponse.data.destroy();
-              reject(new Error(`[SSE] POST error: ${postErr.message}`));
-            });
+      .catch((error) => {
+        this._teardown(error);
+        throw error;
+      })
+      .finally(() => {
+        this.connectPromise = null;
+      });
+    return this.connectPromise;
+  }
+
+  // Open the GET stream and resolve once we know where to POST requests
+  _open() {
+    return new Promise((resolve, reject) => {
+      let settled = false;
+      const connectTimer = setTimeout(() => {
+        fail(new Error('Timed out waiting for SSE session endpoint'));
+      }, SSE_CONNECT_TIMEOUT_MS);
+      const ready = () => {
+        if (settled) return;
+        settled = true;
+        clearTimeout(connectTimer);
+        resolve();
+      };
+      const fail = (error) => {
+        if (settled) return;
+        settled = true;
+        clearTimeout(connectTimer);
+        reject(error);
+      };
+
+      const headers = { ...SSE_REQUEST_HEADERS };
+      if (this.authToken) headers.Authorization = `Bearer ${this.authToken}`;
+      const generation = ++this.generation;
+      this.abortController = new AbortController();
+      log.info(`[SSE] Opening session to ${this.serverUrl}`);
+
+      axios
+        .get(this.serverUrl, {
+          headers,
+          responseType: 'stream',
+          timeout: 0,
+          signal: this.abortController.signal,
+          maxRedirects: 5,
+          httpAgent: httpAgent,
+          httpsAgent: httpsAgent
+        })
+        .then((response) => {
+          const stream = response.data;
+
+          // Cloudflare MCP pattern: session ID in headers, POST back to the same URL
+          const sessionId = response.headers['mcp-session-id'];
+          if (sessionId) {
+            this._setEndpoint(this.serverUrl, { 'MCP-Session-Id': sessionId });
+            ready();
+          }
+
+          let buffer = '';
+          stream.on('data', (chunk) => {
+            if (generation !== this.generation) return;
+            buffer = (buffer + chunk.toString()).replace(/\r\n/g, '\n');
+            let idx;
+            while ((idx = buffer.indexOf('\n\n')) >= 0) {
+              const eventBlock = buffer.slice(0, idx);
+              buffer = buffer.slice(idx + 2);
+              if (this._handleEvent(eventBlock)) ready();
+            }
+          });
+          stream.on('end', () => {
+            if (generation !== this.generation) return;
+            fail(new Error('SSE connection ended before a session was established'));
+            this._onDrop(new Error('SSE connection ended'));
+          });
+          stream.on('error', (err) => {
+            if (generation !== this.generation) return;
+            fail(new Error(`SSE connection error: ${err.message}`));
+            this._onDrop(new Error(`SSE connection error: ${err.message}`));
+          });
+        })
+        .catch((err) => {
+          fail(new Error(`[SSE] Failed to open SSE connection: ${err.message}`));
+        });
+    });
+  }
+
+  // MCP handshake; servers that skip it are tolerated
+  async _initialize() {
+    try {
+      const response = await this._send({
+        jsonrpc: "2.0",
+        id: uuidv4(),
+        method: "initialize",
+        params: {
+          protocolVersion: "2024-11-05",
+          capabilities: {},
+          clientInfo: {
+            name: "mcp-bridge",
+            version: "1.0.0"
+          }
         }
-        
-        buffer = '';
-        jsonResponse = null;
-        requestPosted = false;
+      }, SSE_CONNECT_TIMEOUT_MS);
+      if (response.error) {
+        log.warn(`[SSE] Initialize rejected by ${this.serverUrl}: ${response.error.message}`);
+        return;
+      }
+      await this._post({ jsonrpc: "2.0", method: "notifications/initialized" });
+    } catch (error) {
+      if (this.state !== 'connecting') throw error;
+      log.warn(`[SSE] Initialize failed for ${this.serverUrl}, continuing without handshake: ${error.message}`);
+    }
+  }
+
+  _setEndpoint(url, extraHeaders = {}) {
+    this.postUrl = url;
+    this.postHeaders = { 'Content-Type': 'application/json', ...extraHeaders };
+    if (this.authToken) this.postHeaders.Authorization = `Bearer ${this.authToken}`;
+  }
+
+  // Handle one SSE event block; returns true when it carried the session endpoint
+  _handleEvent(eventBlock) {
+    let event = 'message';
+    const dataLines = [];
+    for (const line of eventBlock.split('\n')) {
+      if (!line || line.startsWith(':')) continue;
+      if (line.startsWith('event:')) event = line.slice(6).trim();
+      else if (line.startsWith('data:')) dataLines.push(line.replace(/^data:\s?/, ''));
+    }
+    const data = dataLines.join('\n').trim();
+    if (!data) return false;
+
+    if (!this.postUrl && (event === 'endpoint' || data.startsWith('/') || (data.startsWith('{') && data.includes('endpoint')))) {
+      let endpoint = data;
+      if (data.startsWith('{')) {
+        try {
+          endpoint = JSON.parse(data).endpoint;
+        } catch {
+          endpoint = null;
+        }
+      }
+      if (endpoint) {
+        this._setEndpoint(new URL(endpoint, this.serverUrl).toString());
+        return true;
+      }
+    }
+
+    if (data.startsWith('{') || data.startsWith('[')) {
+      try {
+        this._dispatch(JSON.parse(data));
+      } catch (err) {
+        log.warn(`[SSE] Ignoring malformed message from ${this.serverUrl}: ${err.message}`);
+      }
+    }
+    return false;
+  }
+
+  _dispatch(message) {
+    if (Array.isArray(message)) {
+      message.forEach(m => this._dispatch(m));
+      return;
+    }
+    if (message.id !== undefined && this.pending.has(message.id)) {
+      const entry = this.pending.get(message.id);
+      this.pending.delete(message.id);
+      clearTimeout(entry.timer);
+      entry.resolve(message);
+    } else if (message.method && this.onNotification) {
+      this.onNotification(message);
+    }
+  }
+
+  _post(message, signal = null) {
+    return axios.post(this.postUrl, message, {
+      headers: this.postHeaders,
+      timeout: 0,
+      ...(signal && { signal })
+    });
+  }
+
+  // Send a JSON-RPC request on this session and wait for the matching response.
+  // Aborting the signal drops the request and tells the server it was cancelled.
+  _send(request, timeoutMs, signal = null) {
+    return new Promise((resolve, reject) => {
+      if (signal && signal.aborted) {
+        return reject(new Error(`Request ${request.method} to ${this.serverUrl} was cancelled`));
+      }
+      const onAbort = () => {
+        if (this.pending.get(request.id) !== entry) return;
+        this.pending.delete(request.id);
+        clearTimeout(entry.timer);
+        this._post({ jsonrpc: "2.0", method: "notifications/cancelled", params: { requestId: request.id, reason: 'was cancelled' } })
+          .catch(() => {});
+        entry.reject(new Error(`Request ${request.method} to ${this.serverUrl} was cancelled`));
+      };
+      const settle = (callback) => (value) => {
+        if (signal) signal.removeEventListener('abort', onAbort);
+        callback(value);
+      };
+      const entry = { resolve: settle(resolve), reject: settle(reject), timer: null };
+      this.pending.set(request.id, entry);
+      if (signal) signal.addEventListener('abort', onAbort, { once: true });
+      this._post(request, signal)
+        .then((postResponse) => {
+          const direct = parseDirectSSEResponse(postResponse.data, request.id);
+          if (direct) {
+            this._dispatch(direct);
+          } else if (timeoutMs && this.pending.get(request.id) === entry) {
+            // The response will arrive on the SSE stream
+            entry.timer = setTimeout(() => {
+              this.pending.delete(request.id);
+              entry.reject(new Error('No JSON response received from SSE server'));
+            }, timeoutMs);
+          }
+        })
+        .catch((postErr) => {
+          if (this.pending.get(request.id) !== entry) return;
+          this.pending.delete(request.id);
+          entry.reject(new Error(`[SSE] POST error: ${postErr.message}`));
+        });
+    });
+  }
+
+  async request(request, timeoutMs = SSE_RESPONSE_TIMEOUT_MS, signal = null) {
+    await this.connect();
+    return this._send(request, timeoutMs, signal);
+  }
+
+  _onDrop(error) {
+    const wasReady = this.state === 'ready';
+    if (this.state === 'closed') return;
+    log.info(`[SSE] Session to ${this.serverUrl} dropped: ${error.message}`);
+    this._teardown(error);
+    if (wasReady && this.keepAlive && !this.closed) this._scheduleReconnect();
+  }
+
+  _scheduleReconnect() {
+    const delay = Math.min(1000 * 2 ** this.reconnectAttempts, SSE_RECONNECT_MAX_DELAY_MS);
+    this.reconnectAttempts++;
+    this.reconnectTimer = setTimeout(() => {
+      this.reconnectTimer = null;
+      this.reconnects++;
+      metrics.sseReconnects.inc([serverLabel(this.label)]);
+      this.connect().catch((err) => {
+        log.warn(`[SSE] Reconnect to ${this.serverUrl} failed: ${err.message}`);
+        if (this.keepAlive && !this.closed) this._scheduleReconnect();
+      });
+    }, delay);
+  }
+
+  _teardown(error) {
+    this.state = 'closed';
+    this.postUrl = null;
+    if (this.abortController) {
+      this.abortController.abort();
+      this.abortController = null;
+    }
+    for (const [id, entry] of this.pending) {
+      clearTimeout(entry.timer);
+      entry.reject(error);
+    }
+    this.pending.clear();
+  }
+
+  close() {
+    this.closed = true;
+    clearTimeout(this.reconnectTimer);
+    this.reconnectTimer = null;
+    this._teardown(new Error('SSE session closed'));
+  }
+}
 
-        // 2. Wait for session endpoint (fallback if not in headers) - REMOVED since Cloudflare MCP uses headers
-        // The session ID is already handled above in the headers check
-        
-        function processEvent(eventBlock) {
-          const lines = eventBlock.split('\n');
-          for (const line of lines) {
-            if (line.startsWith(':')) continue;
-            if (!line.startsWith('data:')) continue;
-            const data = line.replace(/^data:\s*/, '').trim();
-            if (!data) continue;
-            // 2.1. Look for session endpoint
-            if (!sessionEndpoint && (data.startsWith('/') || (data.startsWith('{') && data.includes('endpoint')))) {
-              let endpoint = null;
-              if (data.startsWith('/')) {
-                endpoint = data;
-              } else {
-                try {
-                  const parsed = JSON.parse(data);
-                  if (parsed.endpoint) endpoint = parsed.endpoint;
-                } catch {}
-              }
-              if (endpoint) {
-                sessionEndpoint = endpoint;
-                    clearTimeout(sessionTimeout);
-                // 3. POST the JSON-RPC request to the session endpoint
-                const baseUrl = serverUrl.replace(/\/sse$/, '');
-                const fullEndpoint = endpoint.startsWith('http') ? endpoint : `${baseUrl}${endpoint}`;
-                const reqHeaders = { 'Content-Type': 'application/json' };
-                if (authToken) reqHeaders.Authorization = `Bearer ${authToken}`;
-                console.log(`[SSE] Posting request to session endpoint ${fullEndpoint} [${request.id}]`);
-                axios
-                  .post(fullEndpoint, request, {
-                    headers: reqHeaders,
-                    timeout: 0
-                  })
-                  .then(() => {
-                    requestPosted = true;
-                    // 4. Wait for the response via SSE
-                    responseTimeout = setTimeout(() => {
-                      if (!jsonResponse) {
-                        if (sseResponse && sseResponse.data) sseResponse.data.destroy();
-                        reject(new Error('No JSON response received from SSE server'));
-                      }
-                    }, 30000); // 30s to get response
-                  })
-                  .catch((postErr) => {
-                    if (sseResponse && sseResponse.data) sseResponse.data.destroy();
-                    reject(new Error(`[SSE] POST error: ${postErr.message}`));
-                  });
-                    return;
-                  }
-              }
-            // 4.1. Wait for JSON-RPC response
-            if (data.startsWith('{')) {
-              try {
-                const parsed = JSON.parse(data);
-                if (parsed.jsonrpc === '2.0' && parsed.id === request.id) {
-                  jsonResponse = parsed;
-                  if (responseTimeout) clearTimeout(responseTimeout);
-                  if (sseResponse && sseResponse.data) sseResponse.data.destroy();
-                  if (parsed.error) {
-                    return reject(new Error(parsed.error.message || 'Unknown error from SSE server'));
-                  }
-                  return resolve(parsed.result || parsed);
-                }
-              } catch {}
-            }
-          }
-        }
+// A small pool of sessions to one SSE server. Requests go to the least busy
+// session; a new session is opened only when every existing one is busy.
+class SSESessionPool {
+  constructor(serverUrl, authToken, options = {}) {
+    this.serverUrl = serverUrl;
+    this.authToken = authToken;
+    this.size = options.size || SSE_POOL_SIZE;
+    this.keepAlive = options.keepAlive || false;
+    this.onNotification = options.onNotification || null;
+    this.label = options.label || 'dynamic';
+    this.sessions = [];
+    this.lastUsed = Date.now();
+  }
 
-        sseResponse.data.on('data', (chunk) => {
-          dataChunkCount++;
-          const chunkStr = chunk.toString();
-          console.log(`[SSE-DEBUG] Chunk ${dataChunkCount} (posted: ${requestPosted}): ${chunkStr.substring(0, 200)}...`);
-          buffer += chunk.toString();
-          console.log('[SSE-DEBUG] Raw chunk received:', chunk.toString());
-          let idx;
-          while ((idx = buffer.indexOf('\n\n')) >= 0) {
-            const eventBlock = buffer.slice(0, idx);
-            buffer = buffer.slice(idx + 2);
-            console.log('[SSE-DEBUG] Processing event block:', eventBlock);
-            processEvent(eventBlock);
-          }
-        });
+  async acquire() {
+    this.lastUsed = Date.now();
+    // Sessions that dropped and will not reconnect on their own are discarded
+    this.sessions = this.sessions.filter(s => s.state !== 'closed' || (s.keepAlive && !s.closed));
 
-        sseResponse.data.on('end', () => {
-          console.log('[SSE-DEBUG] SSE connection ended');
-          if (!jsonResponse) {
-            reject(new Error('SSE connection ended without response'));
-          }
-        });
-        
-        sseResponse.data.on('close', () => {
-          console.log('[SSE-DEBUG] SSE connection closed');
-        });
-        
-        sseResponse.data.on('error', (err) => {
-          console.log('[SSE-DEBUG] SSE connection error:', err.message);
-          if (!jsonResponse) {
-            reject(new Error(`SSE connection error: ${err.message}`));
-          }
-        });
-      })
-      .catch((err) => {
-        if (err.response) {
-          console.error('[SSE-DEBUG] Error response status:', err.response.status);
-          console.error('[SSE-DEBUG] Error response headers:', err.response.headers);
-          console.error('[SSE-DEBUG] Error response data:', err.response.data ? err.response.data.toString() : '');
-        }
-        if (sessionTimeout) clearTimeout(sessionTimeout);
-        if (responseTimeout) clearTimeout(responseTimeout);
-        reject(new Error(`[SSE] Failed to open SSE connection: ${err.message}`));
+    const leastBusy = (sessions) => sessions.reduce((best, s) => (!best || s.inFlight < best.inFlight ? s : best), null);
+    let session = leastBusy(this.sessions.filter(s => s.state === 'ready' || s.state === 'connecting'));
+    if ((!session || session.inFlight > 0) && this.sessions.length < this.size) {
+      session = new SSESession(this.serverUrl, this.authToken, {
+        keepAlive: this.keepAlive,
+        onNotification: this.onNotification,
+        label: this.label
       });
-  });
+      this.sessions.push(session);
+    } else if (!session) {
+      // Every session is waiting to reconnect; reconnect one now
+      session = leastBusy(this.sessions);
+    }
+
+    await session.connect();
+    return session;
+  }
+
+  async request(request, timeoutMs, signal) {
+    const session = await this.acquire();
+    return session.request(request, timeoutMs, signal);
+  }
+
+  get reconnects() {
+    return this.sessions.reduce((total, s) => total + s.reconnects, 0);
+  }
+
+  close() {
+    this.sessions.forEach(s => s.close());
+    this.sessions = [];
+  }
+}
+
+// SSE session pools keyed by server URL and auth token
+const sseSessionPools = new Map();
+
+function sseSessionPoolKey(serverUrl, authToken) {
+  return `${serverUrl}|${authToken || ''}`;
+}
+
+function getSSESessionPool(serverUrl, authToken, options = {}) {
+  const key = sseSessionPoolKey(serverUrl, authToken);
+  let pool = sseSessionPools.get(key);
+  if (!pool) {
+    pool = new SSESessionPool(serverUrl, authToken, options);
+    sseSessionPools.set(key, pool);
+  } else if (options.keepAlive && !pool.keepAlive) {
+    // A configured server took over a pool opened for dynamic requests
+    pool.keepAlive = true;
+    pool.size = options.size || pool.size;
+    pool.onNotification = options.onNotification || pool.onNotification;
+    pool.label = options.label || pool.label;
+    pool.sessions.forEach(s => {
+      s.keepAlive = true;
+      s.onNotification = pool.onNotification;
+      s.label = pool.label;
+    });
+  }
+  return pool;
+}
+
+function closeSSESessionPool(serverUrl, authToken) {
+  const key = sseSessionPoolKey(serverUrl, authToken);
+  const pool = sseSessionPools.get(key);
+  if (pool) {
+    pool.close();
+    sseSessionPools.delete(key);
+  }
+}
+
+// Close pools for dynamic servers that have gone idle; configured servers keep theirs
+setInterval(() => {
+  const now = Date.now();
+  for (const [key, pool] of sseSessionPools) {
+    const busy = pool.sessions.some(s => s.inFlight > 0);
+    if (!pool.keepAlive && !busy && now - pool.lastUsed > SSE_IDLE_TIMEOUT_MS) {
+      pool.close();
+      sseSessionPools.delete(key);
+    }
+  }
+}, 60 * 1000).unref();
+
+// SSE MCP Request over a pooled, long-lived session
+async function sendSSEMCPRequest(serverUrl, authToken, request, method, params) {
+  log.debug(`[SSE] Sending ${method} to ${serverUrl} [${request.id}]`);
+  const response = await getSSESessionPool(serverUrl, authToken).request(request);
+  if (response.error) {
+    throw new Error(response.error.message || 'Unknown error from SSE server');
+  }
+  return response.result || response;
 }
 
 // Parse SSE session data to extract endpoint
 function parseSSESessionData(sseData) {
-  console.log(`[SSE] Parsing session data...`);
+  log.debug(`[SSE] Parsing session data...`);
   
   try {
     // Handle common SSE response patterns
@@ -984,7 +2934,7 @@ function parseSSESessionData(sseData) {
       // Pattern 1: data: /path/to/endpoint
       if (line.startsWith('data: /')) {
         const endpoint = line.replace('data: ', '').trim();
-        console.log(`[SSE] Found endpoint pattern 1: ${endpoint}`);
+        log.info(`[SSE] Found endpoint pattern 1: ${endpoint}`);
         return { endpoint };
       }
       
@@ -993,7 +2943,7 @@ function parseSSESessionData(sseData) {
         try {
           const data = JSON.parse(line.replace('data: ', ''));
           if (data.endpoint) {
-            console.log(`[SSE] Found endpoint pattern 2: ${data.endpoint}`);
+            log.info(`[SSE] Found endpoint pattern 2: ${data.endpoint}`);
             return { endpoint: data.endpoint };
           }
         } catch (e) {
@@ -1006,18 +2956,18 @@ function parseSSESessionData(sseData) {
         const match = line.match(/endpoint=([^&\s]+)/);
         if (match) {
           const endpoint = decodeURIComponent(match[1]);
-          console.log(`[SSE] Found endpoint pattern 3: ${endpoint}`);
+          log.info(`[SSE] Found endpoint pattern 3: ${endpoint}`);
           return { endpoint };
         }
       }
     }
     
     // If no specific pattern found, log the data for debugging
-    console.log(`[SSE] Could not parse session data:`, sseData.substring(0, 200));
+    log.info(`[SSE] Could not parse session data`, { data: sseData.substring(0, 200) });
     throw new Error('No endpoint found in SSE session data');
     
   } catch (error) {
-    console.error(`[SSE] Session parsing error:`, error.message);
+    log.error(`[SSE] Session parsing error`, { error: error.message });
     throw error;
   }
 }
@@ -1032,8 +2982,8 @@ async function sendMCPRequestForJob(serverId, method, params = {}) {
   // Handle HTTP servers
   if (serverInfo.type === 'http') {
     try {
-      console.log(`[JOB] Sending HTTP request to ${serverId}: ${method}`, params);
-      const response = await serverInfo.sendRequest(method, params);
+      log.debug(`[JOB] Sending HTTP request to ${serverId}: ${method}`, () => ({ params }));
+      const response = await sendShared(serverId, method, params, () => serverInfo.sendRequest(method, params));
       
       if (response.error) {
         throw new Error(response.error.message || 'Unknown error from HTTP server');
@@ -1041,7 +2991,7 @@ async function sendMCPRequestForJob(serverId, method, params = {}) {
       
       return response.result || response;
     } catch (error) {
-      console.error(`[JOB] Error sending HTTP request to ${serverId}:`, error);
+      log.error(`[JOB] Error sending HTTP request to ${serverId}`, error);
       throw error;
     }
   }
@@ -1049,8 +2999,8 @@ async function sendMCPRequestForJob(serverId, method, params = {}) {
   // Handle SSE servers
   if (serverInfo.type === 'sse') {
     try {
-      console.log(`[JOB] Sending SSE request to ${serverId}: ${method}`, params);
-      const response = await serverInfo.sendRequest(method, params);
+      log.debug(`[JOB] Sending SSE request to ${serverId}: ${method}`, () => ({ params }));
+      const response = await sendShared(serverId, method, params, () => serverInfo.sendRequest(method, params));
       
       if (response.error) {
         throw new Error(response.error.message || 'Unknown error from SSE server');
@@ -1058,139 +3008,255 @@ async function sendMCPRequestForJob(serverId, method, params = {}) {
       
       return response.result || response;
     } catch (error) {
-      console.error(`[JOB] Error sending SSE request to ${serverId}:`, error);
+      log.error(`[JOB] Error sending SSE request to ${serverId}`, error);
       throw error;
     }
   }
   
   // Handle regular MCP servers with NO TIMEOUT for background jobs
-  return new Promise((resolve, reject) => {
-    // Check initialization state
-    const initState = serverInitializationState.get(serverId);
-    if (initState !== 'initialized') {
-      const stateMessage = {
-        'starting': 'Server is still starting up',
-        'timeout': 'Server initialization timed out',
-        'error': 'Server initialization failed'
-      }[initState] || 'Server is not properly initialized';
-      
-      return reject(new Error(`${stateMessage}. Current state: ${initState}`));
+  const response = await sendShared(serverId, method, params,
+    () => sendStdioMCPRequest(serverId, serverInfo, method, params));
+  if (response.error) {
+    throw new Error(response.error.message || 'Unknown error');
+  }
+  return response.result;
+}
+
+// Wait, up to SERVER_INIT_TIMEOUT_MS, until a replica of a starting or
+// restarting stdio server is ready. With failedDispatcher, first wait for that
+// process to finish exiting so it is out of rotation and its restart scheduled.
+async function waitForStdioServer(serverId, serverInfo, failedDispatcher = null) {
+  let timer;
+  const timeout = new Promise(resolve => { timer = setTimeout(resolve, SERVER_INIT_TIMEOUT_MS); });
+  try {
+    if (failedDispatcher && !failedDispatcher.closed) {
+      await Promise.race([new Promise(resolve => failedDispatcher.process.once('close', resolve)), timeout]);
     }
+    if (!serverInfo.replicas.some(replica => replica.state === 'initialized')) {
+      const pending = serverInfo.replicas.filter(replica => replica.ready).map(replica => replica.ready.catch(() => {}));
+      if (pending.length) await Promise.race([...pending, timeout]);
+    }
+  } finally {
+    clearTimeout(timer);
+  }
+}
+
+// Send a request to a stdio server through the dispatcher of its least busy
+// replica. Returns the raw JSON-RPC response; options may carry timeoutMs and
+// an AbortSignal.
+async function sendStdioMCPRequest(serverId, serverInfo, method, params = {}, options = {}) {
+  // Requests that arrive while the server starts or restarts wait for it
+  await waitForStdioServer(serverId, serverInfo);
+  
+  // Check initialization state
+  const initState = serverInitializationState.get(serverId);
+  if (initState !== 'initialized') {
+    const stateMessage = {
+      'starting': 'Server is still starting up',
+      'restarting': 'Server is restarting',
+      'timeout': 'Server initialization timed out',
+      'error': 'Server initialization failed'
+    }[initState] || 'Server is not properly initialized';
     
-    const { process: serverProcess } = serverInfo;
-    const requestId = uuidv4();
-    
-    const request = {
-      jsonrpc: "2.0",
-      id: requestId,
-      method,
-      params
+    throw new Error(`${stateMessage}. Current state: ${initState}`);
+  }
+  
+  const requestId = uuidv4();
+  log.debug(`[STDIO] Sending request to ${serverId}: ${method}`, () => ({ params }));
+  const request = { jsonrpc: "2.0", id: requestId, method, params };
+  let dispatcher = null;
+  const send = (replica) => {
+    dispatcher = replica.dispatcher;
+    return dispatcher.request(request, options);
+  };
+  let response;
+  try {
+    response = await withReplica(serverId, serverInfo, send);
+  } catch (error) {
+    // The process died before the request reached it; send it once more to
+    // another replica or the restarted process
+    if (!error.notSent || serverInfo.stopping) throw error;
+    const failed = dispatcher;
+    await waitForStdioServer(serverId, serverInfo, failed);
+    if (!failed.closed || serverInitializationState.get(serverId) !== 'initialized') throw error;
+    response = await withReplica(serverId, serverInfo, send);
+  }
+  log.debug(`[STDIO] Received response from ${serverId} for request ${requestId}`);
+  return response;
+}
+
+// Job status events. Long-polls, event streams and webhooks all listen here
+// instead of making clients poll on a fixed interval.
+const RESULT_WAIT_MAX_S = parseInt(process.env.RESULT_WAIT_MAX_S, 10) || 60; // Longest ?wait= a poll may hold
+const JOB_EVENTS_HEARTBEAT_MS = parseInt(process.env.JOB_EVENTS_HEARTBEAT_MS, 10) || 15000;
+const WEBHOOK_TIMEOUT_MS = parseInt(process.env.WEBHOOK_TIMEOUT_MS, 10) || 10000;
+const WEBHOOK_MAX_ATTEMPTS = parseInt(process.env.WEBHOOK_MAX_ATTEMPTS, 10) || 3;
+// Hosts webhooks may be sent to. Empty: any host on a public address.
+const WEBHOOK_ALLOWED_HOSTS = (process.env.WEBHOOK_ALLOWED_HOSTS || '')
+  .split(',').map(host => host.trim().toLowerCase()).filter(Boolean);
+
+// Loopback, private, link-local (cloud metadata), CGNAT, multicast and reserved ranges
+const PRIVATE_ADDRESSES = new net.BlockList();
+[['0.0.0.0', 8], ['10.0.0.0', 8], ['100.64.0.0', 10], ['127.0.0.0', 8], ['169.254.0.0', 16],
+  ['172.16.0.0', 12], ['192.0.0.0', 24], ['192.168.0.0', 16], ['198.18.0.0', 15], ['224.0.0.0', 3]]
+  .forEach(([network, prefix]) => PRIVATE_ADDRESSES.addSubnet(network, prefix, 'ipv4'));
+[['::', 128], ['::1', 128], ['fc00::', 7], ['fe80::', 10], ['ff00::', 8]]
+  .forEach(([network, prefix]) => PRIVATE_ADDRESSES.addSubnet(network, prefix, 'ipv6'));
+
+function isPrivateAddress(address) {
+  const family = net.isIP(address);
+  return family !== 0 && PRIVATE_ADDRESSES.check(address, family === 6 ? 'ipv6' : 'ipv4');
+}
+
+// Hostnames are checked again when the webhook connects, against the
+// addresses they resolve to then, so DNS can't point them inside later
+function webhookLookup(hostname, options, callback) {
+  dns.lookup(hostname, { ...options, all: true }, (error, addresses) => {
+    if (error) return callback(error);
+    const blocked = addresses.find(({ address }) => isPrivateAddress(address));
+    if (blocked) {
+      return callback(new Error(`${hostname} resolves to a non-public address (${blocked.address})`));
+    }
+    if (options.all) callback(null, addresses);
+    else callback(null, addresses[0].address, addresses[0].family);
+  });
+}
+
+const webhookAgents = {
+  httpAgent: new http.Agent({ lookup: webhookLookup }),
+  httpsAgent: new https.Agent({ lookup: webhookLookup })
+};
+
+const jobEvents = new EventEmitter();
+jobEvents.setMaxListeners(0); // One listener per waiting client
+
+function isJobFinished(job) {
+  return job.status === 'COMPLETED' || job.status === 'FAILED';
+}
+
+// Tell everyone waiting on a job that its status changed
+function publishJobEvent(job) {
+  jobEvents.emit(job.job_id, job);
+  if (isJobFinished(job) && job.callback_url) {
+    deliverJobWebhook(job);
+  }
+}
+
+// Resolve once the job finishes, the timeout passes or the client goes away
+function waitForJob(job_id, timeoutMs, res) {
+  return new Promise(resolve => {
+    const done = () => {
+      clearTimeout(timer);
+      jobEvents.removeListener(job_id, onEvent);
+      res.removeListener('close', done);
+      resolve();
     };
-    
-    console.log(`[JOB] Sending request to ${serverId}: ${method}`, params);
-    
-    // Set up response handler (NO TIMEOUT for background jobs)
-    const messageHandler = (data) => {
-      try {
-        const responseText = data.toString();
-        let parsedResponse = null;
-        let jsonError = null;
-        
-        try {
-          parsedResponse = JSON.parse(responseText);
-        } catch (e) {
-          const lines = responseText.split('\n').filter(line => line.trim());
-          
-          for (const line of lines) {
-            try {
-              const lineResponse = JSON.parse(line);
-              if (lineResponse.id === requestId) {
-                parsedResponse = lineResponse;
-                break;
-              }
-            } catch (lineError) {
-              jsonError = lineError;
-              console.error(`[JOB] Error parsing JSON line from ${serverId}:`, lineError);
-            }
-          }
-        }
-            
-        if (parsedResponse && parsedResponse.id === requestId) {
-          console.log(`[JOB] Received response from ${serverId} for request ${requestId}`);
-          
-          // Remove handler after response is received
-          serverProcess.stdout.removeListener('data', messageHandler);
-          
-          if (parsedResponse.error) {
-            return reject(new Error(parsedResponse.error.message || 'Unknown error'));
-          }
-          
-          return resolve(parsedResponse.result);
-        } else if (jsonError) {
-          console.error(`[JOB] Failed to parse JSON response from ${serverId}`);
-          serverProcess.stdout.removeListener('data', messageHandler);
-          return reject(new Error(`Invalid response format from MCP server: ${jsonError.message}`));
-        }
-      } catch (error) {
-        console.error(`[JOB] Error processing response from ${serverId}:`, error);
-        serverProcess.stdout.removeListener('data', messageHandler);
-        return reject(new Error(`Error processing response: ${error.message}`));
-      }
+    const onEvent = job => {
+      if (isJobFinished(job)) done();
     };
-    
-    // Add response handler (NO TIMEOUT)
-    serverProcess.stdout.on('data', messageHandler);
-    
-    // Send the request
+    const timer = setTimeout(done, timeoutMs);
+    jobEvents.on(job_id, onEvent);
+    res.on('close', done);
+  });
+}
+
+// Only plain http(s) URLs are accepted as webhook targets. With
+// WEBHOOK_ALLOWED_HOSTS set the host must be listed; otherwise it must not be
+// loopback, private or link-local.
+function validateCallbackUrl(callback_url) {
+  if (callback_url === undefined || callback_url === null) return null;
+  let url;
+  try {
+    url = new URL(callback_url);
+  } catch (urlError) {
+    url = null;
+  }
+  if (!url || (url.protocol !== 'http:' && url.protocol !== 'https:')) {
+    return 'Invalid callback_url format. Must be a valid HTTP/HTTPS URL';
+  }
+  const hostname = url.hostname.toLowerCase().replace(/^\[(.*)\]$/, '$1');
+  if (WEBHOOK_ALLOWED_HOSTS.length) {
+    return WEBHOOK_ALLOWED_HOSTS.includes(hostname) ? null : `callback_url host ${hostname} is not in WEBHOOK_ALLOWED_HOSTS`;
+  }
+  if (hostname === 'localhost' || hostname.endsWith('.localhost') || isPrivateAddress(hostname)) {
+    return 'callback_url must not point to a loopback, private or link-local address';
+  }
+  return null;
+}
+
+// POST the finished job to its callback_url. The body is signed with the
+// job's bearer token so the receiver can check it came from this bridge.
+async function deliverJobWebhook(job) {
+  if (!job.bearer_token) {
+    // Jobs recovered from the job log only have the token's hash to sign with
+    log.warn(`[WEBHOOK] Not delivering job ${job.job_id} to ${job.callback_url}: its bearer token was not kept across the restart`);
+    return;
+  }
+  const callbackError = validateCallbackUrl(job.callback_url);
+  if (callbackError) {
+    // Accepted under an earlier WEBHOOK_ALLOWED_HOSTS, or before targets were checked
+    log.warn(`[WEBHOOK] Not delivering job ${job.job_id}: ${callbackError}`);
+    return;
+  }
+  const { payload } = await jobResultPayload(job);
+  const signature = crypto.createHmac('sha256', job.bearer_token).update(payload).digest('hex');
+
+  for (let attempt = 1; attempt <= WEBHOOK_MAX_ATTEMPTS; attempt++) {
     try {
-      serverProcess.stdin.write(JSON.stringify(request) + '\n');
-    } catch (error) {
-      serverProcess.stdout.removeListener('data', messageHandler);
-      reject(new Error(`Failed to send request to ${serverId}: ${error.message}`));
+      await axios.post(job.callback_url, payload, {
+        timeout: WEBHOOK_TIMEOUT_MS,
+        maxRedirects: 0, // A redirect could lead anywhere
+        ...(!WEBHOOK_ALLOWED_HOSTS.length && webhookAgents),
+        headers: {
+          'Content-Type': 'application/json',
+          'X-Job-Id': job.job_id,
+          'X-Bridge-Signature': `sha256=${signature}`
+        }
+      });
+      log.info(`[WEBHOOK] Delivered ${job.status} for job ${job.job_id} to ${job.callback_url}`);
       return;
+    } catch (error) {
+      log.error(`[WEBHOOK] Attempt ${attempt}/${WEBHOOK_MAX_ATTEMPTS} for job ${job.job_id} failed: ${error.message}`);
+      if (attempt < WEBHOOK_MAX_ATTEMPTS) {
+        await new Promise(resolve => setTimeout(resolve, 1000 * 2 ** (attempt - 1)));
+      }
     }
-    
-    // Handle error case
-    const errorHandler = (error) => {
-      serverProcess.stdout.removeListener('data', messageHandler);
-      serverProcess.removeListener('error', errorHandler);
-      reject(error);
-    };
-    
-    serverProcess.once('error', errorHandler);
-  });
+  }
 }
 
 // Background job processor
 async function processJobInBackground(job_id) {
-  console.log(`[JOB-ENTRY] Entering processJobInBackground for job: ${job_id}`);
+  log.debug(`[JOB-ENTRY] Entering processJobInBackground for job: ${job_id}`);
   const job = jobs.get(job_id);
   if (!job) {
-    console.error(`[JOB ${job_id}] Job not found in jobs map`);
-    console.log(`[JOB-DEBUG] Available jobs:`, Array.from(jobs.keys()));
+    log.error(`[JOB ${job_id}] Job not found in jobs map`);
+    log.debug(`[JOB-DEBUG] Available jobs`, () => ({ job_ids: Array.from(jobs.keys()) }));
     return;
   }
-  console.log(`[JOB ${job_id}] Starting background processing for tool: ${job.tool_name}`);
-  console.log(`[JOB-DEBUG] Job details:`, JSON.stringify(job, null, 2));
+  log.debug(`[JOB ${job_id}] Starting background processing for tool: ${job.tool_name}`);
+  log.trace(`[JOB-DEBUG] Job details`, () => ({ job }));
   try {
     let result;
     if (job.dynamic_server_url) {
-      console.log(`[JOB ${job_id}] Using dynamic MCP server: ${job.dynamic_server_url}`);
-      console.log(`[MCP-FIX] Using CORRECT MCP format - calling tool directly:`, {
+      if (job.dynamic_auth_required && !job.dynamic_auth_token) {
+        throw new Error('The MCP auth token of this job was lost when the bridge restarted (it is never written to disk); submit the job again');
+      }
+      log.debug(`[JOB ${job_id}] Using dynamic MCP server: ${job.dynamic_server_url}`);
+      log.debug(`[MCP-FIX] Using CORRECT MCP format - calling tool directly`, () => ({
         url: job.dynamic_server_url,
-        token: job.dynamic_auth_token,
         method: job.tool_name,  // Direct tool name as method
         params: job.parameters  // Direct parameters
-      });
+      }));
       result = await sendDynamicMCPRequest(
         job.dynamic_server_url,
         job.dynamic_auth_token,
         job.tool_name,
         job.parameters
       );
-      console.log(`[MCP-FIX] sendDynamicMCPRequest result:`, JSON.stringify(result, null, 2));
+      log.trace(`[MCP-FIX] sendDynamicMCPRequest result`, () => ({ result }));
     }
     else if (job.server_id) {
+      await ensureServerStarted(job.server_id);
       if (!serverProcesses.has(job.server_id)) {
         throw new Error(`Server '${job.server_id}' not found or not connected`);
       }
@@ -1200,70 +3266,245 @@ async function processJobInBackground(job_id) {
       });
     } 
     else {
-      let foundServer = null;
-      for (const [serverId, serverInfo] of serverProcesses) {
-        try {
-          const tools = await sendMCPRequestForJob(serverId, 'tools/list');
-          if (tools && tools.tools && tools.tools.some(t => t.name === job.tool_name)) {
-            foundServer = serverId;
-            break;
-          }
-        } catch (error) {
-          console.warn(`[JOB ${job_id}] Could not check tools for server ${serverId}:`, error.message);
-        }
-      }
+      const foundServer = await findServerForTool(job.tool_name);
       if (!foundServer) {
         throw new Error(`Tool '${job.tool_name}' not found on any connected server`);
       }
-      console.log(`[JOB ${job_id}] Found tool '${job.tool_name}' on server '${foundServer}'`);
+      log.debug(`[JOB ${job_id}] Found tool '${job.tool_name}' on server '${foundServer}'`);
       result = await sendMCPRequestForJob(foundServer, 'tools/call', {
         name: job.tool_name,
         arguments: job.parameters
       });
     }
-    console.log(`[JOB ${job_id}] Setting status to COMPLETED. Result:`, JSON.stringify(result, null, 2));
+    log.trace(`[JOB ${job_id}] Setting status to COMPLETED`, () => ({ result }));
+    // Stored before the status changes, so whoever sees COMPLETED can read it
+    jobResults.set(job_id, await jobResults.encode(parseJobResult(result)));
     job.status = 'COMPLETED';
-    job.result = result;
     job.completed_at = new Date().toISOString();
-    console.log(`[JOB ${job_id}] About to update jobs map. Job object:`, JSON.stringify(job, null, 2));
     jobs.set(job_id, job);
-    console.log(`[JOB ${job_id}] Completed successfully. Result stored. Job object after set:`, JSON.stringify(jobs.get(job_id), null, 2));
+    publishJobEvent(job);
+    log.debug(`[JOB ${job_id}] Completed successfully`);
   } catch (error) {
     job.status = 'FAILED';
     job.error = error.message;
     job.completed_at = new Date().toISOString();
     jobs.set(job_id, job);
-    console.error(`[JOB ${job_id}] Failed:`, error.message);
-    console.error(`[JOB ${job_id}] Job object after failure:`, JSON.stringify(job, null, 2));
+    publishJobEvent(job);
+    log.error(`[JOB ${job_id}] Failed`, { error: error.message });
+    log.debug(`[JOB ${job_id}] Job object after failure`, () => ({ job }));
   }
 }
 
-// Job cleanup - remove expired jobs
-function cleanupExpiredJobs() {
-  const now = new Date();
-  let cleanedCount = 0;
-  
-  for (const [job_id, job] of jobs) {
-    if (new Date(job.expires_at) < now) {
-      jobs.delete(job_id);
-      cleanedCount++;
+// Job scheduler configuration
+const JOB_CONCURRENCY = parseInt(process.env.JOB_CONCURRENCY, 10) || 20; // Jobs running at once across all servers
+const JOB_SERVER_CONCURRENCY = parseInt(process.env.JOB_SERVER_CONCURRENCY, 10) || 5; // Default per-server cap
+const JOB_PRIORITIES = { high: 0, normal: 1, low: 2 };
+
+// Bounded worker pool for background jobs. Jobs wait in one queue per
+// priority level; inside a level callers are served round-robin so one busy
+// caller cannot starve the others. A job starts only when both the global
+// and its server's concurrency caps have room.
+class JobScheduler {
+  constructor(concurrency = JOB_CONCURRENCY, serverConcurrency = JOB_SERVER_CONCURRENCY) {
+    this.concurrency = concurrency;
+    this.serverConcurrency = serverConcurrency;
+    this.levels = Object.keys(JOB_PRIORITIES).map(() => ({
+      queues: new Map(), // callerId -> job ids, oldest first
+      callers: [], // round-robin order of callers with queued jobs
+      cursor: 0
+    }));
+    this.queued = 0;
+    this.running = 0;
+    this.runningByServer = new Map();
+    this.stats = { enqueued: 0, started: 0, completed: 0, failed: 0, totalWaitMs: 0, maxWaitMs: 0, lastWaitMs: 0 };
+  }
+
+  enqueue(job, callerId = 'anonymous') {
+    const level = this.levels[JOB_PRIORITIES[job.priority] ?? JOB_PRIORITIES.normal];
+    if (!level.queues.has(callerId)) {
+      level.queues.set(callerId, []);
+      level.callers.push(callerId);
+    }
+    level.queues.get(callerId).push(job.job_id);
+    this.queued++;
+    this.stats.enqueued++;
+    setImmediate(() => this._drain());
+  }
+
+  // Key used for the per-server cap. Null when the tool's server is not known
+  // yet: such jobs only count against the global cap, since they may end up
+  // on any server.
+  _serverKey(job) {
+    return job.server_id || job.dynamic_server_url || resolveToolServer(job.tool_name) || null;
+  }
+
+  _serverLimit(serverKey) {
+    const serverInfo = serverProcesses.get(serverKey);
+    return (serverInfo && serverInfo.config && serverInfo.config.maxConcurrentJobs) || this.serverConcurrency;
+  }
+
+  _hasServerCapacity(serverKey) {
+    return serverKey === null || (this.runningByServer.get(serverKey) || 0) < this._serverLimit(serverKey);
+  }
+
+  _removeCaller(level, index) {
+    level.queues.delete(level.callers[index]);
+    level.callers.splice(index, 1);
+    if (level.cursor > index) level.cursor--;
+    if (level.cursor >= level.callers.length) level.cursor = 0;
+  }
+
+  // Take the next runnable job: highest priority first, callers in turn
+  _next() {
+    for (const level of this.levels) {
+      let checked = 0;
+      while (checked < level.callers.length) {
+        const index = (level.cursor + checked) % level.callers.length;
+        const queue = level.queues.get(level.callers[index]);
+
+        // Drop jobs that expired or were removed while waiting
+        while (queue.length > 0 && !jobs.has(queue[0])) {
+          queue.shift();
+          this.queued--;
+        }
+        if (queue.length === 0) {
+          this._removeCaller(level, index);
+          continue;
+        }
+
+        const job = jobs.get(queue[0]);
+        const serverKey = this._serverKey(job);
+        if (this._hasServerCapacity(serverKey)) {
+          queue.shift();
+          this.queued--;
+          if (queue.length === 0) {
+            this._removeCaller(level, index);
+          } else {
+            level.cursor = (index + 1) % level.callers.length;
+          }
+          return { job, serverKey };
+        }
+        checked++;
+      }
+    }
+    return null;
+  }
+
+  _drain() {
+    while (this.running < this.concurrency) {
+      const next = this._next();
+      if (!next) return;
+      this._start(next.job, next.serverKey);
     }
   }
+
+  _start(job, serverKey) {
+    this.running++;
+    if (serverKey !== null) this.runningByServer.set(serverKey, (this.runningByServer.get(serverKey) || 0) + 1);
+
+    const waitMs = Date.now() - new Date(job.created_at).getTime();
+    this.stats.started++;
+    this.stats.totalWaitMs += waitMs;
+    this.stats.maxWaitMs = Math.max(this.stats.maxWaitMs, waitMs);
+    this.stats.lastWaitMs = waitMs;
+    metrics.jobWait.observe([Object.hasOwn(JOB_PRIORITIES, job.priority) ? job.priority : 'normal'], Math.max(waitMs, 0) / 1000);
+    const runStart = process.hrtime.bigint();
+
+    job.status = 'PROCESSING';
+    job.started_at = new Date().toISOString();
+    jobs.set(job.job_id, job);
+    publishJobEvent(job);
+
+    processJobInBackground(job.job_id).finally(() => {
+      this.running--;
+      if (serverKey !== null) {
+        const remaining = this.runningByServer.get(serverKey) - 1;
+        if (remaining > 0) this.runningByServer.set(serverKey, remaining);
+        else this.runningByServer.delete(serverKey);
+      }
+      if (job.status === 'COMPLETED') this.stats.completed++;
+      else this.stats.failed++;
+      metrics.jobDuration.observe([job.status === 'COMPLETED' ? 'completed' : 'failed'], secondsSince(runStart));
+      this._drain();
+    });
+  }
+
+  metrics() {
+    const queuedByPriority = {};
+    Object.keys(JOB_PRIORITIES).forEach((name, i) => {
+      let depth = 0;
+      for (const queue of this.levels[i].queues.values()) depth += queue.length;
+      queuedByPriority[name] = depth;
+    });
+    return {
+      concurrency: this.concurrency,
+      server_concurrency: this.serverConcurrency,
+      queue_depth: this.queued,
+      queued_by_priority: queuedByPriority,
+      running: this.running,
+      running_by_server: Object.fromEntries(this.runningByServer),
+      wait_time_ms: {
+        average: this.stats.started ? Math.round(this.stats.totalWaitMs / this.stats.started) : 0,
+        max: this.stats.maxWaitMs,
+        last: this.stats.lastWaitMs
+      },
+      totals: {
+        enqueued: this.stats.enqueued,
+        started: this.stats.started,
+        completed: this.stats.completed,
+        failed: this.stats.failed
+      }
+    };
+  }
+}
+
+const jobScheduler = new JobScheduler();
+
+// Identify the caller for fair queuing
+function jobCallerId(req) {
+  return req.get('X-Client-Id') || req.ip || 'anonymous';
+}
+
+// Job cleanup - remove expired jobs
+function cleanupExpiredJobs() {
+  const cleanedCount = jobs.deleteExpired(Date.now());
+  jobResults.retain(job_id => jobs.has(job_id));
   
   if (cleanedCount > 0) {
-    console.log(`[CLEANUP] Removed ${cleanedCount} expired jobs`);
+    log.info(`[CLEANUP] Removed ${cleanedCount} expired jobs`);
   }
 }
 
 // Run cleanup every 10 minutes
 setInterval(cleanupExpiredJobs, 10 * 60 * 1000);
 
+// Put jobs that were waiting or running when the bridge stopped back in the queue
+function recoverJobs() {
+  requeueJobs([...jobs.withStatus('QUEUED'), ...jobs.withStatus('PROCESSING')]);
+}
+
+// Queue unfinished jobs again, oldest first; jobs that were running start over
+function requeueJobs(unfinished) {
+  unfinished.sort((a, b) => new Date(a.created_at) - new Date(b.created_at));
+  for (const job of unfinished) {
+    if (job.status === 'PROCESSING') {
+      job.status = 'QUEUED';
+      job.started_at = null;
+      jobs.set(job.job_id, job);
+    }
+    jobScheduler.enqueue(job, job.caller_id);
+  }
+  if (unfinished.length > 0) {
+    log.info(`[JOB-STORE] Re-queued ${unfinished.length} unfinished jobs`);
+  }
+}
+
 // API Routes
-console.log('Setting up API routes');
+log.info('Setting up API routes');
 
 // Get server status
 app.get('/servers', (req, res) => {
-  console.log('GET /servers');
+  log.debug('GET /servers');
   const servers = Array.from(serverProcesses.entries()).map(([id, info]) => {
     // Create base server info
     const serverInfo = {
@@ -1283,22 +3524,54 @@ app.get('/servers', (req, res) => {
       }
     }
     
+    if (info.replicas.length > 1) {
+      serverInfo.replicas = info.replicas.map(replica => ({
+        index: replica.index,
+        ...(replica.url ? { url: replica.url } : { pid: replica.pid }),
+        state: replica.state,
+        healthy: replica.healthy,
+        in_flight: replica.inFlight
+      }));
+    }
+    
     return serverInfo;
   });
+  for (const [id, config] of lazyServers) {
+    if (serverProcesses.has(id)) continue; // Lazy start in progress
+    servers.push({ id, connected: false, pid: null, initialization_state: 'lazy', risk_level: config.riskLevel });
+  }
   
-  console.log(`Returning ${servers.length} servers`);
+  log.debug(`Returning ${servers.length} servers`);
   res.json({ servers });
 });
 
+// Servers added or removed through the API on one cluster worker are started
+// or stopped on the others; new workers read them from mcp_config.json
+clusterChannels.set('servers', {
+  apply: (message) => {
+    if (isClusterPrimary) {
+      if (message.op === 'stop') invalidateCatalog(message.id);
+      return;
+    }
+    if (message.op === 'start' && !serverProcesses.has(message.id)) {
+      startServer(message.id, message.config)
+        .then(() => buildToolIndex([message.id]))
+        .catch((error) => log.warn(`Could not start server '${message.id}' added on another worker: ${error.message}`));
+    } else if (message.op === 'stop') {
+      shutdownServer(message.id);
+    }
+  }
+});
+
 // Start a new server (manual configuration)
 app.post('/servers', async (req, res) => {
-  console.log('POST /servers', req.body);
+  log.info('POST /servers', () => ({ body: req.body }));
   try {
-    const { id, command, args, env, riskLevel, docker, type, url, description } = req.body;
+    const { id, command, args, env, riskLevel, docker, type, url, urls, replicas, description } = req.body;
     if (!id) {
       return res.status(400).json({ error: "Server ID is required" });
     }
-    if (serverProcesses.has(id)) {
+    if (serverProcesses.has(id) || lazyServers.has(id)) {
       return res.status(409).json({ error: `Server with ID '${id}' already exists` });
     }
     // Validate risk level if provided
@@ -1315,6 +3588,8 @@ app.post('/servers', async (req, res) => {
     if (command) config.command = command;
     if (type) config.type = type;
     if (url) config.url = url;
+    if (Array.isArray(urls) && urls.length) config.urls = urls;
+    if (replicas !== undefined) config.replicas = replicas;
     if (riskLevel !== undefined) config.riskLevel = riskLevel;
     if (docker) config.docker = docker;
     if (description) config.description = description;
@@ -1325,15 +3600,15 @@ app.post('/servers', async (req, res) => {
         await startServer(id, config);
         started = true;
       } catch (e) {
-        console.warn(`Warning: Could not start server process for '${id}': ${e.message}`);
+        log.warn(`Warning: Could not start server process for '${id}': ${e.message}`);
       }
-    } else if (type === 'sse' && url) {
+    } else if (type === 'sse' && (url || config.urls)) {
       // Register SSE server in memory (simulate startServer for SSE)
       try {
         await startServer(id, config);
         started = true;
       } catch (e) {
-        console.warn(`Warning: Could not register SSE server for '${id}': ${e.message}`);
+        log.warn(`Warning: Could not register SSE server for '${id}': ${e.message}`);
       }
     }
     // Always persist to mcp_config.json if config is valid
@@ -1348,6 +3623,9 @@ app.post('/servers', async (req, res) => {
       if (started) await shutdownServer(id);
       return res.status(500).json({ error: 'Failed to persist server config: ' + e.message });
     }
+    // Index the new server's tools for /tool/execute routing (non-blocking)
+    if (started) buildToolIndex([id]);
+    if (started) clusterPublish('servers', { op: 'start', id, config });
     // Prepare response
     let response = { id, status: started ? "connected" : "persisted", config };
     if (started && serverProcesses.get(id) && serverProcesses.get(id).pid) {
@@ -1362,17 +3640,28 @@ app.post('/servers', async (req, res) => {
     }
     res.status(started ? 201 : 202).json(response);
   } catch (error) {
-    console.error(`Error starting server: ${error.message}`);
+    log.error(`Error starting server: ${error.message}`);
     res.status(500).json({ error: error.message });
   }
 });
 
+// Lazy servers start when a route first names them
+app.param('serverId', async (req, res, next, serverId) => {
+  if (req.method === 'DELETE' || !lazyServers.has(serverId)) return next();
+  try {
+    await ensureServerStarted(serverId);
+    next();
+  } catch (error) {
+    res.status(503).json({ error: `Server '${serverId}' failed to start: ${error.message}` });
+  }
+});
+
 // Stop a server
 app.delete('/servers/:serverId', async (req, res) => {
   const { serverId } = req.params;
-  console.log(`DELETE /servers/${serverId}`);
+  log.info(`DELETE /servers/${serverId}`);
   let stopped = false;
-  if (serverProcesses.has(serverId)) {
+  if (serverProcesses.has(serverId) || lazyServers.has(serverId)) {
     try {
       await shutdownServer(serverId);
       stopped = true;
@@ -1397,6 +3686,7 @@ app.delete('/servers/:serverId', async (req, res) => {
       return res.status(500).json({ error: 'Failed to update config file: ' + e.message });
     }
   }
+  if (stopped) clusterPublish('servers', { op: 'stop', id: serverId });
   if (stopped || existedInConfig) {
     res.json({ status: "disconnected" });
   } else {
@@ -1407,7 +3697,7 @@ app.delete('/servers/:serverId', async (req, res) => {
 // Get tools for a server
 app.get('/servers/:serverId/tools', async (req, res) => {
   const { serverId } = req.params;
-  console.log(`GET /servers/${serverId}/tools`);
+  log.debug(`GET /servers/${serverId}/tools`);
 
   try {
     if (!serverProcesses.has(serverId)) {
@@ -1415,70 +3705,114 @@ app.get('/servers/:serverId/tools', async (req, res) => {
         error: `Server '${serverId}' not found or not connected`
       });
     }
-    const serverInfo = serverProcesses.get(serverId);
-    
-    // Use direct SSE server sendRequest method for better reliability
-    if (serverInfo.type === 'sse' && serverInfo.sendRequest) {
-      try {
-        console.log(`[TOOLS-LIST] Using direct SSE sendRequest for ${serverId}`);
-        const result = await serverInfo.sendRequest('tools/list', {});
-        
-        // Handle different response formats
-        if (result && result.result) {
-          res.json(result.result);
-        } else {
-          res.json(result);
-        }
-        return;
-      } catch (sseError) {
-        console.error(`[TOOLS-LIST] Direct SSE failed for ${serverId}:`, sseError.message);
-        
-        // Fallback to dynamic request
-        try {
-      const sseUrl = serverInfo.config.url.endsWith('/sse') ? serverInfo.config.url : serverInfo.config.url + '/sse';
-      const result = await sendDynamicMCPRequest(sseUrl, null, 'tools/list', {});
-          
-          // Parse and format the response properly
-          if (result && typeof result === 'string' && result.startsWith('data: ')) {
-            // Handle raw SSE response format
-            try {
-              const jsonPart = result.replace(/^data:\s*/, '').trim();
-              const parsed = JSON.parse(jsonPart);
-              if (parsed.result) {
-                res.json(parsed.result);
-              } else {
-                res.json(parsed);
-              }
-            } catch (parseError) {
-              console.error(`Error parsing SSE response for ${serverId}:`, parseError);
-              res.json({ tools: [], error: "Failed to parse server response" });
-            }
-          } else {
-      res.json(result);
-          }
-      return;
-        } catch (fallbackError) {
-          console.error(`[TOOLS-LIST] Both direct and fallback failed for ${serverId}`);
-          throw fallbackError;
+    await sendCatalog(req, res, serverId, 'tools');
+  } catch (error) {
+    log.error(`Error listing tools for ${serverId}`, error);
+    res.status(500).json({ error: error.message });
+  }
+});
+
+// Streamed tool calls - opt in with ?stream=sse|ndjson or an Accept header
+const TOOL_STREAM_CHUNK_CHARS = parseInt(process.env.TOOL_STREAM_CHUNK_CHARS, 10) || 16 * 1024;
+const TOOL_STREAM_FORMATS = {
+  sse: 'text/event-stream',
+  ndjson: 'application/x-ndjson'
+};
+
+function toolStreamFormat(req) {
+  if (req.query.stream) {
+    return TOOL_STREAM_FORMATS[req.query.stream] ? req.query.stream : null;
+  }
+  const accept = req.get('Accept') || '';
+  if (accept.includes(TOOL_STREAM_FORMATS.ndjson)) return 'ndjson';
+  if (accept.includes(TOOL_STREAM_FORMATS.sse)) return 'sse';
+  return null;
+}
+
+// Call a tool with a progressToken so the server's progress notifications
+// reach the progress listener for that token. Resolves with the tool result.
+async function callToolWithProgress(serverId, toolName, args, progressToken, signal) {
+  const serverInfo = serverProcesses.get(serverId);
+  const params = { name: toolName, arguments: args, _meta: { progressToken } };
+  const request = { jsonrpc: "2.0", id: uuidv4(), method: 'tools/call', params };
+
+  const response = await timeUpstream(serverId, 'tools/call', params, async () => {
+    if (serverInfo.type === 'http') {
+      return withReplica(serverId, serverInfo, (replica) => streamHttpMCPRequest(replica.url, null, request,
+        (message) => handleServerNotification(serverId, message), signal));
+    } else if (serverInfo.type === 'sse') {
+      return withReplica(serverId, serverInfo, (replica) => replica.sessionPool.request(request, undefined, signal));
+    } else if (serverInfo.type === 'stdio') {
+      return sendStdioMCPRequest(serverId, serverInfo, 'tools/call', params, { signal });
     }
+    throw new Error(`Unknown server type for '${serverId}'`);
+  });
+
+  if (response && response.error) {
+    throw new Error(response.error.message || 'Unknown error');
+  }
+  return response && response.jsonrpc ? response.result : response;
+}
+
+// Stream a tool call as Server-Sent Events or NDJSON. Events, in order:
+//   progress - forwarded notifications/progress {progress, total, message}
+//   content  - one per content item; text longer than TOOL_STREAM_CHUNK_CHARS
+//              is split over several events with partial: true on all but the last
+//   result   - the rest of the tool result (isError, structuredContent, ...)
+//   error    - the call failed
+async function streamToolCall(req, res, serverId, toolName, args, format) {
+  const progressToken = uuidv4();
+  const controller = new AbortController();
+  const writeEvent = format === 'sse'
+    ? (event) => res.write(`event: ${event.type}\ndata: ${JSON.stringify(event)}\n\n`)
+    : (event) => res.write(JSON.stringify(event) + '\n');
+
+  res.writeHead(200, {
+    'Content-Type': TOOL_STREAM_FORMATS[format],
+    'Cache-Control': 'no-cache, no-transform', // no-transform keeps compression from buffering events
+    'X-Accel-Buffering': 'no'
+  });
+  res.on('close', () => {
+    if (!res.writableEnded) controller.abort(); // Client went away, cancel the call
+  });
+
+  progressListeners.set(progressToken, ({ progress, total, message }) => {
+    writeEvent({ type: 'progress', progress, total, message });
+  });
+
+  try {
+    const result = await callToolWithProgress(serverId, toolName, args, progressToken, controller.signal);
+    const { content = [], ...rest } = result || {};
+    content.forEach((item, index) => {
+      if (item.type !== 'text' || typeof item.text !== 'string' || item.text.length <= TOOL_STREAM_CHUNK_CHARS) {
+        return writeEvent({ type: 'content', index, content: item });
       }
-    }
-    
-    // Default: use standard logic for non-SSE servers
-    const result = await sendMCPRequest(serverId, 'tools/list');
-    res.json(result);
+      for (let offset = 0; offset < item.text.length; offset += TOOL_STREAM_CHUNK_CHARS) {
+        const end = offset + TOOL_STREAM_CHUNK_CHARS;
+        writeEvent({
+          type: 'content',
+          index,
+          content: { ...item, text: item.text.slice(offset, end) },
+          partial: end < item.text.length
+        });
+      }
+    });
+    writeEvent({ type: 'result', result: rest });
   } catch (error) {
-    console.error(`Error listing tools for ${serverId}:`, error);
-    res.status(500).json({ error: error.message });
+    log.error(`Error streaming tool ${toolName}`, { error: error.message });
+    writeEvent({ type: 'error', error: `Error executing tool ${toolName}: ${error.message}` });
+  } finally {
+    progressListeners.delete(progressToken);
+    res.end();
   }
-});
+}
 
 // Execute a tool on a server
 app.post('/servers/:serverId/tools/:toolName', async (req, res) => {
   const { serverId, toolName } = req.params;
   const arguments = req.body;
 
-  console.log(`POST /servers/${serverId}/tools/${toolName}`, arguments);
+  log.debug(`POST /servers/${serverId}/tools/${toolName}`, () => ({ arguments }));
 
   try {
     if (!serverProcesses.has(serverId)) {
@@ -1488,14 +3822,18 @@ app.post('/servers/:serverId/tools/:toolName', async (req, res) => {
     }
     const serverInfo = serverProcesses.get(serverId);
     
+    const streamFormat = toolStreamFormat(req);
+    if (streamFormat) {
+      return streamToolCall(req, res, serverId, toolName, arguments, streamFormat);
+    }
+    
     // Use direct SSE server sendRequest method for better reliability
     if (serverInfo.type === 'sse' && serverInfo.sendRequest) {
       try {
-        console.log(`[TOOL-EXEC] Using direct SSE sendRequest for ${serverId}`);
-        const result = await serverInfo.sendRequest('tools/call', {
-          name: toolName,
-          arguments
-        });
+        log.debug(`[TOOL-EXEC] Using direct SSE sendRequest for ${serverId}`);
+        const toolParams = { name: toolName, arguments };
+        const result = await sendShared(serverId, 'tools/call', toolParams,
+          () => serverInfo.sendRequest('tools/call', toolParams));
         
         // Handle different response formats
         if (result && result.result) {
@@ -1507,11 +3845,11 @@ app.post('/servers/:serverId/tools/:toolName', async (req, res) => {
         }
         return;
       } catch (sseError) {
-        console.error(`[TOOL-EXEC] Direct SSE failed for ${serverId}:`, sseError.message);
+        log.error(`[TOOL-EXEC] Direct SSE failed for ${serverId}`, { error: sseError.message });
         
         // Fallback to dynamic request
         try {
-      const sseUrl = serverInfo.config.url.endsWith('/sse') ? serverInfo.config.url : serverInfo.config.url + '/sse';
+      const sseUrl = serverInfo.url.endsWith('/sse') ? serverInfo.url : serverInfo.url + '/sse';
       const result = await sendDynamicMCPRequest(sseUrl, null, 'tools/call', {
         name: toolName,
         arguments
@@ -1529,7 +3867,7 @@ app.post('/servers/:serverId/tools/:toolName', async (req, res) => {
                 res.json(parsed);
               }
             } catch (parseError) {
-              console.error(`Error parsing SSE response for ${serverId}:`, parseError);
+              log.error(`Error parsing SSE response for ${serverId}`, parseError);
               res.status(500).json({ error: "Failed to parse server response" });
             }
           } else {
@@ -1537,7 +3875,7 @@ app.post('/servers/:serverId/tools/:toolName', async (req, res) => {
           }
       return;
         } catch (fallbackError) {
-          console.error(`[TOOL-EXEC] Both direct and fallback failed for ${serverId}`);
+          log.error(`[TOOL-EXEC] Both direct and fallback failed for ${serverId}`);
           throw fallbackError;
         }
       }
@@ -1557,26 +3895,168 @@ app.post('/servers/:serverId/tools/:toolName', async (req, res) => {
     try {
       res.json(result);
     } catch (jsonError) {
-      console.error(`Error stringifying result for tool ${toolName}:`, jsonError);
+      log.error(`Error stringifying result for tool ${toolName}`, jsonError);
       res.status(500).json({ 
         error: "Failed to format the response from the MCP server",
         details: jsonError.message
       });
     }
   } catch (error) {
-    console.error(`Error executing tool ${toolName}:`, error);
+    log.error(`Error executing tool ${toolName}`, error);
     res.status(500).json({ 
       error: `Error executing tool ${toolName}: ${error.message}` 
     });
   }
 });
 
+// Batch tool execution limits
+const BATCH_MAX_CALLS = parseInt(process.env.BATCH_MAX_CALLS, 10) || 500;
+const BATCH_CONCURRENCY = parseInt(process.env.BATCH_CONCURRENCY, 10) || 50;
+
+// Run async work over items with at most `limit` tasks in flight, keeping input order
+async function mapWithConcurrency(items, limit, worker) {
+  const results = new Array(items.length);
+  let next = 0;
+  const runners = Array.from({ length: Math.min(limit, items.length) }, async () => {
+    while (next < items.length) {
+      const index = next++;
+      results[index] = await worker(items[index], index);
+    }
+  });
+  await Promise.all(runners);
+  return results;
+}
+
+// Execute many tool calls in one round trip
+app.post('/tools/batch', async (req, res) => {
+  const calls = Array.isArray(req.body) ? req.body : (req.body && req.body.calls);
+  log.debug(`POST /tools/batch (${Array.isArray(calls) ? calls.length : 0} calls)`);
+
+  if (!Array.isArray(calls) || calls.length === 0) {
+    return res.status(400).json({
+      error: "Request body must contain a non-empty 'calls' array of {server_id, tool_name, arguments}"
+    });
+  }
+  if (calls.length > BATCH_MAX_CALLS) {
+    return res.status(413).json({
+      error: `Batch too large: ${calls.length} calls (max ${BATCH_MAX_CALLS}). Split it into smaller batches.`
+    });
+  }
+
+  const requestedConcurrency = parseInt(req.body.concurrency, 10);
+  const concurrency = requestedConcurrency > 0 ? Math.min(requestedConcurrency, BATCH_CONCURRENCY) : BATCH_CONCURRENCY;
+
+  const results = await mapWithConcurrency(calls, concurrency, async (call, index) => {
+    const { server_id, tool_name } = call || {};
+    if (!server_id || !tool_name) {
+      return { index, success: false, error: 'Each call requires server_id and tool_name' };
+    }
+    try {
+      await ensureServerStarted(server_id);
+    } catch (error) {
+      return { index, server_id, tool_name, success: false, error: `Server '${server_id}' failed to start: ${error.message}` };
+    }
+    if (!serverProcesses.has(server_id)) {
+      return { index, server_id, tool_name, success: false, error: `Server '${server_id}' not found or not connected` };
+    }
+    try {
+      const result = await sendMCPRequest(server_id, 'tools/call', {
+        name: tool_name,
+        arguments: call.arguments || {}
+      });
+      if (result === undefined || result === null) {
+        return { index, server_id, tool_name, success: false, error: 'The MCP server returned an empty response' };
+      }
+      return { index, server_id, tool_name, success: true, result };
+    } catch (error) {
+      return { index, server_id, tool_name, success: false, error: `Error executing tool ${tool_name}: ${error.message}` };
+    }
+  });
+
+  const failed = results.filter(r => !r.success).length;
+  res.json({
+    total: results.length,
+    succeeded: results.length - failed,
+    failed,
+    results
+  });
+});
+
+// Prometheus metrics. Values owned by other components are read at scrape time.
+const scrapeMetrics = [
+  new Collector('mcp_bridge_job_queue_depth', 'Jobs waiting for a worker slot', ['priority'], () =>
+    Object.entries(jobScheduler.metrics().queued_by_priority).map(([priority, depth]) => [[priority], depth])),
+  new Collector('mcp_bridge_jobs_running', 'Jobs currently running', [], () => [[[], jobScheduler.running]]),
+  new Collector('mcp_bridge_servers', 'Registered MCP servers by initialization state', ['state'], () => {
+    const counts = new Map();
+    for (const serverId of serverProcesses.keys()) {
+      const state = serverInitializationState.get(serverId) || 'unknown';
+      counts.set(state, (counts.get(state) || 0) + 1);
+    }
+    for (const serverId of lazyServers.keys()) {
+      if (!serverProcesses.has(serverId)) counts.set('lazy', (counts.get('lazy') || 0) + 1);
+    }
+    return Array.from(counts, ([state, count]) => [[state], count]);
+  }),
+  new Collector('mcp_bridge_replicas', 'Replicas of replicated servers by health', ['server', 'health'], () => {
+    const samples = [];
+    for (const [serverId, serverInfo] of serverProcesses) {
+      if (serverInfo.replicas.length < 2) continue;
+      const healthy = serverInfo.replicas.filter(r => r.state === 'initialized' && r.healthy).length;
+      samples.push([[serverId, 'healthy'], healthy], [[serverId, 'unavailable'], serverInfo.replicas.length - healthy]);
+    }
+    return samples;
+  }),
+  new Collector('mcp_bridge_result_cache_requests_total', 'Result cache lookups', ['result'], () =>
+    [[['hit'], resultCache.stats.hits], [['miss'], resultCache.stats.misses]], 'counter'),
+  new Collector('mcp_bridge_result_cache_evictions_total', 'Result cache entries evicted to stay within budget', [], () =>
+    [[[], resultCache.stats.evictions]], 'counter'),
+  new Collector('mcp_bridge_result_cache_hit_ratio', 'Result cache hits over lookups since start', [], () =>
+    [[[], resultCache.metrics().hit_ratio]]),
+  new Collector('mcp_bridge_result_cache_entries', 'Result cache entries', [], () => [[[], resultCache.entries.size]]),
+  new Collector('mcp_bridge_result_cache_bytes', 'Approximate result cache size', [], () => [[[], resultCache.bytes]]),
+  new Collector('mcp_bridge_coalesced_requests_total', 'Coalescable requests by whether they went upstream or joined one in flight',
+    ['result'], () => [[['upstream'], coalesceStats.upstream], [['merged'], coalesceStats.merged]], 'counter'),
+  new Collector('mcp_bridge_sse_sessions', 'Open SSE sessions', ['server'], () => {
+    const counts = new Map(); // Dynamic pools share the "dynamic" label
+    for (const pool of sseSessionPools.values()) {
+      const ready = pool.sessions.filter(s => s.state === 'ready').length;
+      counts.set(pool.label, (counts.get(pool.label) || 0) + ready);
+    }
+    return Array.from(counts, ([label, count]) => [[label], count]);
+  })
+];
+
+function renderMetrics() {
+  const lines = [];
+  Object.values(metrics).forEach(metric => metric.render(lines));
+  scrapeMetrics.forEach(metric => metric.render(lines));
+  return lines.join('\n') + '\n';
+}
+
+app.get('/metrics', (req, res) => {
+  res.set('Content-Type', 'text/plain; version=0.0.4; charset=utf-8');
+  res.send(renderMetrics());
+});
+
+// Result cache and request coalescing counters
+app.get('/cache/stats', (req, res) => {
+  res.json({
+    ...resultCache.metrics(),
+    coalescing: {
+      upstream: coalesceStats.upstream,
+      merged: coalesceStats.merged,
+      in_flight: inFlightRequests.size
+    }
+  });
+});
+
 // Confirm a medium risk level request
 app.post('/confirmations/:confirmationId', async (req, res) => {
   const { confirmationId } = req.params;
   const { confirm } = req.body;
   
-  console.log(`POST /confirmations/${confirmationId}`, req.body);
+  log.info(`POST /confirmations/${confirmationId}`, () => ({ body: req.body }));
   
   // Check if the confirmation exists
   if (!pendingConfirmations.has(confirmationId)) {
@@ -1607,7 +4087,7 @@ app.post('/confirmations/:confirmationId', async (req, res) => {
   
   try {
     // Execute the confirmed request
-    console.log(`Executing confirmed request for ${pendingRequest.serverId}`);
+    log.info(`Executing confirmed request for ${pendingRequest.serverId}`);
     const result = await sendMCPRequest(
       pendingRequest.serverId, 
       pendingRequest.method, 
@@ -1621,7 +4101,7 @@ app.post('/confirmations/:confirmationId', async (req, res) => {
     // Return the result
     res.json(result);
   } catch (error) {
-    console.error(`Error executing confirmed request: ${error.message}`);
+    log.error(`Error executing confirmed request: ${error.message}`);
     res.status(500).json({ error: error.message });
   }
 });
@@ -1629,7 +4109,7 @@ app.post('/confirmations/:confirmationId', async (req, res) => {
 // Get resources for a server
 app.get('/servers/:serverId/resources', async (req, res) => {
   const { serverId } = req.params;
-  console.log(`GET /servers/${serverId}/resources`);
+  log.debug(`GET /servers/${serverId}/resources`);
   
   try {
     if (!serverProcesses.has(serverId)) {
@@ -1638,10 +4118,9 @@ app.get('/servers/:serverId/resources', async (req, res) => {
       });
     }
     
-    const result = await sendMCPRequest(serverId, 'resources/list');
-    res.json(result);
+    await sendCatalog(req, res, serverId, 'resources');
   } catch (error) {
-    console.error(`Error listing resources for ${serverId}:`, error);
+    log.error(`Error listing resources for ${serverId}`, error);
     res.status(500).json({ error: error.message });
   }
 });
@@ -1649,7 +4128,7 @@ app.get('/servers/:serverId/resources', async (req, res) => {
 // Get a specific resource
 app.get('/servers/:serverId/resources/:resourceUri', async (req, res) => {
   const { serverId, resourceUri } = req.params;
-  console.log(`GET /servers/${serverId}/resources/${resourceUri}`);
+  log.debug(`GET /servers/${serverId}/resources/${resourceUri}`);
   
   try {
     if (!serverProcesses.has(serverId)) {
@@ -1665,7 +4144,7 @@ app.get('/servers/:serverId/resources/:resourceUri', async (req, res) => {
     
     res.json(result);
   } catch (error) {
-    console.error(`Error reading resource ${resourceUri}:`, error);
+    log.error(`Error reading resource ${resourceUri}`, error);
     res.status(500).json({ error: error.message });
   }
 });
@@ -1673,7 +4152,7 @@ app.get('/servers/:serverId/resources/:resourceUri', async (req, res) => {
 // Get prompts for a server
 app.get('/servers/:serverId/prompts', async (req, res) => {
   const { serverId } = req.params;
-  console.log(`GET /servers/${serverId}/prompts`);
+  log.debug(`GET /servers/${serverId}/prompts`);
   
   try {
     if (!serverProcesses.has(serverId)) {
@@ -1682,10 +4161,9 @@ app.get('/servers/:serverId/prompts', async (req, res) => {
       });
     }
     
-    const result = await sendMCPRequest(serverId, 'prompts/list');
-    res.json(result);
+    await sendCatalog(req, res, serverId, 'prompts');
   } catch (error) {
-    console.error(`Error listing prompts for ${serverId}:`, error);
+    log.error(`Error listing prompts for ${serverId}`, error);
     res.status(500).json({ error: error.message });
   }
 });
@@ -1695,7 +4173,7 @@ app.post('/servers/:serverId/prompts/:promptName', async (req, res) => {
   const { serverId, promptName } = req.params;
   const arguments = req.body;
   
-  console.log(`POST /servers/${serverId}/prompts/${promptName}`, arguments);
+  log.debug(`POST /servers/${serverId}/prompts/${promptName}`, () => ({ arguments }));
   
   try {
     if (!serverProcesses.has(serverId)) {
@@ -1721,7 +4199,7 @@ app.post('/servers/:serverId/prompts/:promptName', async (req, res) => {
       // Return the parsed result
     res.json(result);
     } catch (jsonError) {
-      console.error(`Error stringifying result for prompt ${promptName}:`, jsonError);
+      log.error(`Error stringifying result for prompt ${promptName}`, jsonError);
       // If JSON serialization fails, return a clean error
       res.status(500).json({ 
         error: "Failed to format the response from the MCP server",
@@ -1729,7 +4207,7 @@ app.post('/servers/:serverId/prompts/:promptName', async (req, res) => {
       });
     }
   } catch (error) {
-    console.error(`Error executing prompt ${promptName}:`, error);
+    log.error(`Error executing prompt ${promptName}`, error);
     res.status(500).json({
       error: `Error executing prompt ${promptName}: ${error.message}`
     });
@@ -1738,7 +4216,7 @@ app.post('/servers/:serverId/prompts/:promptName', async (req, res) => {
 
 // Generate Postman collection from MCP server
 app.post('/generate-postman', async (req, res) => {
-  console.log('POST /generate-postman');
+  log.info('POST /generate-postman');
   
   try {
     const { serverUrl, serverType = 'http', authToken, serverCommand, serverArgs, serverEnv } = req.body;
@@ -1749,10 +4227,10 @@ app.post('/generate-postman', async (req, res) => {
       });
     }
     
-    console.log(`Generating Postman collection for MCP server: ${serverUrl || serverCommand}`);
+    log.info(`Generating Postman collection for MCP server: ${serverUrl || serverCommand}`);
     
     // Create a temporary server ID for discovery
-    const tempServerId = `temp-${Date.now()}`;
+    const tempServerId = `${TEMP_SERVER_PREFIX}${Date.now()}`;
     let tempServerStarted = false;
     
     try {
@@ -1776,7 +4254,7 @@ app.post('/generate-postman', async (req, res) => {
       }
       
       // Temporarily start the server for discovery
-      console.log(`Starting temporary server for discovery: ${tempServerId}`);
+      log.info(`Starting temporary server for discovery: ${tempServerId}`);
       await startServer(tempServerId, serverConfig);
       tempServerStarted = true;
       
@@ -1784,7 +4262,7 @@ app.post('/generate-postman', async (req, res) => {
       await new Promise(resolve => setTimeout(resolve, 2000));
       
       // Discover server capabilities
-      console.log('Discovering server capabilities...');
+      log.info('Discovering server capabilities...');
       
       const [toolsResult, resourcesResult, promptsResult] = await Promise.allSettled([
         sendMCPRequest(tempServerId, 'tools/list').catch(e => ({ tools: [] })),
@@ -1796,12 +4274,12 @@ app.post('/generate-postman', async (req, res) => {
       const resources = resourcesResult.status === 'fulfilled' ? (resourcesResult.value.resources || []) : [];
       const prompts = promptsResult.status === 'fulfilled' ? (promptsResult.value.prompts || []) : [];
       
-      console.log(`Discovered: ${tools.length} tools, ${resources.length} resources, ${prompts.length} prompts`);
+      log.info(`Discovered: ${tools.length} tools, ${resources.length} resources, ${prompts.length} prompts`);
       
       // Generate Postman collection
       const postmanCollection = generatePostmanCollection(serverUrl || serverCommand, tools, resources, prompts, serverConfig);
       
-      console.log(`Postman collection generated successfully:`, {
+      log.info(`Postman collection generated successfully`, {
         toolsCount: tools.length,
         resourcesCount: resources.length,
         promptsCount: prompts.length,
@@ -1825,16 +4303,16 @@ app.post('/generate-postman', async (req, res) => {
       // Clean up temporary server
       if (tempServerStarted) {
         try {
-          console.log(`Cleaning up temporary server: ${tempServerId}`);
+          log.info(`Cleaning up temporary server: ${tempServerId}`);
           await shutdownServer(tempServerId);
         } catch (cleanupError) {
-          console.error(`Error cleaning up temporary server: ${cleanupError.message}`);
+          log.error(`Error cleaning up temporary server: ${cleanupError.message}`);
         }
       }
     }
     
   } catch (error) {
-    console.error('Error generating Postman collection:', error);
+    log.error('Error generating Postman collection', error);
     res.status(500).json({
       error: 'Failed to generate Postman collection',
       details: error.message
@@ -1901,7 +4379,7 @@ function generatePostmanCollection(serverIdentifier, tools, resources, prompts,
       }
     }
   } catch (error) {
-    console.warn('Error generating server ID:', error);
+    log.warn('Error generating server ID', error);
     serverId = 'custom-server';
   }
   
@@ -2254,10 +4732,10 @@ function generateArgumentDocumentation(argumentsArray) {
 
 // Job submission endpoint - Start async job
 app.post('/tool/execute', async (req, res) => {
-  console.log('POST /tool/execute', req.body);
+  log.debug('POST /tool/execute', () => ({ body: req.body }));
   
   try {
-    const { tool_name, server_id, ...parameters } = req.body;
+    const { tool_name, server_id, job_priority = 'normal', callback_url, ...parameters } = req.body;
     
     if (!tool_name) {
       return res.status(400).json({
@@ -2266,6 +4744,21 @@ app.post('/tool/execute', async (req, res) => {
       });
     }
     
+    if (!Object.keys(JOB_PRIORITIES).includes(job_priority)) {
+      return res.status(400).json({
+        success: false,
+        error: `Invalid job_priority: ${job_priority}. Valid values are: ${Object.keys(JOB_PRIORITIES).join(', ')}`
+      });
+    }
+    
+    const callbackError = validateCallbackUrl(callback_url);
+    if (callbackError) {
+      return res.status(400).json({
+        success: false,
+        error: callbackError
+      });
+    }
+    
     // Generate job identifiers
     const job_id = generateJobId();
     const bearer_token = generateBearerToken();
@@ -2274,10 +4767,14 @@ app.post('/tool/execute', async (req, res) => {
     const job = {
       job_id,
       bearer_token,
+      bearer_token_hash: hashBearerToken(bearer_token),
       status: 'QUEUED',
       tool_name,
       server_id: server_id || null, // Optional specific server
       parameters,
+      priority: job_priority,
+      caller_id: jobCallerId(req),
+      callback_url: callback_url || null, // Webhook notified when the job finishes
       result: null,
       error: null,
       created_at: new Date().toISOString(),
@@ -2289,10 +4786,10 @@ app.post('/tool/execute', async (req, res) => {
     // Store job
     jobs.set(job_id, job);
     
-    console.log(`[JOB ${job_id}] Job queued for tool: ${tool_name}`);
+    log.debug(`[JOB ${job_id}] Job queued for tool: ${tool_name}`);
     
-    // Start background processing (non-blocking)
-    setImmediate(() => processJobInBackground(job_id));
+    // Hand the job to the scheduler (non-blocking)
+    jobScheduler.enqueue(job, job.caller_id);
     
     // Return immediate response
     res.json({
@@ -2300,6 +4797,7 @@ app.post('/tool/execute', async (req, res) => {
       message: 'Job queued successfully',
       job_id: job_id,
       result_location: `/results/${job_id}`,
+      events_location: `/results/${job_id}/events`,
       bearer_token: bearer_token,
       status: 'QUEUED',
       tool_name: tool_name,
@@ -2309,7 +4807,7 @@ app.post('/tool/execute', async (req, res) => {
     });
     
   } catch (error) {
-    console.error('Error queuing job:', error);
+    log.error('Error queuing job', error);
     res.status(500).json({
       success: false,
       error: 'Failed to queue job',
@@ -2320,10 +4818,10 @@ app.post('/tool/execute', async (req, res) => {
 
 // Dynamic MCP Server Tool Execution - Submit async job with dynamic MCP server
 app.post('/tool/execute/dynamic', async (req, res) => {
-  console.log('POST /tool/execute/dynamic', req.body);
+  log.debug('POST /tool/execute/dynamic', () => ({ body: req.body }));
   
   try {
-    const { mcp_server_url, mcp_auth_token, tool_name, parameters } = req.body;
+    const { mcp_server_url, mcp_auth_token, tool_name, parameters, job_priority = 'normal', callback_url } = req.body;
     
     // Validate required fields
     if (!mcp_server_url) {
@@ -2340,6 +4838,21 @@ app.post('/tool/execute/dynamic', async (req, res) => {
       });
     }
     
+    if (!Object.keys(JOB_PRIORITIES).includes(job_priority)) {
+      return res.status(400).json({
+        success: false,
+        error: `Invalid job_priority: ${job_priority}. Valid values are: ${Object.keys(JOB_PRIORITIES).join(', ')}`
+      });
+    }
+    
+    const callbackError = validateCallbackUrl(callback_url);
+    if (callbackError) {
+      return res.status(400).json({
+        success: false,
+        error: callbackError
+      });
+    }
+    
     // Validate URL format
     try {
       new URL(mcp_server_url);
@@ -2352,7 +4865,7 @@ app.post('/tool/execute/dynamic', async (req, res) => {
     }
     
     // Validate MCP method format - tool names should be called directly
-    console.log(`[MCP-FIX] Fixing request format for tool: ${tool_name}`);
+    log.debug(`[MCP-FIX] Fixing request format for tool: ${tool_name}`);
     
     // Generate job identifiers
     const job_id = generateJobId();
@@ -2362,9 +4875,13 @@ app.post('/tool/execute/dynamic', async (req, res) => {
     const job = {
       job_id,
       bearer_token,
+      bearer_token_hash: hashBearerToken(bearer_token),
       status: 'QUEUED',
       tool_name,
       parameters: parameters || {},
+      priority: job_priority,
+      caller_id: jobCallerId(req),
+      callback_url: callback_url || null, // Webhook notified when the job finishes
       // Dynamic server configuration
       dynamic_server_url: mcp_server_url,
       dynamic_auth_token: mcp_auth_token || null,
@@ -2380,16 +4897,11 @@ app.post('/tool/execute/dynamic', async (req, res) => {
     // Store job
     jobs.set(job_id, job);
     
-    console.log(`[JOB ${job_id}] Dynamic job queued for tool: ${tool_name} on ${mcp_server_url}`);
-    console.log(`[JOB-CREATE-DEBUG] Job stored in jobs map:`, JSON.stringify(job, null, 2));
-    console.log(`[JOB-CREATE-DEBUG] Jobs map size:`, jobs.size);
+    log.debug(`[JOB ${job_id}] Dynamic job queued for tool: ${tool_name} on ${mcp_server_url}`);
+    log.trace(`[JOB-CREATE-DEBUG] Job stored in jobs map`, () => ({ job, jobs_size: jobs.size }));
     
-    // Start background processing (non-blocking)
-    console.log(`[JOB-CREATE-DEBUG] Calling setImmediate to process job: ${job_id}`);
-    setImmediate(() => {
-      console.log(`[JOB-CREATE-DEBUG] setImmediate callback executing for job: ${job_id}`);
-      processJobInBackground(job_id);
-    });
+    // Hand the job to the scheduler (non-blocking)
+    jobScheduler.enqueue(job, job.caller_id);
     
     // Return immediate response
     res.json({
@@ -2397,6 +4909,7 @@ app.post('/tool/execute/dynamic', async (req, res) => {
       message: 'Dynamic job queued successfully',
       job_id: job_id,
       result_location: `/results/${job_id}`,
+      events_location: `/results/${job_id}/events`,
       bearer_token: bearer_token,
       status: 'QUEUED',
       tool_name: tool_name,
@@ -2407,7 +4920,7 @@ app.post('/tool/execute/dynamic', async (req, res) => {
     });
     
   } catch (error) {
-    console.error('Error queuing dynamic job:', error);
+    log.error('Error queuing dynamic job', error);
     res.status(500).json({
       success: false,
       error: 'Failed to queue dynamic job',
@@ -2416,159 +4929,274 @@ app.post('/tool/execute/dynamic', async (req, res) => {
   }
 });
 
-// Result polling endpoint - Check job status and get results
-app.post('/results/:job_id', (req, res) => {
+// Helper to parse SSE/HTTP-wrapped results
+function parseJobResult(rawResult) {
+  if (typeof rawResult === 'string') {
+    // Handle SSE-wrapped: data: {...}
+    const trimmed = rawResult.trim();
+    if (trimmed.startsWith('data:')) {
+      const dataPart = trimmed.replace(/^data:\s*/, '');
+      // Try to parse as JSON
+      try {
+        const json = JSON.parse(dataPart);
+        // If it's a JSON-RPC response, extract .result or .content
+        if (json.result !== undefined) return json.result;
+        if (json.content !== undefined) return json.content;
+        return json;
+      } catch (e) {
+        // Not JSON, just return the string after 'data:'
+        return dataPart;
+      }
+    }
+    // Try to parse as JSON directly
+    try {
+      const json = JSON.parse(trimmed);
+      if (json.result !== undefined) return json.result;
+      if (json.content !== undefined) return json.content;
+      return json;
+    } catch (e) {
+      // Not JSON, return as is
+      return trimmed;
+    }
+  }
+  // If it's already an object, try to extract .result or .content
+  if (rawResult && typeof rawResult === 'object') {
+    if (rawResult.result !== undefined) return rawResult.result;
+    if (rawResult.content !== undefined) return rawResult.content;
+    return rawResult;
+  }
+  // Otherwise, return as is
+  return rawResult;
+}
+
+// Build the status code and body reported for a job. Shared by result polls,
+// job event streams and webhooks.
+function jobResultResponse(job, retryAfter = 10) {
+  switch (job.status) {
+    case 'QUEUED':
+      return {
+        statusCode: 200,
+        body: {
+          success: false,
+          status: 'QUEUED',
+          message: 'Job is queued and waiting to start',
+          progress: 'Waiting for processing slot...',
+          retry_after: retryAfter,
+          job_id: job.job_id,
+          tool_name: job.tool_name,
+          created_at: job.created_at
+        }
+      };
+      
+    case 'PROCESSING':
+      return {
+        statusCode: 200,
+        body: {
+          success: false,
+          status: 'PROCESSING',
+          message: 'Job is currently running',
+          progress: 'Executing MCP operation...',
+          retry_after: retryAfter,
+          job_id: job.job_id,
+          tool_name: job.tool_name,
+          created_at: job.created_at,
+          started_at: job.started_at
+        }
+      };
+      
+    case 'COMPLETED':
+      const execution_time = job.completed_at && job.started_at ? 
+        Math.round((new Date(job.completed_at) - new Date(job.started_at)) / 1000) : null;
+      const cleanResult = parseJobResult(job.result);
+      return {
+        statusCode: 200,
+        body: {
+          success: true,
+          status: 'COMPLETED',
+          result: cleanResult,
+          job_id: job.job_id,
+          tool_name: job.tool_name,
+          created_at: job.created_at,
+          started_at: job.started_at,
+          completed_at: job.completed_at,
+          execution_time_seconds: execution_time
+        }
+      };
+      
+    case 'FAILED': 
+      return {
+        statusCode: 500,
+        body: {
+          success: false,
+          status: 'FAILED',
+          error: job.error,
+          job_id: job.job_id,
+          tool_name: job.tool_name,
+          created_at: job.created_at,
+          started_at: job.started_at,
+          completed_at: job.completed_at,
+          message: 'Job execution failed'
+        }
+      };
+      
+    default:
+      return {
+        statusCode: 500,
+        body: {
+          success: false,
+          error: 'Unknown job status',
+          status: job.status,
+          job_id: job.job_id
+        }
+      };
+  }
+}
+
+// Serialized job response. The stored result bytes of a completed job are
+// spliced into the envelope as they are, without being parsed again.
+async function jobResultPayload(job, retryAfter = 10) {
+  const { statusCode, body } = jobResultResponse(job, retryAfter);
+  if (job.status !== 'COMPLETED' || !jobResults.has(job.job_id)) {
+    return { statusCode, payload: JSON.stringify(body) };
+  }
+  const { success, status, result, ...details } = body;
+  const stored = await jobResults.read(job.job_id);
+  return {
+    statusCode,
+    payload: Buffer.concat([
+      Buffer.from(`${JSON.stringify({ success, status }).slice(0, -1)},"result":`),
+      stored || Buffer.from('null'),
+      Buffer.from(`,${JSON.stringify(details).slice(1)}`)
+    ])
+  };
+}
+
+// Look up a job for a result request and check its bearer token. Sends the
+// error response and returns null when the job can't be read.
+async function authorizeJobRequest(req, res, provided_token) {
   const { job_id } = req.params;
-  const authHeader = req.headers.authorization;
-  
-  console.log(`POST /results/${job_id}`);
-  let job = jobs.get(job_id);
-  console.log(`[RESULTS-DEBUG] Job object for ${job_id}:`, JSON.stringify(job, null, 2));
   
   // Validate bearer token format
-  if (!authHeader || !authHeader.startsWith('Bearer ')) {
-    return res.status(401).json({
+  if (!provided_token) {
+    res.status(401).json({
       success: false,
       error: 'Missing or invalid Authorization header',
       message: 'Use: Authorization: Bearer {token}'
     });
+    return null;
   }
   
-  const provided_token = authHeader.substring(7); // Remove 'Bearer '
-  job = jobs.get(job_id);
+  const job = jobs.get(job_id) || await fetchClusterJob(job_id);
   
   // Validate job exists
   if (!job) {
-    return res.status(404).json({
+    res.status(404).json({
       success: false,
       error: 'Job not found',
       message: 'Invalid job ID or job has expired'
     });
+    return null;
   }
   
   // Validate bearer token
-  if (job.bearer_token !== provided_token) {
-    return res.status(401).json({
+  const expectedHash = Buffer.from(job.bearer_token_hash || '', 'hex');
+  const providedHash = Buffer.from(hashBearerToken(provided_token), 'hex');
+  if (expectedHash.length !== providedHash.length || !crypto.timingSafeEqual(expectedHash, providedHash)) {
+    res.status(401).json({
       success: false,
       error: 'Invalid bearer token',
       message: 'Token does not match job credentials'
     });
+    return null;
   }
   
   // Check if job expired
   if (new Date() > new Date(job.expires_at)) {
     jobs.delete(job_id); // Clean up expired job
-    return res.status(410).json({
+    jobResults.delete(job_id);
+    res.status(410).json({
       success: false,
       error: 'Job expired',
       message: 'Job results are no longer available'
     });
+    return null;
   }
+  
+  return job;
+}
 
-  // Helper to parse SSE/HTTP-wrapped results
-  function parseJobResult(rawResult) {
-    if (typeof rawResult === 'string') {
-      // Handle SSE-wrapped: data: {...}
-      const trimmed = rawResult.trim();
-      if (trimmed.startsWith('data:')) {
-        const dataPart = trimmed.replace(/^data:\s*/, '');
-        // Try to parse as JSON
-        try {
-          const json = JSON.parse(dataPart);
-          // If it's a JSON-RPC response, extract .result or .content
-          if (json.result !== undefined) return json.result;
-          if (json.content !== undefined) return json.content;
-          return json;
-        } catch (e) {
-          // Not JSON, just return the string after 'data:'
-          return dataPart;
-        }
-      }
-      // Try to parse as JSON directly
-      try {
-        const json = JSON.parse(trimmed);
-        if (json.result !== undefined) return json.result;
-        if (json.content !== undefined) return json.content;
-        return json;
-      } catch (e) {
-        // Not JSON, return as is
-        return trimmed;
-      }
-    }
-    // If it's already an object, try to extract .result or .content
-    if (rawResult && typeof rawResult === 'object') {
-      if (rawResult.result !== undefined) return rawResult.result;
-      if (rawResult.content !== undefined) return rawResult.content;
-      return rawResult;
-    }
-    // Otherwise, return as is
-    return rawResult;
+// Result polling endpoint - Check job status and get results.
+// With ?wait=N the request is held for up to N seconds and answers as soon
+// as the job finishes.
+app.post('/results/:job_id', async (req, res) => {
+  const { job_id } = req.params;
+  const authHeader = req.headers.authorization;
+  
+  log.debug(`POST /results/${job_id}`);
+  
+  const provided_token = authHeader && authHeader.startsWith('Bearer ')
+    ? authHeader.substring(7) // Remove 'Bearer '
+    : null;
+  let job = await authorizeJobRequest(req, res, provided_token);
+  if (!job) return;
+  
+  const waitSeconds = Math.min(parseFloat(req.query.wait) || 0, RESULT_WAIT_MAX_S);
+  if (waitSeconds > 0 && !isJobFinished(job)) {
+    await waitForJob(job_id, waitSeconds * 1000, res);
+    if (res.destroyed) return; // Client gave up while waiting
+    job = jobs.get(job_id) || job;
   }
+  
+  // Long-polling clients can ask again straight away
+  const { statusCode, payload } = await jobResultPayload(job, waitSeconds > 0 ? 0 : 10);
+  res.status(statusCode).type('json').send(payload);
+});
 
-  // Return appropriate response based on status
-  switch (job.status) {
-    case 'QUEUED':
-      return res.json({
-        success: false,
-        status: 'QUEUED',
-        message: 'Job is queued and waiting to start',
-        progress: 'Waiting for processing slot...',
-        retry_after: 10,
-        job_id: job.job_id,
-        tool_name: job.tool_name,
-        created_at: job.created_at
-      });
-      
-    case 'PROCESSING':
-      return res.json({
-        success: false,
-        status: 'PROCESSING',
-        message: 'Job is currently running',
-        progress: 'Executing MCP operation...',
-        retry_after: 10,
-        job_id: job.job_id,
-        tool_name: job.tool_name,
-        created_at: job.created_at,
-        started_at: job.started_at
-      });
-      
-    case 'COMPLETED':
-      const execution_time = job.completed_at && job.started_at ? 
-        Math.round((new Date(job.completed_at) - new Date(job.started_at)) / 1000) : null;
-      const cleanResult = parseJobResult(job.result);
-      return res.json({
-        success: true,
-        status: 'COMPLETED',
-        result: cleanResult,
-        job_id: job.job_id,
-        tool_name: job.tool_name,
-        created_at: job.created_at,
-        started_at: job.started_at,
-        completed_at: job.completed_at,
-        execution_time_seconds: execution_time
-      });
-      
-    case 'FAILED': 
-      return res.status(500).json({
-        success: false,
-        status: 'FAILED',
-        error: job.error,
-        job_id: job.job_id,
-        tool_name: job.tool_name,
-        created_at: job.created_at,
-        started_at: job.started_at,
-        completed_at: job.completed_at,
-        message: 'Job execution failed'
-      });
-      
-    default:
-      return res.status(500).json({
-        success: false,
-        error: 'Unknown job status',
-        status: job.status,
-        job_id: job.job_id
-      });
+// Job event stream - pushes the job's status as Server-Sent Events until it
+// finishes. EventSource can't set headers, so ?token= is accepted as well.
+app.get('/results/:job_id/events', async (req, res) => {
+  const { job_id } = req.params;
+  const authHeader = req.headers.authorization;
+  
+  log.debug(`GET /results/${job_id}/events`);
+  
+  const provided_token = authHeader && authHeader.startsWith('Bearer ')
+    ? authHeader.substring(7)
+    : req.query.token || null;
+  const job = await authorizeJobRequest(req, res, provided_token);
+  if (!job) return;
+  
+  res.writeHead(200, {
+    'Content-Type': 'text/event-stream',
+    'Cache-Control': 'no-cache, no-transform', // no-transform keeps compression from buffering events
+    Connection: 'keep-alive',
+    'X-Accel-Buffering': 'no'
+  });
+  
+  const heartbeat = setInterval(() => res.write(': keep-alive\n\n'), JOB_EVENTS_HEARTBEAT_MS);
+  const cleanup = () => {
+    clearInterval(heartbeat);
+    jobEvents.removeListener(job_id, sendStatus);
+  };
+  // Events are written in order even when reading a stored result takes a while
+  let sending = Promise.resolve();
+  function sendStatus(current) {
+    sending = sending.then(async () => {
+      if (res.writableEnded) return;
+      const { payload } = await jobResultPayload(current, 0);
+      res.write('event: status\ndata: ');
+      res.write(payload);
+      res.write('\n\n');
+      if (isJobFinished(current)) {
+        cleanup();
+        res.end();
+      }
+    });
   }
+  
+  jobEvents.on(job_id, sendStatus);
+  res.on('close', cleanup);
+  sendStatus(job);
 });
 
 // Alternative GET endpoint for result polling (for compatibility)
@@ -2580,13 +5208,14 @@ app.get('/results/:job_id', (req, res) => {
 
 // Job status endpoint - List all jobs (optional admin endpoint)
 app.get('/jobs', (req, res) => {
-  console.log('GET /jobs');
+  log.debug('GET /jobs');
   
   const jobList = Array.from(jobs.values()).map(job => ({
     job_id: job.job_id,
     status: job.status,
     tool_name: job.tool_name,
     server_id: job.server_id,
+    priority: job.priority,
     created_at: job.created_at,
     started_at: job.started_at,
     completed_at: job.completed_at,
@@ -2600,6 +5229,11 @@ app.get('/jobs', (req, res) => {
   });
 });
 
+// Job scheduler metrics - queue depth, running jobs and wait times
+app.get('/jobs/stats', (req, res) => {
+  res.json({ ...jobScheduler.metrics(), results: jobResults.stats() });
+});
+
 // Test endpoint for long-running operations
 app.post('/test/timeout/:minutes', (req, res) => {
   const minutes = parseFloat(req.params.minutes);
@@ -2614,11 +5248,11 @@ app.post('/test/timeout/:minutes', (req, res) => {
   const startTime = Date.now();
   const durationMs = minutes * 60 * 1000;
   
-  console.log(`Starting ${minutes}-minute timeout test...`);
+  log.info(`Starting ${minutes}-minute timeout test...`);
   
   setTimeout(() => {
     const actualDuration = Date.now() - startTime;
-    console.log(`Timeout test completed after ${actualDuration}ms`);
+    log.info(`Timeout test completed after ${actualDuration}ms`);
     
     res.json({
       status: 'completed',
@@ -2633,7 +5267,7 @@ app.post('/test/timeout/:minutes', (req, res) => {
 
 // Health check endpoint
 app.get('/health', (req, res) => {
-  console.log('GET /health');
+  log.debug('GET /health');
   
   const servers = Array.from(serverProcesses.entries()).map(([id, info]) => {
     // Create base server info
@@ -2658,51 +5292,175 @@ app.get('/health', (req, res) => {
   
   res.json({
     status: 'ok',
+    ...(isClusterWorker ? { worker: cluster.worker.id } : {}),
     uptime: process.uptime(),
     serverCount: serverProcesses.size,
     servers
   });
 });
 
-// Start the server with extended timeouts
-const server = app.listen(PORT, async () => {
-  console.log(`MCP Bridge server running on port ${PORT}`);
-  await initServers();
-  console.log('Ready to handle requests');
-});
-
-// Configure server timeouts for long-running operations
-// Allow requests to run up to Render's 100 minute limit
-const MAX_MS = 100 * 60 * 1000;    // 100 minutes in milliseconds
-
-server.setTimeout(MAX_MS);          // max time before socket timeout
-server.keepAliveTimeout = MAX_MS;   // max time to keep idle sockets open
-server.headersTimeout = MAX_MS;     // must be >= keepAliveTimeout
+// Cluster primary: fork the workers, apply and relay their changes, hand each
+// new worker a snapshot of the shared state, and give the unfinished jobs of
+// workers that died to the next worker that becomes ready
+function startClusterPrimary() {
+  log.info(`Cluster mode: starting ${CLUSTER_WORKERS} workers on port ${PORT}`);
+  cluster.setupPrimary({ serialization: 'advanced' });
+  const jobOwners = new Map(); // unfinished job id -> id of the worker running it
+  let stopping = false;
+  
+  const assignOrphanedJobs = (worker) => {
+    const orphans = [...jobs.withStatus('QUEUED'), ...jobs.withStatus('PROCESSING')]
+      .filter(job => !cluster.workers[jobOwners.get(job.job_id)]);
+    if (orphans.length === 0) return;
+    orphans.forEach(job => jobOwners.set(job.job_id, worker.id));
+    log.info(`[JOB-STORE] Handing ${orphans.length} unfinished jobs to worker ${worker.id}`);
+    worker.send({ bridge: 'requeue', job_ids: orphans.map(job => job.job_id) });
+  };
+  
+  const onMessage = (worker, message) => {
+    if (!message || !message.bridge) return;
+    if (message.bridge === 'snapshot') {
+      const channels = {};
+      for (const [name, channel] of clusterChannels) {
+        if (channel.snapshot) channels[name] = channel.snapshot();
+      }
+      worker.send({ bridge: 'snapshot', channels });
+      return;
+    }
+    if (message.bridge === 'ready') {
+      assignOrphanedJobs(worker);
+      return;
+    }
+    if (message.bridge === 'lookup') {
+      worker.send({ bridge: 'reply', request_id: message.request_id, value: jobs.get(message.job_id) || null });
+      return;
+    }
+    const channel = clusterChannels.get(message.bridge);
+    if (!channel) return;
+    channel.apply(message);
+    if (message.bridge === 'jobs') {
+      const job_id = message.job ? message.job.job_id : message.job_id;
+      if (message.op === 'set' && !isJobFinished(message.job)) jobOwners.set(job_id, worker.id);
+      else jobOwners.delete(job_id);
+    }
+    for (const other of Object.values(cluster.workers)) {
+      if (other !== worker && other.isConnected()) other.send(message);
+    }
+  };
+  
+  const fork = () => {
+    const worker = cluster.fork({ BRIDGE_CLUSTER_WORKER: '1' });
+    worker.on('message', (message) => onMessage(worker, message));
+  };
+  
+  cluster.on('exit', (worker, code, signal) => {
+    if (stopping) {
+      if (Object.keys(cluster.workers).length === 0) process.exit(0);
+      return;
+    }
+    // The delay keeps a worker that fails on startup from being forked in a tight loop
+    log.warn(`Worker ${worker.id} (PID ${worker.process.pid}) exited with ${signal || code}, starting a replacement`);
+    setTimeout(fork, 1000);
+  });
+  
+  const shutdown = (signal) => {
+    log.info(`${signal} received, stopping workers...`);
+    stopping = true;
+    const workers = Object.values(cluster.workers);
+    if (workers.length === 0) process.exit(0);
+    workers.forEach(worker => worker.process.kill('SIGTERM'));
+  };
+  process.on('SIGTERM', () => shutdown('SIGTERM'));
+  process.on('SIGINT', () => shutdown('SIGINT'));
+  
+  for (let i = 0; i < CLUSTER_WORKERS; i++) fork();
+}
 
-console.log('Server configured with 100-minute timeout limits (matching Render platform limit)');
+// Cluster worker: follow the changes the primary relays. Resolves once the
+// snapshot of the shared state has been applied.
+function joinCluster() {
+  return new Promise((resolve) => {
+    process.on('message', (message) => {
+      if (!message || !message.bridge) return;
+      if (message.bridge === 'snapshot') {
+        for (const [name, entries] of Object.entries(message.channels)) {
+          const channel = clusterChannels.get(name);
+          if (channel) channel.apply({ op: 'snapshot', entries });
+        }
+        log.info(`Worker ${cluster.worker.id} loaded ${jobs.size} jobs from the cluster`);
+        resolve();
+      } else if (message.bridge === 'reply') {
+        const resolve = clusterReplies.get(message.request_id);
+        clusterReplies.delete(message.request_id);
+        if (resolve) resolve(message.value);
+      } else if (message.bridge === 'requeue') {
+        requeueJobs(message.job_ids.map(job_id => jobs.get(job_id)).filter(Boolean));
+      } else {
+        const channel = clusterChannels.get(message.bridge);
+        if (channel) channel.apply(message);
+      }
+    });
+    process.send({ bridge: 'snapshot' });
+  });
+}
 
-// Handle graceful shutdown
-process.on('SIGTERM', async () => {
-  console.log('SIGTERM received, shutting down servers...');
+// Start the server with extended timeouts
+async function startBridge() {
+  if (isClusterWorker) await joinCluster();
   
-  const shutdownPromises = [];
-  for (const serverId of serverProcesses.keys()) {
-    shutdownPromises.push(shutdownServer(serverId));
-  }
+  const server = app.listen(PORT, async () => {
+    log.info(`MCP Bridge server running on port ${PORT}${isClusterWorker ? ` (worker ${cluster.worker.id})` : ''}`);
+    await initServers();
+    await buildToolIndex();
+    // In a cluster the primary hands out unfinished jobs once a worker is ready
+    if (isClusterWorker) process.send({ bridge: 'ready' });
+    else recoverJobs();
+    log.info('Ready to handle requests');
+  });
   
-  await Promise.all(shutdownPromises);
-  process.exit(0);
-});
-
-process.on('SIGINT', async () => {
-  console.log('SIGINT received, shutting down servers...');
+  // Configure server timeouts for long-running operations
+  // Allow requests to run up to Render's 100 minute limit
+  const MAX_MS = 100 * 60 * 1000;    // 100 minutes in milliseconds
   
-  const shutdownPromises = [];
-  for (const serverId of serverProcesses.keys()) {
-    shutdownPromises.push(shutdownServer(serverId));
-  }
+  server.setTimeout(MAX_MS);          // max time before socket timeout
+  server.keepAliveTimeout = MAX_MS;   // max time to keep idle sockets open
+  server.headersTimeout = MAX_MS;     // must be >= keepAliveTimeout
+  
+  log.info('Server configured with 100-minute timeout limits (matching Render platform limit)');
+  
+  // Handle graceful shutdown
+  process.on('SIGTERM', async () => {
+    log.info('SIGTERM received, shutting down servers...');
+    
+    const shutdownPromises = [];
+    for (const serverId of serverProcesses.keys()) {
+      shutdownPromises.push(shutdownServer(serverId));
+    }
+    
+    await Promise.all(shutdownPromises);
+    process.exit(0);
+  });
   
-  await Promise.all(shutdownPromises);
-  process.exit(0);
-});// Server restart trigger - Wed Jun 25 09:55:59 PDT 2025
+  process.on('SIGINT', async () => {
+    log.info('SIGINT received, shutting down servers...');
+    
+    const shutdownPromises = [];
+    for (const serverId of serverProcesses.keys()) {
+      shutdownPromises.push(shutdownServer(serverId));
+    }
+    
+    await Promise.all(shutdownPromises);
+    process.exit(0);
+  });
+}
+
+if (isClusterPrimary) {
+  startClusterPrimary();
+} else {
+  startBridge();
+}
+
+// Used by the serverless entry point in api/index.js
+module.exports = app;
+// Server restart trigger - Wed Jun 25 09:55:59 PDT 2025
 // Deployment trigger Fri Jun 27 10:26:17 PDT 2025
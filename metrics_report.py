@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+MCP Bridge Latency Report
+
+Scrapes the bridge's Prometheus endpoint (GET /metrics) and turns the latency
+histograms into a per-series table of request counts and p50/p95/p99 estimates.
+
+With --interval the endpoint is scraped twice and the report covers only the
+requests made between the two scrapes, which is what you want while a load test
+is running. Percentiles are interpolated inside histogram buckets the same way
+Prometheus' histogram_quantile() does, so they are only as precise as the buckets.
+"""
+
+import re
+import sys
+import json
+import time
+import argparse
+import requests
+
+DEFAULT_MCP_BRIDGE_URL = "http://localhost:3000"
+QUANTILES = (0.5, 0.95, 0.99)
+
+SAMPLE_RE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(?:\{(.*)\})?\s+(\S+)$')
+LABEL_RE = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)="((?:[^"\\]|\\.)*)"')
+
+
+def unescape_label(value):
+    """Undo the exposition-format escaping of a label value."""
+    return value.replace('\\n', '\n').replace('\\"', '"').replace('\\\\', '\\')
+
+
+def parse_metrics(text):
+    """Parse exposition text into {histogram name: {label tuple: series}}.
+
+    Each series is a dict with "buckets" ({upper bound: cumulative count}),
+    "sum" and "count". Label tuples are sorted (name, value) pairs without "le".
+    """
+    histograms = {}
+    types = {}
+    for line in text.splitlines():
+        if line.startswith('# TYPE '):
+            _, _, name, kind = line.split(None, 3)
+            types[name] = kind
+            continue
+        if not line or line.startswith('#'):
+            continue
+        match = SAMPLE_RE.match(line)
+        if not match:
+            continue
+        name, raw_labels, value = match.groups()
+        labels = {k: unescape_label(v) for k, v in LABEL_RE.findall(raw_labels or '')}
+        for suffix in ('_bucket', '_sum', '_count'):
+            base = name[:-len(suffix)]
+            if name.endswith(suffix) and types.get(base) == 'histogram':
+                break
+        else:
+            continue
+
+        le = labels.pop('le', None)
+        key = tuple(sorted(labels.items()))
+        series = histograms.setdefault(base, {}).setdefault(key, {"buckets": {}, "sum": 0.0, "count": 0.0})
+        if suffix == '_bucket':
+            series["buckets"][float(le)] = float(value)
+        else:
+            series[suffix[1:]] = float(value)
+    return histograms
+
+
+def subtract(after, before):
+    """Return the histograms for the requests made between two scrapes."""
+    delta = {}
+    for name, series_map in after.items():
+        for key, series in series_map.items():
+            old = before.get(name, {}).get(key)
+            if old is None:
+                delta.setdefault(name, {})[key] = series
+                continue
+            if series["count"] < old["count"]:
+                # The bridge restarted between scrapes; the counters started over
+                delta.setdefault(name, {})[key] = series
+                continue
+            delta.setdefault(name, {})[key] = {
+                "buckets": {le: n - old["buckets"].get(le, 0) for le, n in series["buckets"].items()},
+                "sum": series["sum"] - old["sum"],
+                "count": series["count"] - old["count"]
+            }
+    return delta
+
+
+def quantile(q, buckets):
+    """Estimate a quantile from cumulative bucket counts, interpolating linearly."""
+    bounds = sorted(buckets)
+    if not bounds:
+        return None
+    total = buckets[bounds[-1]]
+    if total <= 0:
+        return None
+    rank = q * total
+    lower_bound, lower_count = 0.0, 0.0
+    for bound in bounds:
+        count = buckets[bound]
+        if count >= rank:
+            if bound == float('inf'):
+                # Above the largest finite bucket: its bound is the best we can say
+                return lower_bound
+            if count == lower_count:
+                return bound
+            return lower_bound + (bound - lower_bound) * (rank - lower_count) / (count - lower_count)
+        lower_bound, lower_count = bound, count
+    return lower_bound
+
+
+def build_report(histograms, metric_filter=None):
+    """Flatten histograms into report rows sorted by p99, slowest first."""
+    rows = []
+    for name, series_map in histograms.items():
+        if metric_filter and metric_filter not in name:
+            continue
+        for key, series in series_map.items():
+            if series["count"] <= 0:
+                continue
+            row = {
+                "metric": name,
+                "labels": {k: v for k, v in key if v != ''},
+                "count": int(series["count"]),
+                "mean": series["sum"] / series["count"]
+            }
+            for q in QUANTILES:
+                row[f"p{int(q * 100)}"] = quantile(q, series["buckets"])
+            rows.append(row)
+    rows.sort(key=lambda r: (r["p99"] or 0), reverse=True)
+    return rows
+
+
+def format_seconds(value):
+    if value is None:
+        return '-'
+    if value < 1:
+        return f"{value * 1000:.1f}ms"
+    return f"{value:.2f}s"
+
+
+def print_report(rows):
+    if not rows:
+        print("No latency samples recorded.")
+        return
+    headers = ("metric", "labels", "count", "mean", "p50", "p95", "p99")
+    table = []
+    for row in rows:
+        table.append((
+            row["metric"].replace('mcp_bridge_', ''),
+            ','.join(f"{k}={v}" for k, v in row["labels"].items()),
+            str(row["count"]),
+            format_seconds(row["mean"]),
+            format_seconds(row["p50"]),
+            format_seconds(row["p95"]),
+            format_seconds(row["p99"])
+        ))
+    widths = [max(len(h), *(len(r[i]) for r in table)) for i, h in enumerate(headers)]
+    print('  '.join(h.ljust(w) for h, w in zip(headers, widths)))
+    print('  '.join('-' * w for w in widths))
+    for r in table:
+        # Left-align the text columns, right-align the numbers
+        cells = [r[0].ljust(widths[0]), r[1].ljust(widths[1])] + [c.rjust(w) for c, w in zip(r[2:], widths[2:])]
+        print('  '.join(cells))
+
+
+def scrape(url):
+    response = requests.get(f"{url.rstrip('/')}/metrics", timeout=10)
+    response.raise_for_status()
+    return parse_metrics(response.text)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Print a latency report from the MCP Bridge /metrics endpoint")
+    parser.add_argument("--url", default=DEFAULT_MCP_BRIDGE_URL,
+                        help=f"MCP Bridge URL (default: {DEFAULT_MCP_BRIDGE_URL})")
+    parser.add_argument("--interval", type=float, default=0,
+                        help="Scrape twice this many seconds apart and report only the difference")
+    parser.add_argument("--metric", help="Only report histograms whose name contains this string")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    try:
+        histograms = scrape(args.url)
+        if args.interval > 0:
+            time.sleep(args.interval)
+            histograms = subtract(scrape(args.url), histograms)
+    except requests.exceptions.RequestException as e:
+        print(f"Could not scrape {args.url}/metrics: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    rows = build_report(histograms, args.metric)
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    else:
+        print_report(rows)
+
+
+if __name__ == "__main__":
+    main()